@@ -0,0 +1,269 @@
+"""
+Data API Stand-in
+
+Local, in-memory implementation of the Data API commands used by the server,
+to benchmark and test without an Astra database:
+
+    keyspace:    findCollections, findTables, createCollection
+    collection:  find, insertOne, insertMany, deleteMany, countDocuments
+    table:       find
+
+Every request is delayed by latency_ms plus a random jitter of up to jitter_ms.
+Filters support the $eq, $ne, $in, $nin, $gt, $gte, $lt, $lte, $exists, $and
+and $or operators, and a $vector sort ranks documents by cosine similarity.
+
+    stand_in = DataAPIStandIn(latency_ms=5).start()
+    database = DataAPIClient().get_database(stand_in.url, token="stand-in")
+"""
+
+import asyncio
+import base64
+import math
+import random
+import struct
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+API_PATH = "/api/json/v1"
+PAGE_SIZE = 20
+VECTOR_PAGE_SIZE = 1000
+
+
+def _decode_vector(value: Any) -> Any:
+    # Vectors are sent as big-endian float32 {"$binary": ...} blobs
+    if isinstance(value, dict) and "$binary" in value:
+        data = base64.b64decode(value["$binary"])
+        return list(struct.unpack(f">{len(data) // 4}f", data))
+    return value
+
+
+def _get_path(document: Dict[str, Any], path: str) -> Any:
+    value = document
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def _compare(value: Any, operator: str, operand: Any) -> bool:
+    if operator == "$eq":
+        return value == operand or (isinstance(value, list) and operand in value)
+    if operator == "$ne":
+        return not _compare(value, "$eq", operand)
+    if operator == "$in":
+        return any(_compare(value, "$eq", item) for item in operand)
+    if operator == "$nin":
+        return not _compare(value, "$in", operand)
+    if operator == "$exists":
+        return (value is not None) == bool(operand)
+    if value is None:
+        return False
+    try:
+        if operator == "$gt":
+            return value > operand
+        if operator == "$gte":
+            return value >= operand
+        if operator == "$lt":
+            return value < operand
+        if operator == "$lte":
+            return value <= operand
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported filter operator {operator}")
+
+
+def matches(document: Dict[str, Any], filter_dict: Optional[Dict[str, Any]]) -> bool:
+    """Whether a document matches a Data API filter."""
+    for key, condition in (filter_dict or {}).items():
+        if key == "$and":
+            if not all(matches(document, item) for item in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(document, item) for item in condition):
+                return False
+        elif isinstance(condition, dict) and condition and all(op.startswith("$") for op in condition):
+            value = _get_path(document, key)
+            if not all(_compare(value, operator, operand) for operator, operand in condition.items()):
+                return False
+        elif not _compare(_get_path(document, key), "$eq", condition):
+            return False
+    return True
+
+
+def _project(document: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not projection:
+        return {key: value for key, value in document.items() if key != "$vector"}
+    included = [key for key, value in projection.items() if value and key != "_id"]
+    if included:
+        projected = {key: document[key] for key in included if key in document}
+        if projection.get("_id", 1) and "_id" in document:
+            projected["_id"] = document["_id"]
+        return projected
+    return {key: value for key, value in document.items() if projection.get(key, 1) and key != "$vector"}
+
+
+def _similarity(left: List[float], right: Any) -> float:
+    if not isinstance(right, list) or len(left) != len(right):
+        return -1.0
+    dot = sum(a * b for a, b in zip(left, right))
+    norm = math.sqrt(sum(a * a for a in left)) * math.sqrt(sum(b * b for b in right))
+    return dot / norm if norm else 0.0
+
+
+class DataAPIStandIn:
+    """In-memory Data API served by uvicorn in a background thread."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.host = host
+        self.port = port
+        self.collections = {}
+        self.tables = {}
+        self.requests = 0
+        self._server = None
+        self._thread = None
+        self.app = Starlette(routes=[
+            Route(API_PATH + "/{keyspace}", self._keyspace_command, methods=["POST"]),
+            Route(API_PATH + "/{keyspace}/{collection}", self._collection_command, methods=["POST"]),
+        ])
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "DataAPIStandIn":
+        config = uvicorn.Config(self.app, host=self.host, port=self.port, log_level="warning", lifespan="off")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        self.port = self._server.servers[0].sockets[0].getsockname()[1]
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.should_exit = True
+            self._thread.join()
+            self._server = None
+
+    def insert(self, collection: str, documents: List[Dict[str, Any]]) -> List[Any]:
+        """Add documents to a collection, creating it if needed."""
+        stored = self.collections.setdefault(collection, [])
+        inserted_ids = []
+        for document in documents:
+            document = {key: _decode_vector(value) for key, value in document.items()}
+            document.setdefault("_id", str(uuid.uuid4()))
+            stored.append(document)
+            inserted_ids.append(document["_id"])
+        return inserted_ids
+
+    def create_table(self, table: str, columns: Dict[str, str], primary_key: List[str],
+                     rows: List[Dict[str, Any]]):
+        """Add a table, with the Data API type of each column."""
+        self.tables[table] = {"columns": columns, "primary_key": primary_key, "rows": list(rows)}
+
+    async def _delay(self):
+        self.requests += 1
+        delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+    @staticmethod
+    def _error(message: str) -> JSONResponse:
+        return JSONResponse({"errors": [{"message": message, "errorCode": "STAND_IN_ERROR"}]})
+
+    async def _keyspace_command(self, request: Request) -> JSONResponse:
+        await self._delay()
+        command = await request.json()
+        if "findCollections" in command:
+            explain = (command["findCollections"] or {}).get("options", {}).get("explain")
+            names = list(self.collections)
+            collections = [{"name": name, "options": {}} for name in names] if explain else names
+            return JSONResponse({"status": {"collections": collections}})
+        if "findTables" in command:
+            explain = (command["findTables"] or {}).get("options", {}).get("explain")
+            tables = [{
+                "name": name,
+                "definition": {
+                    "columns": {column: {"type": column_type} for column, column_type in table["columns"].items()},
+                    "primaryKey": {"partitionBy": table["primary_key"], "partitionSort": {}},
+                },
+            } for name, table in self.tables.items()] if explain else list(self.tables)
+            return JSONResponse({"status": {"tables": tables}})
+        if "createCollection" in command:
+            self.collections.setdefault(command["createCollection"]["name"], [])
+            return JSONResponse({"status": {"ok": 1}})
+        return self._error(f"Unsupported command {next(iter(command), None)}")
+
+    async def _collection_command(self, request: Request) -> JSONResponse:
+        await self._delay()
+        collection = request.path_params["collection"]
+        command = await request.json()
+        name, payload = next(iter(command.items()))
+        payload = payload or {}
+        table = self.tables.get(collection)
+        if table is not None:
+            if name == "find":
+                return JSONResponse(self._find_rows(table, payload))
+            return self._error(f"Unsupported table command {name}")
+        documents = self.collections.get(collection)
+        if documents is None:
+            return self._error(f"Collection does not exist: {collection}")
+
+        if name == "find":
+            return JSONResponse(self._find(documents, payload))
+        if name == "insertOne":
+            return JSONResponse({"status": {"insertedIds": self.insert(collection, [payload["document"]])}})
+        if name == "insertMany":
+            return JSONResponse({"status": {"insertedIds": self.insert(collection, payload["documents"])}})
+        if name == "deleteMany":
+            kept = [document for document in documents if not matches(document, payload.get("filter"))]
+            self.collections[collection] = kept
+            return JSONResponse({"status": {"deletedCount": len(documents) - len(kept)}})
+        if name == "countDocuments":
+            count = sum(1 for document in documents if matches(document, payload.get("filter")))
+            return JSONResponse({"status": {"count": count}})
+        return self._error(f"Unsupported command {name}")
+
+    def _find(self, documents: List[Dict[str, Any]], payload: Dict[str, Any]) -> Dict[str, Any]:
+        options = payload.get("options") or {}
+        found = [document for document in documents if matches(document, payload.get("filter"))]
+
+        page_size = PAGE_SIZE
+        vector = _decode_vector((payload.get("sort") or {}).get("$vector"))
+        if vector:
+            found.sort(key=lambda document: _similarity(vector, document.get("$vector")), reverse=True)
+            page_size = VECTOR_PAGE_SIZE
+        if options.get("limit"):
+            found = found[:options["limit"]]
+
+        start = int(options.get("pageState") or 0)
+        page = found[start:start + page_size]
+        next_page_state = str(start + page_size) if start + page_size < len(found) else None
+        return {
+            "data": {
+                "documents": [_project(document, payload.get("projection")) for document in page],
+                "nextPageState": next_page_state,
+            },
+            "status": {},
+        }
+
+    def _find_rows(self, table: Dict[str, Any], payload: Dict[str, Any]) -> Dict[str, Any]:
+        # Rows are returned with the schema of the projected columns, as astrapy decodes them with it
+        response = self._find(table["rows"], payload)
+        included = [column for column, value in (payload.get("projection") or {}).items() if value]
+        response["status"]["projectionSchema"] = {
+            column: {"type": column_type} for column, column_type in table["columns"].items()
+            if not included or column in included}
+        return response
@@ -0,0 +1,259 @@
+"""
+Benchmark Suite
+
+Measures throughput and p50/p99 latency of the server hot paths against the
+local Data API stand-in, so no Astra database is needed:
+
+    on_call_tool   RunToolMiddleware.on_call_tool, per concurrency level
+    find           AstraDBManager.find (threads), per concurrency level
+    find_async     AstraDBManager.find_async, per concurrency level
+    load_tools     ToolLoader.load_all_tools, per catalog size
+    catalog        AstraDBManager.get_catalog_content, per catalog size
+
+Results are written as JSON to track regressions:
+
+    python -m benchmarks.run --latency-ms 5 --concurrency 1,8,32 --catalog-sizes 10,100,1000 \\
+        --output benchmark_results.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List
+
+from fastmcp import FastMCP
+
+from agentic_astra.database import AstraDBManager
+from agentic_astra.load_tools import ToolLoader
+from agentic_astra.query_plan import QueryPlan, compile_plans
+from agentic_astra.run_tool import RunToolMiddleware
+from .data_api_stand_in import DataAPIStandIn
+
+DB_NAME = "benchmark"
+PRODUCTS = "products"
+PRODUCT_COUNT = 1000
+
+FIND_TOOL = {
+    "name": "search_products",
+    "description": "Search for products",
+    "method": "find",
+    "collection_name": PRODUCTS,
+    "limit": 10,
+    "projection": {"name": 1, "price": 1, "color": 1},
+    "parameters": [
+        {"param": "color", "description": "Color of the products"},
+        {"param": "min_price", "attribute": "price", "operator": "$gte", "type": "number",
+         "description": "Minimum price of the products"},
+    ],
+}
+COLORS = ("red", "blue", "green", "black")
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of the values."""
+    ordered = sorted(values)
+    index = max(int(round(fraction * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def summarize(benchmark: str, params: Dict[str, Any], latencies: List[float], elapsed: float,
+              errors: int = 0) -> Dict[str, Any]:
+    return {
+        "benchmark": benchmark,
+        "params": params,
+        "operations": len(latencies),
+        "errors": errors,
+        "throughput_per_s": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+    }
+
+
+def stand_in_manager(stand_in: DataAPIStandIn) -> AstraDBManager:
+    """AstraDBManager whose database is the stand-in, instead of one found with the DevOps API."""
+    manager = AstraDBManager(token="stand-in", db_name=DB_NAME)
+    database = manager.client.get_database(stand_in.url, token=manager.astra_db_token)
+    manager.db[DB_NAME] = database
+    manager.async_db[DB_NAME] = database.to_async()
+    return manager
+
+
+def reset_async_handles(manager: AstraDBManager):
+    # Async handles are bound to the event loop they were first used in
+    manager.async_db[DB_NAME] = manager.db[DB_NAME].to_async()
+    manager.handles.invalidate(DB_NAME)
+
+
+def synthetic_catalog(size: int) -> List[Dict[str, Any]]:
+    return [{**FIND_TOOL, "name": f"search_products_{index}", "type": "tool", "tags": ["benchmark"]}
+            for index in range(size)]
+
+
+def tool_arguments(index: int) -> Dict[str, Any]:
+    # Distinct arguments, so calls are not served by the cache or coalesced
+    return {"color": COLORS[index % len(COLORS)], "min_price": index % PRODUCT_COUNT}
+
+
+async def run_concurrently(operation: Callable[[int], Awaitable[Any]], operations: int,
+                           concurrency: int) -> tuple:
+    latencies = []
+    errors = 0
+    next_index = iter(range(operations))
+
+    async def worker():
+        nonlocal errors
+        for index in next_index:
+            started = time.perf_counter()
+            result = await operation(index)
+            latencies.append(time.perf_counter() - started)
+            if _is_error(result):
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return latencies, time.perf_counter() - started, errors
+
+
+def _is_error(result: Any) -> bool:
+    content = getattr(result, "structured_content", result)
+    return isinstance(content, dict) and "error" in content
+
+
+async def bench_on_call_tool(manager: AstraDBManager, concurrency: int, operations: int) -> Dict[str, Any]:
+    middleware = RunToolMiddleware(manager, [FIND_TOOL])
+
+    def call(index: int) -> Awaitable[Any]:
+        context = SimpleNamespace(
+            fastmcp_context=SimpleNamespace(client_id="benchmark"),
+            message=SimpleNamespace(name=FIND_TOOL["name"], arguments=tool_arguments(index)))
+        return middleware.on_call_tool(context, None)
+
+    latencies, elapsed, errors = await run_concurrently(call, operations, concurrency)
+    return summarize("on_call_tool", {"concurrency": concurrency}, latencies, elapsed, errors)
+
+
+async def bench_find_async(manager: AstraDBManager, concurrency: int, operations: int) -> Dict[str, Any]:
+    plan = QueryPlan(FIND_TOOL)
+    latencies, elapsed, errors = await run_concurrently(
+        lambda index: manager.find_async(tool_arguments(index), plan=plan), operations, concurrency)
+    return summarize("find_async", {"concurrency": concurrency}, latencies, elapsed, errors)
+
+
+def bench_find(manager: AstraDBManager, concurrency: int, operations: int) -> Dict[str, Any]:
+    plan = QueryPlan(FIND_TOOL)
+
+    def find(index: int) -> tuple:
+        started = time.perf_counter()
+        result = manager.find(tool_arguments(index), FIND_TOOL, plan)
+        return time.perf_counter() - started, _is_error(result)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(find, range(operations)))
+    elapsed = time.perf_counter() - started
+    return summarize("find", {"concurrency": concurrency}, [latency for latency, _ in results], elapsed,
+                     sum(1 for _, error in results if error))
+
+
+def bench_load_tools(manager: AstraDBManager, catalog_size: int, repeat: int) -> Dict[str, Any]:
+    catalog = synthetic_catalog(catalog_size)
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        ToolLoader(FastMCP("benchmark"), manager, catalog).load_all_tools()
+        latencies.append(time.perf_counter() - started)
+    return summarize("load_tools", {"catalog_size": catalog_size}, latencies, sum(latencies))
+
+
+def bench_catalog(manager: AstraDBManager, stand_in: DataAPIStandIn, catalog_size: int,
+                  repeat: int) -> Dict[str, Any]:
+    collection_name = f"tool_catalog_{catalog_size}"
+    stand_in.insert(collection_name, synthetic_catalog(catalog_size))
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        manager.get_catalog_content(collection_name)
+        latencies.append(time.perf_counter() - started)
+    return summarize("catalog", {"catalog_size": catalog_size}, latencies, sum(latencies))
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def run_suite(latency_ms: float = 5.0, jitter_ms: float = 1.0, concurrency: List[int] = (1, 8, 32),
+              catalog_sizes: List[int] = (10, 100, 1000), operations: int = 200,
+              repeat: int = 5) -> Dict[str, Any]:
+    """Run all the benchmarks and return their results."""
+    stand_in = DataAPIStandIn(latency_ms=latency_ms, jitter_ms=jitter_ms).start()
+    try:
+        stand_in.insert(PRODUCTS, [{"name": f"product {index}", "color": COLORS[index % len(COLORS)],
+                                    "price": index} for index in range(PRODUCT_COUNT)])
+        manager = stand_in_manager(stand_in)
+
+        results = []
+        for level in concurrency:
+            results.append(asyncio.run(bench_on_call_tool(manager, level, operations)))
+            reset_async_handles(manager)
+            results.append(asyncio.run(bench_find_async(manager, level, operations)))
+            reset_async_handles(manager)
+            results.append(bench_find(manager, level, operations))
+        for size in catalog_sizes:
+            results.append(bench_load_tools(manager, size, repeat))
+            results.append(bench_catalog(manager, stand_in, size, repeat))
+    finally:
+        stand_in.stop()
+
+    return {
+        "metadata": {
+            "date": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "latency_ms": latency_ms,
+            "jitter_ms": jitter_ms,
+            "operations": operations,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agentic Astra benchmark suite")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Latency injected in Data API requests")
+    parser.add_argument("--jitter-ms", type=float, default=1.0, help="Random jitter added to the latency")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8, 32], help="Concurrency levels")
+    parser.add_argument("--catalog-sizes", type=_int_list, default=[10, 100, 1000], help="Catalog sizes")
+    parser.add_argument("--operations", type=int, default=200, help="Calls per concurrency level")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per catalog size")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file of the results")
+    args = parser.parse_args()
+
+    report = run_suite(args.latency_ms, args.jitter_ms, args.concurrency, args.catalog_sizes,
+                       args.operations, args.repeat)
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    for result in report["results"]:
+        params = ", ".join(f"{key}={value}" for key, value in result["params"].items())
+        print(f"{result['benchmark']:<14} {params:<20} {result['throughput_per_s']:>10} ops/s "
+              f"p50 {result['p50_ms']:>9} ms  p99 {result['p99_ms']:>9} ms  errors {result['errors']}")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -56,22 +56,44 @@ setup(
     packages=find_packages(where="src", exclude=["tests*", "__pycache__*"]),
     package_dir={"": "src"},
     py_modules=[
+        "agentic_astra.admission",
         "agentic_astra.audit",
         "agentic_astra.auth",
+        "agentic_astra.cache",
         "agentic_astra.catalog",
+        "agentic_astra.catalog_watcher",
         "agentic_astra.database", 
+        "agentic_astra.deadline",
+        "agentic_astra.embedding_batcher",
+        "agentic_astra.embedding_cache",
+        "agentic_astra.embeddings",
+        "agentic_astra.endpoint_cache",
+        "agentic_astra.expressions",
+        "agentic_astra.hybrid",
         "agentic_astra.llm",
         "agentic_astra.load_tools",
+        "agentic_astra.local_embeddings",
         "agentic_astra.logger",
+        "agentic_astra.metrics",
+        "agentic_astra.object_registry",
+        "agentic_astra.pagination",
+        "agentic_astra.planner",
+        "agentic_astra.query_plan",
+        "agentic_astra.replica",
         "agentic_astra.run_tool",
+        "agentic_astra.serialization",
         "agentic_astra.server",
+        "agentic_astra.shaping",
+        "agentic_astra.singleflight",
         "agentic_astra.tool_agent",
         "agentic_astra.tool_agent_prompt",
+        "agentic_astra.transport",
         "agentic_astra.utils",
     ],
     install_requires=[
-        "astrapy>=2.0.1",
+        "astrapy>=2.1,<2.2",
         "fastmcp>=2.12.1",
+        "httpx>=0.28.1",
         "python-dotenv>=1.1.1",
         "uvicorn[standard]>=0.30.0",
     ],
@@ -81,7 +103,18 @@ setup(
             "pytest-asyncio>=1.2.0",
             "build>=1.3.0",
             "twine>=6.2.0",
-        ]
+        ],
+        "fast": [
+            "orjson>=3.10",
+        ],
+        "http2": [
+            "httpx[http2]>=0.28.1",
+        ],
+        "local": [
+            "numpy>=1.26",
+            "onnxruntime>=1.17",
+            "tokenizers>=0.15",
+        ],
     },
     entry_points={
         "console_scripts": [
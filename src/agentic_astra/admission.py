@@ -0,0 +1,146 @@
+"""
+Admission Control
+
+Limits the tool calls running at the same time, globally and per tool. The
+per tool settings come from the catalog:
+
+    "concurrency": {"max_concurrency": 4, "priority": 1, "queue_delay_target_ms": 200}
+
+Calls over the limits wait in a priority queue (higher priority first, then
+arrival order). Calls that wait longer than the queue delay target, or that
+find the queue full, are shed with an Overloaded error.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+from .logger import get_logger
+
+
+class Overloaded(Exception):
+    """Raised when a tool call is shed by the admission controller."""
+
+    def __init__(self, tool_name: str, reason: str, retry_after_ms: int):
+        super().__init__(f"Tool {tool_name} overloaded: {reason}")
+        self.tool_name = tool_name
+        self.reason = reason
+        self.retry_after_ms = retry_after_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "error": "overloaded",
+            "message": str(self),
+            "reason": self.reason,
+            "retry_after_ms": self.retry_after_ms,
+        }
+
+
+class _Waiter:
+    __slots__ = ("tool_name", "max_concurrency", "future", "enqueued_at")
+
+    def __init__(self, tool_name: str, max_concurrency: Optional[int], future: asyncio.Future):
+        self.tool_name = tool_name
+        self.max_concurrency = max_concurrency
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class AdmissionController:
+    """Global and per tool concurrency limits with priority queueing and load shedding."""
+    logger = get_logger("admission")
+
+    def __init__(self, max_concurrency: int = 64, queue_delay_target_ms: int = 500, max_queue_size: int = 1000):
+        self.max_concurrency = max_concurrency
+        self.queue_delay_target_ms = queue_delay_target_ms
+        self.max_queue_size = max_queue_size
+        self.active = 0
+        self.tool_active: Dict[str, int] = {}
+        self.shed = 0
+        self._queue = []
+        self._sequence = itertools.count()
+
+    @asynccontextmanager
+    async def admit(self, tool_name: str, config: Optional[Dict[str, Any]] = None):
+        """Hold a global and a tool slot while the block runs."""
+        config = config or {}
+        await self.acquire(tool_name, config.get("max_concurrency"), config.get("priority", 0),
+                           config.get("queue_delay_target_ms", self.queue_delay_target_ms))
+        try:
+            yield
+        finally:
+            self.release(tool_name)
+
+    def _can_run(self, tool_name: str, max_concurrency: Optional[int]) -> bool:
+        if self.active >= self.max_concurrency:
+            return False
+        return not max_concurrency or self.tool_active.get(tool_name, 0) < max_concurrency
+
+    def _start(self, tool_name: str):
+        self.active += 1
+        self.tool_active[tool_name] = self.tool_active.get(tool_name, 0) + 1
+
+    async def acquire(self, tool_name: str, max_concurrency: Optional[int] = None, priority: int = 0,
+                      queue_delay_target_ms: Optional[int] = None):
+        if not self._queue and self._can_run(tool_name, max_concurrency):
+            self._start(tool_name)
+            return
+
+        if len(self._queue) >= self.max_queue_size:
+            self.shed += 1
+            raise Overloaded(tool_name, "queue full", self.queue_delay_target_ms)
+
+        waiter = _Waiter(tool_name, max_concurrency, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, (-priority, next(self._sequence), waiter))
+        self._dispatch()
+
+        target_ms = queue_delay_target_ms or self.queue_delay_target_ms
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=target_ms / 1000)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Admitted while timing out, give the slot back
+                self.release(tool_name)
+            else:
+                waiter.future.cancel()
+                self._remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.shed += 1
+            self.logger.warning(f"Shedding {tool_name} call after {target_ms} ms in queue")
+            raise Overloaded(tool_name, "queue delay target exceeded", target_ms)
+
+    def release(self, tool_name: str):
+        self.active -= 1
+        self.tool_active[tool_name] -= 1
+        self._dispatch()
+
+    def _remove(self, waiter: _Waiter):
+        self._queue = [entry for entry in self._queue if entry[2] is not waiter]
+        heapq.heapify(self._queue)
+
+    def _dispatch(self):
+        """Admit the queued calls that fit in the free slots, by priority."""
+        skipped = []
+        while self._queue and self.active < self.max_concurrency:
+            entry = heapq.heappop(self._queue)
+            waiter = entry[2]
+            if waiter.future.done():
+                continue
+            if self._can_run(waiter.tool_name, waiter.max_concurrency):
+                self._start(waiter.tool_name)
+                waiter.future.set_result(True)
+            else:
+                skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "queued": len(self._queue),
+            "shed": self.shed,
+            "tools": dict(self.tool_active),
+        }
@@ -1,3 +1,7 @@
+import asyncio
+import random
+from collections import OrderedDict
+from typing import Any, Dict, Optional
 from astrapy.constants import SortMode
 from astrapy.info import (
     CreateTableDefinition,
@@ -7,6 +11,7 @@ from astrapy.info import (
     TableValuedColumnType,
     TablePrimaryKeyDescriptor,
 )
+from .logger import get_logger
 
 
 audit_table_definition = CreateTableDefinition(
@@ -31,4 +36,171 @@ audit_table_definition = CreateTableDefinition(
     },
     primary_key=TablePrimaryKeyDescriptor(partition_by=["tool_id", "date"], 
                                           partition_sort={"run_id": SortMode.DESCENDING}),
-)
\ No newline at end of file
+)
+
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class OverflowPolicy:
+    BLOCK = "block"
+    DROP_OLDEST = "drop-oldest"
+    SAMPLE = "sample"
+
+
+class AuditWriter:
+    """
+    Background audit trail writer.
+
+    Events of the same run are merged into a single row in a bounded in-memory
+    queue and written with insert_many, when a batch is full or when the flush
+    interval elapses. Runs that did not finish are written after pending_timeout.
+    """
+    logger = get_logger("audit")
+
+    def __init__(self,
+                 table: Any,
+                 max_queue_size: int = 10000,
+                 batch_size: int = 50,
+                 flush_interval: float = 1.0,
+                 overflow_policy: str = OverflowPolicy.BLOCK,
+                 sample_rate: float = 0.1,
+                 pending_timeout: float = 30.0):
+        if overflow_policy not in (OverflowPolicy.BLOCK, OverflowPolicy.DROP_OLDEST, OverflowPolicy.SAMPLE):
+            raise ValueError(f"Invalid audit overflow policy: {overflow_policy}")
+        self.table = table
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.sample_rate = sample_rate
+        self.pending_timeout = pending_timeout
+        self.dropped = 0
+        self.written = 0
+        self._rows = OrderedDict()  # run_id -> (first seen, merged row)
+        self._ready = 0
+        self._skipped_runs = OrderedDict()
+        self._space = asyncio.Condition()
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._closed = False
+
+    async def submit(self, payload: Dict[str, Any]):
+        """Queue an audit event, merging it with the other events of its run."""
+        if self._closed:
+            return
+        self._ensure_started()
+
+        run_id = payload["run_id"]
+        if run_id in self._skipped_runs:
+            return
+
+        if run_id not in self._rows and not await self._make_room(run_id):
+            return
+
+        loop = asyncio.get_running_loop()
+        first_seen, row = self._rows.get(run_id) or (loop.time(), {})
+        was_ready = row.get("status") in TERMINAL_STATUSES
+        for key, value in payload.items():
+            # The date is part of the primary key, keep the one of the first event
+            if key == "date" and "date" in row:
+                continue
+            row[key] = value
+        self._rows[run_id] = (first_seen, row)
+
+        if not was_ready and row.get("status") in TERMINAL_STATUSES:
+            self._ready += 1
+            if self._ready >= self.batch_size:
+                self._wakeup.set()
+
+    async def _make_room(self, run_id: Any) -> bool:
+        """Apply the overflow policy for a new run, returning whether it is accepted."""
+        if self.overflow_policy == OverflowPolicy.SAMPLE:
+            # Sample new runs once the queue is half full
+            if len(self._rows) >= self.max_queue_size // 2 and (
+                    len(self._rows) >= self.max_queue_size or random.random() >= self.sample_rate):
+                self._skip_run(run_id)
+                return False
+            return True
+
+        if len(self._rows) < self.max_queue_size:
+            return True
+
+        if self.overflow_policy == OverflowPolicy.DROP_OLDEST:
+            _, (_, row) = self._rows.popitem(last=False)
+            if row.get("status") in TERMINAL_STATUSES:
+                self._ready -= 1
+            self.dropped += 1
+            return True
+
+        # Block until the writer makes room
+        self._wakeup.set()
+        async with self._space:
+            await self._space.wait_for(lambda: len(self._rows) < self.max_queue_size or self._closed)
+        return not self._closed
+
+    def _skip_run(self, run_id: Any):
+        self.dropped += 1
+        self._skipped_runs[run_id] = True
+        while len(self._skipped_runs) > self.max_queue_size:
+            self._skipped_runs.popitem(last=False)
+
+    def _ensure_started(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def _take_batch(self, force: bool = False) -> list:
+        """Remove the rows ready to be written from the queue."""
+        now = asyncio.get_running_loop().time()
+        batch = []
+        for run_id in list(self._rows):
+            first_seen, row = self._rows[run_id]
+            finished = row.get("status") in TERMINAL_STATUSES
+            if force or finished or now - first_seen >= self.pending_timeout:
+                del self._rows[run_id]
+                if finished:
+                    self._ready -= 1
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    break
+        return batch
+
+    async def flush(self, force: bool = False):
+        """Write the rows that are ready, in batches of batch_size."""
+        while True:
+            batch = self._take_batch(force)
+            if not batch:
+                break
+            async with self._space:
+                self._space.notify_all()
+            try:
+                await self.table.insert_many(batch)
+                self.written += len(batch)
+                self.logger.debug(f"Inserted {len(batch)} audit trail rows")
+            except Exception as e:
+                self.dropped += len(batch)
+                self.logger.error(f"Failed to insert {len(batch)} audit trail rows: {e}")
+            if len(batch) < self.batch_size:
+                break
+
+    async def close(self):
+        """Stop the writer and flush all the pending rows."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        if self._task:
+            await self._task
+        await self.flush(force=True)
+        async with self._space:
+            self._space.notify_all()
+        self.logger.info(f"Audit writer closed: {self.written} rows written, {self.dropped} dropped")
@@ -0,0 +1,164 @@
+"""
+Tool Result Cache
+
+In-process cache of tool results, configured per tool in the catalog:
+
+    "cache": {"ttl": 60, "max_entries": 1000, "stale_while_revalidate": 30}
+
+Entries are evicted in LRU order when a tool has more than max_entries or when
+the whole cache is over its memory budget. With stale_while_revalidate, expired
+entries are still served for that many seconds while a background refresh runs.
+Keys include the version of the tool plan, so the results of a previous version
+of a reloaded tool, still loading at the time of the reload, are never served.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+from .logger import get_logger
+from .utils import canonical_arguments
+from .serialization import dumps
+
+
+class CacheEntry:
+    __slots__ = ("tool_name", "value", "size", "expires_at", "stale_until", "refreshing")
+
+    def __init__(self, tool_name: str, value: Any, size: int, expires_at: float, stale_until: float):
+        self.tool_name = tool_name
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.refreshing = False
+
+
+class ResultCache:
+    """LRU cache of tool results with TTL and stale-while-revalidate."""
+    logger = get_logger("result_cache")
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._tool_keys = {}
+        self._counters = {}
+        self._refresh_tasks = set()
+
+    @staticmethod
+    def key(tool_name: str, arguments: Optional[Dict[str, Any]], version: Any = None) -> tuple:
+        return (tool_name, version, canonical_arguments(arguments))
+
+    async def get_or_load(self,
+                          tool_name: str,
+                          cache_config: Optional[Dict[str, Any]],
+                          arguments: Optional[Dict[str, Any]],
+                          loader: Callable[[], Awaitable[Any]],
+                          version: Any = None) -> Any:
+        """Return the cached result of a tool call, or load and cache it."""
+        if not cache_config or not cache_config.get("ttl"):
+            return await loader()
+
+        key = self.key(tool_name, arguments, version)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+
+        if entry:
+            if now < entry.expires_at:
+                self._touch(key)
+                self._count(tool_name, "hits")
+                return entry.value
+            if now < entry.stale_until:
+                self._touch(key)
+                self._count(tool_name, "stale_hits")
+                if not entry.refreshing:
+                    entry.refreshing = True
+                    task = asyncio.create_task(self._refresh(key, cache_config, loader))
+                    self._refresh_tasks.add(task)
+                    task.add_done_callback(self._refresh_tasks.discard)
+                return entry.value
+
+        self._count(tool_name, "misses")
+        value = await loader()
+        self._store(key, cache_config, value)
+        return value
+
+    async def _refresh(self, key: tuple, cache_config: Dict[str, Any], loader: Callable[[], Awaitable[Any]]):
+        try:
+            self._store(key, cache_config, await loader())
+            self._count(key[0], "refreshes")
+        except Exception as e:
+            self.logger.error(f"Failed to refresh cached result of {key[0]}: {e}")
+        finally:
+            entry = self._entries.get(key)
+            if entry:
+                entry.refreshing = False
+
+    def _store(self, key: tuple, cache_config: Dict[str, Any], value: Any):
+        # Only successful results are cached, raw results are JSON strings
+        if isinstance(value, str):
+            size = len(value)
+        elif isinstance(value, dict) and "error" not in value:
+            try:
+                size = len(dumps(value))
+            except Exception:
+                return
+        else:
+            return
+        if size > self.max_bytes:
+            return
+
+        tool_name = key[0]
+        now = time.monotonic()
+        expires_at = now + cache_config["ttl"]
+        stale_until = expires_at + cache_config.get("stale_while_revalidate", 0)
+
+        self._remove(key)
+        self._entries[key] = CacheEntry(tool_name, value, size, expires_at, stale_until)
+        tool_keys = self._tool_keys.setdefault(tool_name, OrderedDict())
+        tool_keys[key] = True
+        self.size += size
+
+        max_entries = cache_config.get("max_entries")
+        while max_entries and len(tool_keys) > max_entries:
+            self._evict(next(iter(tool_keys)))
+        while self.size > self.max_bytes and self._entries:
+            self._evict(next(iter(self._entries)))
+
+    def _touch(self, key: tuple):
+        self._entries.move_to_end(key)
+        self._tool_keys[key[0]].move_to_end(key)
+
+    def _remove(self, key: tuple) -> Optional[CacheEntry]:
+        entry = self._entries.pop(key, None)
+        if entry:
+            self.size -= entry.size
+            self._tool_keys[entry.tool_name].pop(key, None)
+        return entry
+
+    def _evict(self, key: tuple):
+        if self._remove(key):
+            self._count(key[0], "evictions")
+
+    def _count(self, tool_name: str, counter: str):
+        counters = self._counters.setdefault(tool_name, {
+            "hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "evictions": 0})
+        counters[counter] += 1
+
+    def invalidate(self, tool_name: Optional[str] = None):
+        """Drop the cached results of a tool, or of all the tools."""
+        keys = list(self._tool_keys.get(tool_name, {})) if tool_name else list(self._entries)
+        for key in keys:
+            self._remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and usage of the cache, per tool."""
+        tools = {}
+        for tool_name, counters in self._counters.items():
+            tools[tool_name] = {**counters, "entries": len(self._tool_keys.get(tool_name, {}))}
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "tools": tools,
+        }
@@ -0,0 +1,247 @@
+"""
+Catalog Hot Reload
+
+The tool catalog is polled every CATALOG_RELOAD_INTERVAL seconds, the modified
+time of --catalog_file or the tools of the catalog collection, and the changes
+are applied without restarting the server:
+
+    added     compiled, validated and planned like at startup, then registered
+    updated   replaced by the new version, the cached results are dropped
+    removed   unregistered, the cached results are dropped
+
+The plans and tools are swapped in one step, with no await in between, so a
+call sees either the old or the new catalog. Calls already running keep the
+plan they started with. A new version that does not compile, or is refused by
+the scan policy, is not loaded and the previous version, if any, is kept.
+An empty catalog is ignored rather than removing every tool.
+
+The replicas follow the changes: new tools with a "replica" config are loaded,
+and the replicas no longer used by any tool are dropped. The client sessions
+seen by the server are sent a tools/list_changed notification, FastMCP only
+sends it by itself when tools change within a request.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import weakref
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from .logger import get_logger
+from .query_plan import compile_plans
+
+DEFAULT_RELOAD_INTERVAL = 30
+# Keys set by the database, not part of the tool config
+IGNORED_KEYS = ("_id",)
+
+
+def fingerprint(tool_config: Dict[str, Any]) -> str:
+    """Hash of a tool config, independent of the key order."""
+    config = {key: value for key, value in tool_config.items() if key not in IGNORED_KEYS}
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class CatalogDiff:
+    """Names of the tools added, updated and removed between two catalogs."""
+
+    __slots__ = ("added", "updated", "removed")
+
+    def __init__(self, added: Iterable[str] = (), updated: Iterable[str] = (), removed: Iterable[str] = ()):
+        self.added = list(added)
+        self.updated = list(updated)
+        self.removed = list(removed)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+    def __repr__(self) -> str:
+        return f"CatalogDiff(added={self.added}, updated={self.updated}, removed={self.removed})"
+
+
+def diff_catalog(fingerprints: Dict[str, str], tools_config: List[Dict[str, Any]]) -> CatalogDiff:
+    """Changes of a catalog, against the fingerprints of the previous one by tool name."""
+    current = {tool_config["name"]: fingerprint(tool_config) for tool_config in tools_config}
+    return CatalogDiff(
+        added=[name for name in current if name not in fingerprints],
+        updated=[name for name, value in current.items() if name in fingerprints and fingerprints[name] != value],
+        removed=[name for name in fingerprints if name not in current])
+
+
+class FileCatalogSource:
+    """Catalog of a JSON file, read again when its modified time changes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime = None
+
+    def load(self) -> List[Dict[str, Any]]:
+        mtime = os.stat(self.path).st_mtime_ns
+        with open(self.path) as f:
+            content = json.load(f)
+        self.mtime = mtime
+        return content
+
+    async def poll(self) -> Optional[List[Dict[str, Any]]]:
+        """The catalog, or None when the file did not change."""
+        if os.stat(self.path).st_mtime_ns == self.mtime:
+            return None
+        return await asyncio.to_thread(self.load)
+
+
+class CollectionCatalogSource:
+    """Catalog of the tools of an Astra DB collection."""
+
+    def __init__(self, astra_db_manager: Any, collection_name: str, tags: Optional[str] = None):
+        self.astra_db_manager = astra_db_manager
+        self.collection_name = collection_name
+        self.tags = tags
+
+    def load(self) -> List[Dict[str, Any]]:
+        return self.astra_db_manager.get_catalog_content(collection_name=self.collection_name, tags=self.tags)
+
+    async def poll(self) -> Optional[List[Dict[str, Any]]]:
+        return await asyncio.to_thread(self.load)
+
+
+class SessionTracker(Middleware):
+    """Remembers the client sessions, to notify them when the tool list changes."""
+    logger = get_logger("catalog_watcher")
+
+    def __init__(self):
+        self.sessions = weakref.WeakSet()
+
+    async def on_request(self, context: MiddlewareContext, call_next):
+        if context.fastmcp_context:
+            try:
+                self.sessions.add(context.fastmcp_context.session)
+            except Exception as e:
+                self.logger.debug(f"No session to track: {e}")
+        return await call_next(context)
+
+    async def notify_tool_list_changed(self):
+        for session in list(self.sessions):
+            try:
+                await session.send_tool_list_changed()
+            except Exception as e:
+                # Closed sessions are forgotten
+                self.logger.debug(f"Could not notify a session of the tool list change: {e}")
+                self.sessions.discard(session)
+
+
+class CatalogWatcher:
+    """Polls the catalog and swaps the changed tools and plans."""
+    logger = get_logger("catalog_watcher")
+
+    def __init__(self, tool_loader: Any, middleware: Any, source: Any,
+                 interval: float = DEFAULT_RELOAD_INTERVAL, planner: Any = None,
+                 sessions: Optional[SessionTracker] = None):
+        self.tool_loader = tool_loader
+        self.middleware = middleware
+        self.source = source
+        self.interval = interval
+        self.planner = planner
+        self.sessions = sessions
+        # Fingerprints of the last catalog read, versions that failed to load are not retried
+        self.fingerprints = {tool_config["name"]: fingerprint(tool_config)
+                             for tool_config in tool_loader.tools_config}
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._watch())
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reload()
+            except Exception as e:
+                self.logger.error(f"Could not reload the catalog: {e}")
+
+    async def reload(self) -> CatalogDiff:
+        """Read the catalog and apply its changes."""
+        tools_config = await self.source.poll()
+        if tools_config is None:
+            return CatalogDiff()
+        if not tools_config:
+            self.logger.warning("The catalog is empty, the current tools are kept")
+            return CatalogDiff()
+
+        diff = diff_catalog(self.fingerprints, tools_config)
+        if not diff:
+            return diff
+        self.logger.info(f"Catalog changed: {len(diff.added)} added, {len(diff.updated)} updated, "
+                         f"{len(diff.removed)} removed")
+
+        configs = {tool_config["name"]: tool_config for tool_config in tools_config}
+        plans = await self._prepare([configs[name] for name in diff.added + diff.updated])
+        tools = {}
+        for name, plan in list(plans.items()):
+            try:
+                tools[name] = self.tool_loader.generate_tool(plan.config)
+            except Exception as e:
+                self.logger.error(f"Could not generate tool {name}: {e}")
+                plans.pop(name)
+
+        self._swap(tools_config, diff, plans, tools)
+        self.fingerprints = {name: fingerprint(tool_config) for name, tool_config in configs.items()}
+
+        # Tools that failed to reload keep their previous version, and its replica
+        replicas = getattr(self.tool_loader.astra_db_manager, "replicas", None)
+        if replicas:
+            await replicas.update(plans, diff.removed + [name for name in diff.updated if name in plans])
+        if self.sessions:
+            await self.sessions.notify_tool_list_changed()
+        return diff
+
+    async def _prepare(self, tools_config: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Plans of the new tool versions, checked like at startup."""
+        plans = compile_plans(tools_config)
+        if not plans:
+            return plans
+        await self.tool_loader.astra_db_manager.handles.validate(plans)
+        if self.planner:
+            report = await self.planner.check(plans)
+            for name, analysis in report.items():
+                if analysis["action"] == "refuse":
+                    plans.pop(name)
+        return plans
+
+    def _swap(self, tools_config: List[Dict[str, Any]], diff: CatalogDiff, new_plans: Dict[str, Any],
+              tools: Dict[str, Any]):
+        # No await from here on, calls see either the old or the new catalog
+        plans = dict(self.tool_loader.plans)
+        mcp = self.tool_loader.mcp
+        for name in diff.removed:
+            plans.pop(name, None)
+            self._remove_tool(name)
+        for name in diff.added + diff.updated:
+            if name not in new_plans:
+                self.logger.error(f"Tool {name} was not reloaded" +
+                                  (", the previous version is kept" if name in plans else ""))
+                continue
+            plans[name] = new_plans[name]
+            self._remove_tool(name)
+            mcp.add_tool(tools[name])
+
+        self.tool_loader.plans = plans
+        # Tools that failed to reload keep their previous config
+        self.tool_loader.tools_config = [plans[tool_config["name"]].config for tool_config in tools_config
+                                         if tool_config["name"] in plans]
+        self.middleware.plans = plans
+        self.middleware.tools_config = self.tool_loader.tools_config
+        for name in diff.updated + diff.removed:
+            self.middleware.result_cache.invalidate(name)
+
+    def _remove_tool(self, name: str):
+        try:
+            self.tool_loader.mcp.remove_tool(name)
+        except Exception:
+            # Not registered, refused or failed to load
+            pass
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
@@ -6,16 +6,39 @@ Database operations and utilities for interacting with Astra DB.
 
 import asyncio
 import json
+import threading
 from typing import Any, Dict, List, Optional
 from dataclasses import dataclass
 
 from dotenv import load_dotenv
 from astrapy import DataAPIClient
 from astrapy.data_types import DataAPIVector, DataAPITimestamp
+from astrapy.exceptions import DataAPITimeoutException
+import httpx
 from .logger import get_logger
 from .utils import remove_underscore_from_dict_keys, extract_db_id_from_astra_url
-from .llm import generate_embedding
-from .audit import audit_table_definition
+from .embeddings import EmbeddingClient, default_embedding_client
+from .audit import audit_table_definition, AuditWriter
+from .query_plan import QueryPlan, SearchMode
+from .hybrid import HybridStrategy, and_filter, document_key, reciprocal_rank_fusion
+from .deadline import Deadline, DeadlineExceeded
+from .pagination import PAGE_TOKEN_PARAM, encode_page_token, decode_page_token
+from .metrics import phase
+from .serialization import response_errors
+from .replica import ReplicaManager
+
+# Out of time, the call fails with DeadlineExceeded rather than an error result
+TIMEOUT_ERRORS = (DeadlineExceeded, DataAPITimeoutException, httpx.TimeoutException, TimeoutError)
+
+try:
+    # astrapy 2.1 internals, only used by passthrough tools
+    from astrapy.data.utils.collection_converters import preprocess_collection_payload
+    from astrapy.data.utils.table_converters import preprocess_table_payload
+except ImportError:
+    preprocess_collection_payload = preprocess_table_payload = None
+from .endpoint_cache import EndpointCache
+from .object_registry import ObjectRegistry
+from .transport import DataAPITransport
 from datetime import datetime
 
 # Load environment variables
@@ -33,12 +56,26 @@ class AstraDBManager:
     logger = get_logger("Astra DB Manager")
     audit_table = None
     
-    def __init__(self, token: str, endpoint: str = None, db_name: str = None):
+    def __init__(self, token: str, endpoint: str = None, db_name: str = None,
+                 endpoint_cache: Optional[EndpointCache] = None, metadata_ttl: Optional[float] = None,
+                 transport: Optional[DataAPITransport] = None, embeddings: Optional[EmbeddingClient] = None):
         self.astra_db_token = token
         self.astra_db_api_endpoint = endpoint
         self.astra_db_db_name = db_name
+        self.endpoint_cache = endpoint_cache or EndpointCache(token)
         self.client = None
         self.db = {}
+        self.async_db = {}
+        self.audit_writer = None
+        self.replicas = None
+        self.handles = ObjectRegistry(self) if metadata_ttl is None else ObjectRegistry(self, metadata_ttl)
+        # Tuned connection pools, astrapy defaults are used without a transport
+        self.transport = transport
+        if transport:
+            transport.install()
+        self.embeddings = embeddings or default_embedding_client()
+        self._db_lock = threading.Lock()
+        self._async_db_locks = {}
         self._initialize_database()
     
     def _initialize_database(self):
@@ -52,12 +89,20 @@ class AstraDBManager:
             self.client = DataAPIClient()
             # to keep compatibility with the old version
             if not self.astra_db_db_name:
-                db_list = self.get_dbs()
                 if self.astra_db_api_endpoint:
                     catalog_db_id = extract_db_id_from_astra_url(self.astra_db_api_endpoint)
-                    catalog_db = next((db for db in db_list if db.id == catalog_db_id), None)    
-                    self.astra_db_db_name = catalog_db.name
+                    cached_db = self.endpoint_cache.get_by_id(catalog_db_id)
+                    if cached_db:
+                        self.astra_db_db_name = cached_db["name"]
+                    else:
+                        db_list = self.get_dbs()
+                        # Persisted, so that get_db_by_name does not list the databases again
+                        self.endpoint_cache.put_databases(db_list)
+                        catalog_db = next((db for db in db_list if db.id == catalog_db_id), None)    
+                        self.astra_db_db_name = catalog_db.name
                 else:
+                    db_list = self.get_dbs()
+                    self.endpoint_cache.put_databases(db_list)
                     # If no db name or api endpoint, use the first db
                     self.astra_db_db_name = db_list[0].name
                 
@@ -67,31 +112,85 @@ class AstraDBManager:
     
     def get_db_by_name(self, db_name: str):
         if db_name not in self.db:
-            db_list = self.get_dbs()
-            self.logger.debug("db_list: %s", db_list)
-            new_db = next((db for db in db_list if db.name == db_name), None)
-            if not new_db:
-                self.logger.error(f"Database {db_name} not found.")
-                return
-            
-            self.logger.debug("new_db: %s", new_db)
-            
-            self.db[db_name] = self.client.get_database(
-                new_db.regions[0].api_endpoint,
-                token=self.astra_db_token
-            )
+            with self._db_lock:
+                if db_name not in self.db:
+                    # The DevOps API is only called when the endpoint is not cached
+                    api_endpoint = self.endpoint_cache.api_endpoint(db_name)
+                    if not api_endpoint:
+                        db_list = self.get_dbs()
+                        self.logger.debug("db_list: %s", db_list)
+                        self.endpoint_cache.put_databases(db_list)
+                        new_db = next((db for db in db_list if db.name == db_name), None)
+                        if not new_db:
+                            self.logger.error(f"Database {db_name} not found.")
+                            return
+                        
+                        self.logger.debug("new_db: %s", new_db)
+                        api_endpoint = new_db.regions[0].api_endpoint
+                    
+                    self.db[db_name] = self.client.get_database(
+                        api_endpoint,
+                        token=self.astra_db_token
+                    )
             
         return self.db[db_name]
+
+    async def get_async_db_by_name(self, db_name: str):
+        """Get the async database handle, safe under concurrent first use."""
+        if db_name in self.async_db:
+            return self.async_db[db_name]
+
+        # Only one coroutine per database resolves the endpoint
+        lock = self._async_db_locks.setdefault(db_name, asyncio.Lock())
+        async with lock:
+            if db_name not in self.async_db:
+                if db_name in self.db:
+                    self.async_db[db_name] = self.db[db_name].to_async()
+                    if self.transport:
+                        self.transport.attach(self.async_db[db_name])
+                else:
+                    api_endpoint = self.endpoint_cache.api_endpoint(db_name)
+                    if not api_endpoint:
+                        db_list = await self.get_dbs_async()
+                        self.endpoint_cache.put_databases(db_list)
+                        new_db = next((db for db in db_list if db.name == db_name), None)
+                        if not new_db:
+                            self.logger.error(f"Database {db_name} not found.")
+                            return
+                        api_endpoint = new_db.regions[0].api_endpoint
+
+                    self.async_db[db_name] = self.client.get_async_database(
+                        api_endpoint,
+                        token=self.astra_db_token
+                    )
+                    if self.transport:
+                        self.transport.attach(self.async_db[db_name])
+
+        return self.async_db[db_name]
     
+    def _on_endpoint_failure(self, db_name: str, error: Exception):
+        """Drop the cached endpoint and handles of a database that could not be reached."""
+        unreachable = isinstance(error, httpx.ConnectError) or (
+            isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 404)
+        if not unreachable:
+            return
+        self.logger.warning(f"Database {db_name} endpoint failed, it will be resolved again: {error}")
+        self.endpoint_cache.invalidate(db_name)
+        self.db.pop(db_name, None)
+        self.async_db.pop(db_name, None)
+        self.handles.invalidate(db_name)
+
     def get_dbs(self) -> [Any]:
         admin_client = self.client.get_admin(token=self.astra_db_token)
         return admin_client.list_databases()
 
+    async def get_dbs_async(self) -> [Any]:
+        admin_client = self.client.get_admin(token=self.astra_db_token)
+        return await admin_client.async_list_databases()
+
     def get_catalog_content(self, collection_name: str, tags: Optional[str] = None) -> str:
         """Get catalog content from Astra DB collection."""
-        db = self.get_db_by_name(self.astra_db_db_name)
-        self.logger.info(f"Database: {db}")
-        collection =  db.get_collection(collection_name)
+        collection = self.handles.get(self.astra_db_db_name, "collection", collection_name)
         self.logger.info(f"Getting catalog content from {collection_name} with tags: {tags}")
         result = None
         if tags:
@@ -101,8 +200,12 @@ class AstraDBManager:
         result = remove_underscore_from_dict_keys(list(result))
         return result
     
-    def setup_audit_trail(self, table_name: str):
-        """Setup audit trail for the database."""
+    def setup_audit_trail(self, table_name: str, **writer_options):
+        """Setup audit trail for the database.
+
+        Tool call events are written by a background AuditWriter, writer_options
+        are passed to it (batch_size, flush_interval, max_queue_size, overflow_policy).
+        """
         db = self.get_db_by_name(self.astra_db_db_name)
         
         tables = db.list_table_names()
@@ -114,6 +217,7 @@ class AstraDBManager:
         else:
             self.logger.info(f"Audit table {table_name} already exists")
             self.audit_table = db.get_table(table_name)
+        self.audit_writer = AuditWriter(self.audit_table.to_async(), **writer_options)
     
     def log_audit(self, 
                   tool_id: str, 
@@ -133,6 +237,73 @@ class AstraDBManager:
         if not self.audit_table:
             return
         
+        payload = self._audit_payload(tool_id=tool_id, run_id=run_id, client_id=client_id,
+                                      start_timestamp=start_timestamp, end_timestamp=end_timestamp,
+                                      keys=keys, parameters=parameters, result=result, error=error,
+                                      status=status, status_code=status_code,
+                                      status_message=status_message, status_details=status_details)
+        self.logger.debug(f"Inserting audit trail for {tool_id} with payload: {payload}")
+        self.audit_table.insert_one(payload)
+        self.logger.debug(f"Audit trail for {tool_id} inserted successfully")
+
+    async def log_audit_async(self, tool_id: str, run_id: str, **kwargs):
+        """Queue the audit trail event, it is written in batches by the audit writer."""
+        if not self.audit_writer:
+            return
+
+        payload = self._audit_payload(tool_id=tool_id, run_id=run_id, **kwargs)
+        self.logger.debug(f"Queueing audit trail for {tool_id} with payload: {payload}")
+        await self.audit_writer.submit(payload)
+
+    async def setup_replicas(self, plans: Dict[str, QueryPlan]):
+        """Load the in-memory replicas of the tools with a "replica" config."""
+        self.replicas = ReplicaManager(self)
+        self.replicas.register(plans)
+        await self.replicas.start()
+
+    async def warm_up_connections(self):
+        """Open pooled connections to the endpoints of the databases in use."""
+        if self.transport:
+            await self.transport.warm_up(db.api_endpoint for db in self.async_db.values())
+
+    async def close(self):
+        """Flush the pending audit trail rows, stop refreshing the replicas and close the connections."""
+        if self.audit_writer:
+            await self.audit_writer.close()
+        if self.replicas:
+            await self.replicas.close()
+        if self.transport:
+            await self.transport.close()
+        await self.embeddings.close()
+
+    def _find_in_replica(self, plan: QueryPlan, find_params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not self.replicas:
+            return None
+        documents = self.replicas.find(plan, find_params)
+        if documents is None:
+            return None
+        self.logger.info(f"Found {len(documents)} documents in replica of {plan.object_type} '{plan.object_name}'")
+        return {
+            "success": True,
+            "count": len(documents),
+            "documents": documents
+        }
+
+    def _audit_payload(self, 
+                       tool_id: str, 
+                       run_id: str, 
+                       client_id: Optional[str] = None, 
+                       start_timestamp: str = None, 
+                       end_timestamp: str = None,
+                       keys: List[str] = None, 
+                       parameters: Dict[str, Any] = None, 
+                       result: Dict[str, Any] = None, 
+                       error: Optional[str] = None, 
+                       status: Optional[str] = None, 
+                       status_code: Optional[int] = None, 
+                       status_message: Optional[str] = None, 
+                       status_details: Optional[str] = None) -> Dict[str, Any]:
+        """Build the audit trail row."""
         if start_timestamp:
             start_timestamp = datetime.strptime(start_timestamp, "%Y-%m-%dT%H:%M:%S.%f")
         if end_timestamp:
@@ -161,93 +332,64 @@ class AstraDBManager:
         # Remove None values from payload
         payload = {k: v for k, v in payload.items() if v is not None}
         self.logger.debug(f"Payload: {payload}")
-        self.logger.debug(f"Inserting audit trail for {tool_id} with payload: {payload}")
-        self.audit_table.insert_one(payload)
-        self.logger.debug(f"Audit trail for {tool_id} inserted successfully")
+        return payload
 
     def find(
         self,
         arguments: Optional[Dict[str, Any]] = None,
         tool_config: Optional[Dict[str, Any]] = None,
+        plan: Optional[QueryPlan] = None,
     ) -> Dict[str, Any]:
         """
         Find documents in Astra DB collection.
         """
-        try:
+        if not plan:
             if not tool_config:
                 self.logger.error("Tool config not found")
                 return json.dumps({"error": "Tool config not found"})
-            
-            # Where to run the query
-            object_type = "collection" if "collection_name" in tool_config else "table"
-            object_name = tool_config["collection_name"] if "collection_name" in tool_config else tool_config["table_name"]
-            db_name = tool_config["db_name"] if "db_name" in tool_config else self.astra_db_db_name
+            plan = QueryPlan(tool_config)
+
+        arguments = arguments or {}
+        object_type = plan.object_type
+        object_name = plan.object_name
+
+        try:
+            db_name = plan.db_name or self.astra_db_db_name
             
             self.logger.debug(f"Finding documents in '{object_type}' '{object_name}' in database '{db_name}'")
             
-            db = self.get_db_by_name(db_name)
-            target_object = None
+            filter_dict, search_query = plan.bind(arguments)
+            if not search_query:
+                result = self._find_in_replica(plan, plan.find_params(filter_dict))
+                if result:
+                    return result
 
-            if object_type == "collection":
-                target_object = db.get_collection(object_name)
-            else:
-                target_object = db.get_table(object_name)
-                
+            if plan.hybrid:
+                return json.dumps({"error": "Hybrid tools are only run by the async find"})
+
+            target_object = self.handles.get(db_name, object_type, object_name)
             if not target_object:
                 self.logger.error(f"{object_type} '{object_name}' not available.")
                 return json.dumps({"error": f"{object_type} '{object_name}' not available."})
-            
-            filter_dict = {}
-            search_query = None
-            for param in tool_config["parameters"]:
-                
-                attribute = param["attribute"] if "attribute" in param else param["param"]
-
-                if attribute == "$vector" or attribute == "$vectorize":
-                    search_query = arguments[param["param"]]
-                    continue
-
-                operator = "$eq"
-                if "operator" in param:
-                    operator = param["operator"]
-
-                if "value" in param:
-                    filter_dict[attribute] = {operator: param["value"]}
-                elif "expr" in param:
-                    filter_dict[attribute] = eval(param["expr"])
-                elif param["param"] in arguments:
-                    filter_dict[attribute] = {
-                        operator: arguments[param["param"]]}
-                    
-            # Find parameters
-            find_params = {}
-            
-            if filter_dict:
-                find_params["filter"] = filter_dict
-                
-            if tool_config["limit"]:
-                find_params["limit"] = tool_config["limit"]
-            
+
+            sort = None
             if search_query:
-                search_query_config = next((p for p in tool_config["parameters"] if p["param"] == "search_query"), None)
-                if "embedding_model" in search_query_config:
+                if plan.search_mode == SearchMode.EMBEDDING:
                     try:    
-                        embedding = generate_embedding(search_query, search_query_config["embedding_model"])
-                        find_params["sort"] = {"$vector": DataAPIVector(embedding)}
+                        embedding = self.embeddings.embed(search_query, plan.embedding_model)
+                        sort = {"$vector": DataAPIVector(embedding)}
                     except Exception as e:
                         self.logger.error(f"Failed to generate embedding: {str(e)}")
                         return json.dumps({"error": f"Failed to generate embedding: {str(e)}"})
-                elif search_query_config["attribute"] == "$vectorize":
-                    find_params["sort"] = {"$vectorize": search_query}
+                elif plan.search_mode == SearchMode.VECTORIZE:
+                    sort = {"$vectorize": search_query}
+                elif plan.search_mode == SearchMode.LEXICAL:
+                    sort = {"$lexical": search_query}
                 else:
-                    self.logger.error("Search query attribute must be $vectorize or $vector")
-                    return json.dumps({"error": "Search query attribute must be $vectorize or $vector"})
+                    self.logger.error("Search query attribute must be $vectorize, $vector or $lexical")
+                    return json.dumps({"error": "Search query attribute must be $vectorize, $vector or $lexical"})
             
-            elif "sort" in tool_config:
-                find_params["sort"] = tool_config["sort"]
-            
-            if "projection" in tool_config:
-                find_params["projection"] = tool_config["projection"]
+            find_params = plan.find_params(filter_dict, sort)
             
             self.logger.debug("find_params %s", find_params)
 
@@ -261,8 +403,273 @@ class AstraDBManager:
             }
         except Exception as e:
             self.logger.error(f"Failed to find documents in {object_type} '{object_name}': {str(e)}")
+            self._on_endpoint_failure(plan.db_name or self.astra_db_db_name, e)
             return json.dumps({"error": f"Failed to find documents: {str(e)}"})
 
+    async def find_async(
+        self,
+        arguments: Optional[Dict[str, Any]] = None,
+        tool_config: Optional[Dict[str, Any]] = None,
+        plan: Optional[QueryPlan] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, Any]:
+        """
+        Find documents in Astra DB collection using the async Data API client.
+
+        With a deadline, its remaining budget is used as the timeout of the embedding
+        and Data API requests, and DeadlineExceeded is raised when it runs out.
+        """
+        if not plan:
+            if not tool_config:
+                self.logger.error("Tool config not found")
+                return {"error": "Tool config not found"}
+            plan = QueryPlan(tool_config)
+
+        arguments = arguments or {}
+        object_type = plan.object_type
+        object_name = plan.object_name
+
+        try:
+            db_name = plan.db_name or self.astra_db_db_name
+
+            self.logger.debug(f"Finding documents in '{object_type}' '{object_name}' in database '{db_name}'")
+
+            filter_dict, search_query = plan.bind(arguments)
+            if not search_query and not plan.paginate:
+                result = self._find_in_replica(plan, plan.find_params(filter_dict))
+                if result:
+                    return result
+
+            target_object = await self.handles.get_async(db_name, object_type, object_name)
+            if not target_object:
+                return {"error": f"Database '{db_name}' not available."}
+
+            if plan.hybrid:
+                return await self._find_hybrid(target_object, plan, db_name, filter_dict, search_query, deadline)
+
+            sort = None
+            if search_query:
+                if plan.search_mode == SearchMode.EMBEDDING:
+                    try:
+                        with phase("embedding"):
+                            embedding = await self.embeddings.embed_async(
+                                search_query, plan.embedding_model,
+                                timeout=deadline.remaining_ms() / 1000 if deadline else None)
+                        sort = {"$vector": DataAPIVector(embedding)}
+                    except TIMEOUT_ERRORS:
+                        raise
+                    except Exception as e:
+                        self.logger.error(f"Failed to generate embedding: {str(e)}")
+                        return {"error": f"Failed to generate embedding: {str(e)}"}
+                elif plan.search_mode == SearchMode.VECTORIZE:
+                    sort = {"$vectorize": search_query}
+                elif plan.search_mode == SearchMode.LEXICAL:
+                    sort = {"$lexical": search_query}
+                else:
+                    self.logger.error("Search query attribute must be $vectorize, $vector or $lexical")
+                    return {"error": "Search query attribute must be $vectorize, $vector or $lexical"}
+
+            find_params = plan.find_params(filter_dict, sort)
+
+            if plan.paginate and arguments.get(PAGE_TOKEN_PARAM):
+                try:
+                    find_params["initial_page_state"] = decode_page_token(
+                        plan.name, arguments, arguments[PAGE_TOKEN_PARAM])
+                except ValueError as e:
+                    self.logger.error(f"Invalid page token for {plan.name}: {e}")
+                    return {"error": str(e)}
+
+            self.logger.debug("find_params %s", find_params)
+
+            if plan.passthrough:
+                api_commander = self._raw_commander(target_object)
+                if api_commander:
+                    return await self._find_raw(target_object, api_commander, plan, find_params, deadline)
+                self.logger.warning(f"This astrapy version does not support passthrough, "
+                                    f"the results of {plan.name} are decoded")
+
+            if deadline:
+                deadline.check()
+                find_params["request_timeout_ms"] = deadline.remaining_ms()
+            cursor = target_object.find(**find_params)
+
+            if plan.paginate:
+                # A single page, the cursor is not consumed past it
+                with phase("data_api"):
+                    page = await cursor.fetch_next_page()
+                documents = page.results
+                self.logger.info(f"Found {len(documents)} documents in {object_type} '{object_name}' page")
+                return {
+                    "success": True,
+                    "count": len(documents),
+                    "documents": documents,
+                    "next_page_token": encode_page_token(plan.name, arguments, page.next_page_state),
+                }
+
+            with phase("data_api"):
+                if deadline:
+                    documents = await cursor.to_list(timeout_ms=deadline.remaining_ms())
+                else:
+                    documents = await cursor.to_list()
+            self.logger.info(f"Found {len(documents)} documents in {object_type} '{object_name}'")
+            return {
+                "success": True,
+                "count": len(documents),
+                "documents": documents
+            }
+        except TIMEOUT_ERRORS as e:
+            if deadline:
+                self.logger.error(f"Deadline of {deadline.timeout_ms} ms exceeded finding documents in {object_type} '{object_name}'")
+                raise DeadlineExceeded(deadline.timeout_ms) from e
+            self.logger.error(f"Failed to find documents in {object_type} '{object_name}': {str(e)}")
+            return {"error": f"Failed to find documents: {str(e)}"}
+        except Exception as e:
+            self.logger.error(f"Failed to find documents in {object_type} '{object_name}': {str(e)}")
+            self._on_endpoint_failure(plan.db_name or self.astra_db_db_name, e)
+            return {"error": f"Failed to find documents: {str(e)}"}
+
+    async def _find_hybrid(self, target_object: Any, plan: QueryPlan, db_name: str, filter_dict: Dict[str, Any],
+                           search_query: Optional[str], deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Run the strategies of a hybrid tool concurrently and fuse their rankings."""
+        strategies = plan.hybrid.active(search_query)
+        projection = plan.find_options.get("projection")
+        primary_key = None
+        added_columns = ()
+        if plan.object_type == "table":
+            descriptor = await self.handles.describe(db_name, "table", plan.object_name)
+            if descriptor:
+                key_descriptor = descriptor.definition.primary_key
+                primary_key = list(key_descriptor.partition_by) + list(key_descriptor.partition_sort)
+            # Documents are deduplicated by primary key, so it has to be projected
+            if primary_key and projection and any(projection.values()):
+                added_columns = [column for column in primary_key if not projection.get(column)]
+                projection = {**projection, **{column: 1 for column in added_columns}}
+        elif projection and not projection.get("_id", 1):
+            # Documents are deduplicated by _id, returned unless the projection excludes it
+            added_columns = ["_id"]
+            projection = {**projection, "_id": 1}
+
+        results = await asyncio.gather(
+            *[self._find_strategy(target_object, plan, strategy, filter_dict, search_query, projection, deadline)
+              for strategy in strategies],
+            return_exceptions=True)
+
+        ranked = []
+        for strategy, result in zip(strategies, results):
+            if isinstance(result, TIMEOUT_ERRORS):
+                raise result
+            if isinstance(result, BaseException):
+                self.logger.error(f"Hybrid strategy {strategy.name} of {plan.name} failed: {result}")
+                continue
+            ranked.append((strategy.weight, result))
+        if not ranked:
+            return {"error": "No hybrid search strategy could be run"}
+
+        documents = reciprocal_rank_fusion(ranked, document_key(primary_key), plan.hybrid.k, plan.hybrid.limit)
+        for document in documents:
+            for column in added_columns:
+                document.pop(column, None)
+        self.logger.info(f"Found {len(documents)} documents in {plan.object_type} '{plan.object_name}' "
+                         f"with {len(ranked)} hybrid strategies")
+        return {
+            "success": True,
+            "count": len(documents),
+            "documents": documents
+        }
+
+    async def _find_strategy(self, target_object: Any, plan: QueryPlan, strategy: HybridStrategy,
+                             filter_dict: Dict[str, Any], search_query: Optional[str],
+                             projection: Optional[Dict[str, Any]], deadline: Optional[Deadline] = None) -> list:
+        """Documents found by one strategy of a hybrid tool, in rank order."""
+        strategy_filter = dict(filter_dict)
+        sort = None
+        if strategy.type == "vector":
+            if plan.search_mode == SearchMode.EMBEDDING:
+                with phase("embedding"):
+                    embedding = await self.embeddings.embed_async(
+                        search_query, plan.embedding_model,
+                        timeout=deadline.remaining_ms() / 1000 if deadline else None)
+                sort = {"$vector": DataAPIVector(embedding)}
+            else:
+                sort = {"$vectorize": search_query}
+        elif strategy.type == "lexical":
+            if strategy.attribute:
+                strategy_filter = and_filter(strategy_filter, {strategy.attribute: {"$match": search_query}})
+            else:
+                sort = {"$lexical": search_query}
+        elif strategy.type == "match":
+            strategy_filter = and_filter(strategy_filter, {strategy.attribute: {"$eq": search_query}})
+        else:
+            sort = plan.config.get("sort")
+
+        find_params = {"limit": strategy.limit}
+        if strategy_filter:
+            find_params["filter"] = strategy_filter
+        if sort:
+            find_params["sort"] = sort
+        if projection:
+            find_params["projection"] = projection
+        if deadline:
+            deadline.check()
+            find_params["request_timeout_ms"] = deadline.remaining_ms()
+
+        cursor = target_object.find(**find_params)
+        with phase("data_api"):
+            if deadline:
+                return await cursor.to_list(timeout_ms=deadline.remaining_ms())
+            return await cursor.to_list()
+
+    @staticmethod
+    def _raw_commander(target_object: Any) -> Optional[Any]:
+        """
+        The astrapy commander of a handle, when the internals used by passthrough
+        tools are there: payload preprocessors, async_client, full_path and full_headers.
+        """
+        api_commander = getattr(target_object, "_api_commander", None)
+        if preprocess_collection_payload is None or preprocess_table_payload is None \
+                or not isinstance(getattr(api_commander, "async_client", None), httpx.AsyncClient) \
+                or not isinstance(getattr(api_commander, "full_path", None), str) \
+                or not isinstance(getattr(api_commander, "full_headers", None), dict):
+            return None
+        return api_commander
+
+    async def _find_raw(self, target_object: Any, api_commander: Any, plan: QueryPlan,
+                        find_params: Dict[str, Any], deadline: Optional[Deadline] = None) -> Any:
+        """
+        Run a find and return the Data API response body without decoding it,
+        for passthrough tools. Only error responses are decoded.
+        """
+        command = {key: find_params[key] for key in ("filter", "sort", "projection") if key in find_params}
+        if "limit" in find_params:
+            command["options"] = {"limit": find_params["limit"]}
+
+        serdes_options = target_object.api_options.serdes_options
+        if plan.object_type == "collection":
+            payload = preprocess_collection_payload({"find": command}, options=serdes_options)
+        else:
+            payload = preprocess_table_payload({"find": command}, options=serdes_options, map2tuple_checker=None)
+
+        # The handle's own commander, to reuse its endpoint, headers and connection pool
+        if deadline:
+            deadline.check()
+        with phase("data_api"):
+            response = await api_commander.async_client.post(
+                api_commander.full_path,
+                content=json.dumps(payload, separators=(",", ":")),
+                headers=api_commander.full_headers,
+                timeout=deadline.remaining_ms() / 1000 if deadline else None,
+            )
+        body = response.text
+        errors = response_errors(body)
+        if response.status_code != 200 or errors:
+            errors = errors or [{"message": body}]
+            message = "; ".join(str(error.get("message", error)) for error in errors)
+            self.logger.error(f"Failed to find documents in {plan.object_type} '{plan.object_name}': {message}")
+            return {"error": f"Failed to find documents: {message}"}
+
+        self.logger.info(f"Forwarded {len(body)} bytes from {plan.object_type} '{plan.object_name}'")
+        return body
+
     def list_collections(self = None) -> str:
         """
         List all collections in the Astra DB database.
@@ -280,3 +687,23 @@ class AstraDBManager:
         except Exception as e:
             self.logger.error(f"Failed to list collections: {str(e)}")
             return json.dumps({"error": f"Failed to list collections: {str(e)}"})
+
+    async def list_collections_async(self) -> Dict[str, Any]:
+        """
+        List all collections in the Astra DB database using the async Data API client.
+        """
+        self.logger.debug("Listing all collections in Astra DB")
+
+        try:
+            db = await self.get_async_db_by_name(self.astra_db_db_name)
+            with phase("data_api"):
+                collections = await db.list_collection_names()
+            self.logger.info(f"Found {len(collections)} collections: {collections}")
+            return {
+                "success": True,
+                "collections": collections
+            }
+        except Exception as e:
+            self.logger.error(f"Failed to list collections: {str(e)}")
+            self._on_endpoint_failure(self.astra_db_db_name, e)
+            return {"error": f"Failed to list collections: {str(e)}"}
@@ -0,0 +1,55 @@
+"""
+Tool Call Deadlines
+
+A deadline is set for each tool call from the "timeout_ms" field of the tool
+config, or the server default, and can be shortened by the client with a
+"timeout_ms" entry in the _meta of the call. The remaining budget is used for
+the embedding request and for the Data API request timeouts.
+"""
+
+import time
+from typing import Any, Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a tool call runs out of time."""
+
+    def __init__(self, timeout_ms: int):
+        super().__init__(f"Deadline of {timeout_ms} ms exceeded")
+        self.timeout_ms = timeout_ms
+
+
+class Deadline:
+    """Absolute point in time by which a tool call must be done."""
+
+    __slots__ = ("timeout_ms", "expires_at")
+
+    def __init__(self, timeout_ms: int):
+        self.timeout_ms = timeout_ms
+        self.expires_at = time.monotonic() + timeout_ms / 1000
+
+    @classmethod
+    def for_call(cls, tool_timeout_ms: Optional[int], client_timeout_ms: Any = None) -> "Deadline":
+        """The tool timeout, shortened by the client budget when it is lower."""
+        timeout_ms = tool_timeout_ms
+        try:
+            if client_timeout_ms is not None and float(client_timeout_ms) > 0:
+                timeout_ms = min(timeout_ms, int(client_timeout_ms)) if timeout_ms else int(client_timeout_ms)
+        except (TypeError, ValueError):
+            pass
+        return cls(timeout_ms)
+
+    def remaining(self) -> float:
+        """Remaining time in seconds, never negative."""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def remaining_ms(self) -> int:
+        """Remaining time in milliseconds, at least 1 so it can be used as a request timeout."""
+        return max(int(self.remaining() * 1000), 1)
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self):
+        if self.expired():
+            raise DeadlineExceeded(self.timeout_ms)
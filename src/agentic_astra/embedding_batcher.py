@@ -0,0 +1,101 @@
+"""
+Embedding Micro-batching
+
+Concurrent embedding requests for the same model are collected for up to
+window_ms, or until max_batch_size texts are waiting, and sent to the provider
+as one request; the vectors are then handed back to each caller. Identical
+texts in a batch are embedded once.
+
+A caller that gives up (deadline, cancellation) does not cancel the batch of
+the others.
+"""
+
+import asyncio
+import time
+from typing import Any, List, Optional, Tuple
+from .logger import get_logger
+from .metrics import EMBEDDING_BATCH_SIZE
+
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_WINDOW_MS = 5
+
+
+class PendingBatch:
+    __slots__ = ("provider", "model", "futures", "expires_at", "timer")
+
+    def __init__(self, provider: Any, model: str):
+        self.provider = provider
+        self.model = model
+        # Futures of the callers, by text
+        self.futures = {}
+        self.expires_at = 0.0
+        self.timer = None
+
+
+class EmbeddingBatcher:
+    """Groups concurrent embedding requests into batched provider calls."""
+    logger = get_logger("embedding_batcher")
+
+    def __init__(self, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, window_ms: float = DEFAULT_WINDOW_MS):
+        self.max_batch_size = max_batch_size
+        self.window_ms = window_ms
+        self._pending = {}
+        self._tasks = set()
+
+    async def embed(self, provider: Any, text: str, model: str, timeout: Optional[float] = None) -> List[float]:
+        """Embedding of a text, sent to the provider with the other texts waiting for the same model."""
+        key = (provider.name, model)
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = PendingBatch(provider, model)
+            batch.timer = asyncio.get_running_loop().call_later(self.window_ms / 1000, self._flush, key)
+
+        future = batch.futures.get(text)
+        if future is None:
+            future = batch.futures[text] = asyncio.get_running_loop().create_future()
+            # Errors of callers that gave up are not reported as never retrieved
+            future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        # The batch gets the longest budget of its callers, each caller still stops at its own deadline
+        if timeout:
+            batch.expires_at = max(batch.expires_at, time.monotonic() + timeout)
+
+        if len(batch.futures) >= self.max_batch_size:
+            self._flush(key)
+        return await asyncio.shield(future)
+
+    def _flush(self, key: Tuple[str, str]):
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        batch.timer.cancel()
+        task = asyncio.create_task(self._send(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: PendingBatch):
+        texts = list(batch.futures)
+        timeout = batch.expires_at - time.monotonic() if batch.expires_at else None
+        EMBEDDING_BATCH_SIZE.observe(len(texts), provider=batch.provider.name)
+        self.logger.debug(f"Sending {len(texts)} texts to {batch.provider.name} model {batch.model}")
+        try:
+            vectors = await batch.provider.embed_async(texts, batch.model, max(timeout, 0.001) if timeout else None)
+            if len(vectors) != len(texts):
+                raise ValueError(f"{len(vectors)} embeddings returned for {len(texts)} texts")
+        except asyncio.CancelledError:
+            for future in batch.futures.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in batch.futures.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for text, vector in zip(texts, vectors):
+            future = batch.futures[text]
+            if not future.done():
+                future.set_result(vector)
+
+    async def close(self):
+        for key in list(self._pending):
+            self._flush(key)
+        await asyncio.gather(*self._tasks, return_exceptions=True)
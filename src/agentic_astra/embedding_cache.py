@@ -0,0 +1,172 @@
+"""
+Embedding Cache
+
+Two-level cache of the embeddings of search queries, keyed by model and
+normalized text (Unicode NFKC, surrounding and repeated whitespace removed):
+
+    memory   LRU of up to max_entries vectors
+    disk     SQLite file of up to max_disk_entries float32 vectors, kept
+             across restarts, evicted by least recent use
+
+Vectors found on disk are promoted to memory. A hit skips the round trip to
+the embedding provider.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from .logger import get_logger
+
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_MAX_DISK_ENTRIES = 1000000
+# Disk evictions are checked every so many writes
+EVICTION_CHECK_INTERVAL = 1000
+
+EmbeddingKey = Tuple[str, str]
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+class EmbeddingCache:
+    """Memory LRU of embeddings, backed by an optional SQLite file."""
+    logger = get_logger("embedding_cache")
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, path: Optional[str] = None,
+                 max_disk_entries: int = DEFAULT_MAX_DISK_ENTRIES):
+        self.max_entries = max_entries
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._db = self._open(path) if path else None
+
+    def _open(self, path: str) -> Optional[sqlite3.Connection]:
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("CREATE TABLE IF NOT EXISTS embeddings (model TEXT NOT NULL, text TEXT NOT NULL, "
+                       "vector BLOB NOT NULL, used_at REAL NOT NULL, PRIMARY KEY (model, text))")
+            db.execute("CREATE INDEX IF NOT EXISTS embeddings_used_at ON embeddings (used_at)")
+            self.logger.info(f"Embedding cache file {path} opened")
+            return db
+        except (OSError, sqlite3.Error) as e:
+            # The memory cache still works without the file
+            self.logger.error(f"Failed to open embedding cache file {path}: {e}")
+            return None
+
+    @staticmethod
+    def key(model: str, text: str) -> EmbeddingKey:
+        return (model, normalize_text(text))
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Cached embedding of a text, from memory or disk."""
+        key = self.key(model, text)
+        vector = self._memory_get(key)
+        if vector is None and self._db:
+            vector = self._disk_get(key)
+            if vector is not None:
+                self._memory_put(key, vector)
+        if vector is None:
+            self._counters["misses"] += 1
+        return vector
+
+    async def get_async(self, model: str, text: str) -> Optional[List[float]]:
+        """Cached embedding of a text, the disk is read in a worker thread."""
+        key = self.key(model, text)
+        vector = self._memory_get(key)
+        if vector is None and self._db:
+            vector = await asyncio.to_thread(self._disk_get, key)
+            if vector is not None:
+                self._memory_put(key, vector)
+        if vector is None:
+            self._counters["misses"] += 1
+        return vector
+
+    def put(self, model: str, text: str, vector: List[float]):
+        key = self.key(model, text)
+        self._memory_put(key, vector)
+        if self._db:
+            self._disk_put(key, vector)
+
+    async def put_async(self, model: str, text: str, vector: List[float]):
+        key = self.key(model, text)
+        self._memory_put(key, vector)
+        if self._db:
+            await asyncio.to_thread(self._disk_put, key, vector)
+
+    def _memory_get(self, key: EmbeddingKey) -> Optional[List[float]]:
+        vector = self._entries.get(key)
+        if vector is not None:
+            self._entries.move_to_end(key)
+            self._counters["memory_hits"] += 1
+        return vector
+
+    def _memory_put(self, key: EmbeddingKey, vector: List[float]):
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _disk_get(self, key: EmbeddingKey) -> Optional[List[float]]:
+        try:
+            with self._lock:
+                row = self._db.execute("SELECT vector FROM embeddings WHERE model = ? AND text = ?", key).fetchone()
+                if row is None:
+                    return None
+                self._db.execute("UPDATE embeddings SET used_at = ? WHERE model = ? AND text = ?",
+                                 (time.time(), *key))
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to read the embedding cache file: {e}")
+            return None
+        self._counters["disk_hits"] += 1
+        return array("f", row[0]).tolist()
+
+    def _disk_put(self, key: EmbeddingKey, vector: List[float]):
+        try:
+            with self._lock:
+                self._db.execute("INSERT OR REPLACE INTO embeddings (model, text, vector, used_at) "
+                                 "VALUES (?, ?, ?, ?)", (*key, array("f", vector).tobytes(), time.time()))
+                self._writes += 1
+                if self._writes % EVICTION_CHECK_INTERVAL == 0:
+                    self._disk_evict()
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to write the embedding cache file: {e}")
+
+    def _disk_evict(self):
+        count = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            self._db.execute("DELETE FROM embeddings WHERE rowid IN "
+                             "(SELECT rowid FROM embeddings ORDER BY used_at LIMIT ?)", (excess,))
+            self.logger.info(f"Evicted {excess} embeddings from the cache file")
+
+    def disk_entries(self) -> int:
+        if not self._db:
+            return 0
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and usage of the cache."""
+        return {**self._counters, "entries": len(self._entries)}
+
+    def close(self):
+        if self._db:
+            with self._lock:
+                self._disk_evict()
+                self._db.close()
+            self._db = None
@@ -0,0 +1,238 @@
+"""
+Embedding Client
+
+Long-lived clients of the embedding providers. Each provider reads its
+environment variables once and keeps a persistent connection pool, shared by
+every vector search, instead of opening a new connection on each call:
+
+    openai        OPENAI_API_KEY, OPENAI_BASE_URL
+    ibm-watsonx   IBM_WATSONX_BASE_URL, IBM_WATSONX_API_KEY, IBM_WATSONX_PROJECT_ID
+    local         LOCAL_EMBEDDING_MODEL_DIR (see local_embeddings)
+
+Requests rejected with 429 or 5xx, or failing to connect, are retried with
+exponential backoff and jitter (or the Retry-After of the provider), as long as
+the retry fits in the timeout of the call. Embeddings of repeated search
+queries are served from the EmbeddingCache, and concurrent requests are sent
+in batches by the EmbeddingBatcher, when they are given.
+"""
+
+import asyncio
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+from .embedding_batcher import EmbeddingBatcher
+from .embedding_cache import EmbeddingCache
+from .llm import embedding_provider
+from .local_embeddings import LocalEmbeddingProvider
+from .logger import get_logger
+
+# Seconds, used when the call has no deadline
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF = 0.2
+DEFAULT_MAX_BACKOFF = 2.0
+DEFAULT_MAX_CONNECTIONS = 20
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class EmbeddingProvider:
+    """Connection pool and request format of an embedding provider."""
+    logger = get_logger("embeddings")
+    name = None
+
+    def __init__(self, url: str, headers: Dict[str, str], max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff: float = DEFAULT_BACKOFF, max_connections: int = DEFAULT_MAX_CONNECTIONS):
+        self.url = url
+        self.max_retries = max_retries
+        self.backoff = backoff
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.client = httpx.Client(headers=headers, limits=limits)
+        self.async_client = httpx.AsyncClient(headers=headers, limits=limits)
+
+    def payload(self, texts: List[str], model: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def parse(self, data: Dict[str, Any]) -> List[List[float]]:
+        raise NotImplementedError
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response], expires_at: float) -> Optional[float]:
+        """Seconds to wait before the next attempt, None when it should not be retried."""
+        if attempt >= self.max_retries:
+            return None
+        if response is not None and response.status_code not in RETRY_STATUSES:
+            return None
+        delay = random.uniform(0, min(self.backoff * 2 ** attempt, DEFAULT_MAX_BACKOFF))
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                pass
+        # Leave some of the budget for the retried request itself
+        if time.monotonic() + delay * 2 >= expires_at:
+            return None
+        return delay
+
+    def embed(self, texts: List[str], model: str, timeout: Optional[float] = None) -> List[List[float]]:
+        """Embeddings of the texts, in the same order."""
+        expires_at = time.monotonic() + (timeout or DEFAULT_TIMEOUT)
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = self.client.post(self.url, json=self.payload(texts, model),
+                                            timeout=max(expires_at - time.monotonic(), 0.001))
+                response.raise_for_status()
+                return self.parse(response.json())
+            except (httpx.HTTPStatusError, httpx.ConnectError) as e:
+                delay = self._retry_delay(attempt, response, expires_at)
+                if delay is None:
+                    raise
+                self.logger.warning(f"{self.name} embedding request failed ({e}), retrying in {delay:.2f}s")
+            time.sleep(delay)
+            attempt += 1
+
+    async def embed_async(self, texts: List[str], model: str, timeout: Optional[float] = None) -> List[List[float]]:
+        """Embeddings of the texts, in the same order, without blocking the event loop."""
+        expires_at = time.monotonic() + (timeout or DEFAULT_TIMEOUT)
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = await self.async_client.post(self.url, json=self.payload(texts, model),
+                                                        timeout=max(expires_at - time.monotonic(), 0.001))
+                response.raise_for_status()
+                return self.parse(response.json())
+            except (httpx.HTTPStatusError, httpx.ConnectError) as e:
+                delay = self._retry_delay(attempt, response, expires_at)
+                if delay is None:
+                    raise
+                self.logger.warning(f"{self.name} embedding request failed ({e}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def close(self):
+        self.client.close()
+        await self.async_client.aclose()
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    name = "openai"
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "OpenAIEmbeddingProvider":
+        base_url = os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1"
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not base_url or not api_key:
+            raise EnvironmentError("Missing OPENAI_BASE_URL or OPENAI_API_KEY environment variables.")
+        headers = {"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"}
+        return cls(f"{base_url.rstrip('/')}/embeddings", headers, **kwargs)
+
+    def payload(self, texts: List[str], model: str) -> Dict[str, Any]:
+        return {"model": model, "input": texts}
+
+    def parse(self, data: Dict[str, Any]) -> List[List[float]]:
+        return [item["embedding"] for item in sorted(data["data"], key=lambda item: item.get("index", 0))]
+
+
+class WatsonxEmbeddingProvider(EmbeddingProvider):
+    name = "ibm-watsonx"
+
+    def __init__(self, url: str, headers: Dict[str, str], project_id: str, **kwargs):
+        super().__init__(url, headers, **kwargs)
+        self.project_id = project_id
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "WatsonxEmbeddingProvider":
+        base_url = os.getenv("IBM_WATSONX_BASE_URL")
+        api_key = os.getenv("IBM_WATSONX_API_KEY")
+        project_id = os.getenv("IBM_WATSONX_PROJECT_ID")
+        if not base_url or not api_key or not project_id:
+            raise EnvironmentError("Missing IBM_WATSONX_BASE_URL or IBM_WATSONX_API_KEY or IBM_WATSONX_PROJECT_ID "
+                                   "environment variables.")
+        headers = {"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"}
+        return cls(base_url.rstrip("/"), headers, project_id, **kwargs)
+
+    def payload(self, texts: List[str], model: str) -> Dict[str, Any]:
+        return {"model_id": model, "inputs": texts, "project_id": self.project_id}
+
+    def parse(self, data: Dict[str, Any]) -> List[List[float]]:
+        return [result["embedding"] for result in data["results"]]
+
+
+PROVIDERS = {
+    OpenAIEmbeddingProvider.name: OpenAIEmbeddingProvider,
+    WatsonxEmbeddingProvider.name: WatsonxEmbeddingProvider,
+    LocalEmbeddingProvider.name: LocalEmbeddingProvider,
+}
+
+
+class EmbeddingClient:
+    """Embedding providers by name, created on first use and kept for the life of the server."""
+    logger = get_logger("embeddings")
+
+    def __init__(self, max_retries: int = DEFAULT_MAX_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS, cache: Optional[EmbeddingCache] = None,
+                 batcher: Optional[EmbeddingBatcher] = None):
+        self.options = {"max_retries": max_retries, "backoff": backoff, "max_connections": max_connections}
+        self.providers = {}
+        self.cache = cache
+        self.batcher = batcher
+
+    def provider(self, model: str) -> Any:
+        provider_name = embedding_provider(model)
+        if provider_name not in PROVIDERS:
+            raise ValueError(f"Unsupported embedding model: {model}")
+        provider = self.providers.get(provider_name)
+        if provider is None:
+            # Missing environment variables raise, and are read again on the next call
+            provider = self.providers[provider_name] = PROVIDERS[provider_name].from_env(**self.options)
+            self.logger.info(f"Created {provider_name} embedding client")
+        return provider
+
+    def embed(self, text: str, model: str, timeout: Optional[float] = None) -> List[float]:
+        if self.cache:
+            vector = self.cache.get(model, text)
+            if vector is not None:
+                return vector
+        vector = self.provider(model).embed([text], model, timeout)[0]
+        if self.cache:
+            self.cache.put(model, text, vector)
+        return vector
+
+    async def embed_async(self, text: str, model: str, timeout: Optional[float] = None) -> List[float]:
+        if self.cache:
+            vector = await self.cache.get_async(model, text)
+            if vector is not None:
+                return vector
+        provider = self.provider(model)
+        if self.batcher:
+            vector = await self.batcher.embed(provider, text, model, timeout)
+        else:
+            vector = (await provider.embed_async([text], model, timeout))[0]
+        if self.cache:
+            await self.cache.put_async(model, text, vector)
+        return vector
+
+    async def close(self):
+        if self.batcher:
+            await self.batcher.close()
+        for provider in self.providers.values():
+            await provider.close()
+        self.providers = {}
+        if self.cache:
+            self.cache.close()
+
+
+_default_client = None
+
+
+def default_embedding_client() -> EmbeddingClient:
+    """Client shared by the module level embedding functions."""
+    global _default_client
+    if _default_client is None:
+        _default_client = EmbeddingClient()
+    return _default_client
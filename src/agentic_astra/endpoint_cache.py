@@ -0,0 +1,107 @@
+"""
+Database Endpoint Cache
+
+Database name to API endpoint resolutions, from the DevOps API, persisted to
+a local JSON file so they are reused across restarts, which matters in stdio
+mode where every client starts a new server process:
+
+    ENDPOINT_CACHE_FILE=~/.cache/agentic-astra/endpoints.json
+    ENDPOINT_CACHE_TTL=86400
+
+Entries are kept per token (by hash, the token itself is never written), and
+expire after the TTL. The DevOps API is only called on a miss, or after an
+endpoint failure invalidates the entry of a database.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+from .logger import get_logger
+
+DEFAULT_CACHE_FILE = os.path.join("~", ".cache", "agentic-astra", "endpoints.json")
+DEFAULT_TTL = 24 * 60 * 60
+
+
+class EndpointCache:
+    """Persistent cache of the database endpoints resolved with the DevOps API."""
+    logger = get_logger("endpoint_cache")
+
+    def __init__(self, token: str, path: Optional[str] = None, ttl: Optional[float] = None):
+        self.path = os.path.expanduser(path or os.getenv("ENDPOINT_CACHE_FILE") or DEFAULT_CACHE_FILE)
+        self.ttl = float(ttl if ttl is not None else os.getenv("ENDPOINT_CACHE_TTL") or DEFAULT_TTL)
+        self._token_key = hashlib.sha256((token or "").encode()).hexdigest()[:16]
+        self._lock = threading.Lock()
+        self._entries = self._read().get(self._token_key, {}) if self.enabled else {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path) as file:
+                content = json.load(file)
+            return content if isinstance(content, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable endpoint cache {self.path}: {e}")
+            return {}
+
+    def _write(self):
+        # Other tokens may share the file, their entries are kept
+        try:
+            content = self._read()
+            content[self._token_key] = self._entries
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", dir=directory, delete=False, suffix=".tmp") as file:
+                json.dump(content, file)
+            os.replace(file.name, self.path)
+        except OSError as e:
+            self.logger.warning(f"Could not write endpoint cache {self.path}: {e}")
+
+    def _fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry.get("resolved_at", 0) < self.ttl
+
+    def get(self, db_name: str) -> Optional[Dict[str, Any]]:
+        """The cached database info (id, name, regions) of a database name, if fresh."""
+        entry = self._entries.get(db_name)
+        if entry and self._fresh(entry):
+            return entry
+        return None
+
+    def get_by_id(self, db_id: str) -> Optional[Dict[str, Any]]:
+        return next((entry for entry in self._entries.values()
+                     if entry.get("id") == db_id and self._fresh(entry)), None)
+
+    def api_endpoint(self, db_name: str) -> Optional[str]:
+        entry = self.get(db_name)
+        return entry["regions"][0]["api_endpoint"] if entry and entry.get("regions") else None
+
+    def put_databases(self, databases: Iterable[Any]):
+        """Store the databases listed by the DevOps API, all of them are resolved by one call."""
+        if not self.enabled:
+            return
+        resolved_at = time.time()
+        with self._lock:
+            for database in databases:
+                self._entries[database.name] = {
+                    "id": database.id,
+                    "name": database.name,
+                    "regions": [{"name": region.name, "api_endpoint": region.api_endpoint}
+                                for region in database.regions],
+                    "resolved_at": resolved_at,
+                }
+            self._write()
+
+    def invalidate(self, db_name: str):
+        """Forget the endpoint of a database, after a failure to reach it."""
+        with self._lock:
+            if self._entries.pop(db_name, None) is not None:
+                self.logger.info(f"Invalidated cached endpoint of database {db_name}")
+                self._write()
@@ -0,0 +1,321 @@
+"""
+Parameter Expressions
+
+Sandboxed expressions of the "expr" tool parameters, a small subset of the
+Python expression syntax compiled once, when the catalog is loaded:
+
+    {"param": "since", "attribute": "created_at",
+     "expr": "{'$gte': (now() - days(7)).isoformat()}"}
+
+    literals      numbers, strings, True/False/None, lists, tuples and dicts
+    operators     + - * / // % and unary -
+    time          now(), utcnow(), today(), days(n), hours(n), minutes(n),
+                  seconds(n), weeks(n), start_of_day(dt), timedelta(...),
+                  datetime.now(), datetime.utcnow(), datetime.today(),
+                  datetime.fromisoformat(s), date.today(), date.fromisoformat(s),
+                  timezone.utc
+    functions     lower, upper, concat, str, int, float, round, abs, min,
+                  max, len
+    methods       isoformat, strftime, replace, date, timestamp, weekday,
+                  total_seconds, and lower, upper, strip, split, startswith,
+                  endswith on strings
+
+Anything else (other names, attributes, imports, comprehensions, lambdas) is
+rejected when the tool is loaded. Constant expressions are evaluated once.
+Expressions using the time are evaluated once per time bucket (1 second by
+default, "expr_bucket_seconds" in the parameter config), with every time
+function returning the start of the bucket, so the tool call hot path only
+reads the memoized value.
+"""
+
+import ast
+import operator
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+
+DEFAULT_BUCKET_SECONDS = 1.0
+MAX_SOURCE_LENGTH = 1000
+MAX_SEQUENCE_LENGTH = 10000
+
+
+class ExpressionError(ValueError):
+    """Raised when an expression is not valid or not allowed."""
+
+
+# Sizes are checked before the operations that can build large values, not after
+def _multiply(left: Any, right: Any) -> Any:
+    for sequence, count in ((left, right), (right, left)):
+        if isinstance(sequence, (str, list, tuple)) and isinstance(count, int) \
+                and len(sequence) * count > MAX_SEQUENCE_LENGTH:
+            raise ExpressionError(f"Values are limited to {MAX_SEQUENCE_LENGTH} items")
+    return left * right
+
+
+def _modulo(left: Any, right: Any) -> Any:
+    if isinstance(left, (str, bytes)):
+        raise ExpressionError("String formatting with % is not allowed")
+    return left % right
+
+
+def _string_replace(value: str, old: str, new: str, count: int = -1) -> str:
+    occurrences = value.count(old) if old else len(value) + 1
+    if count >= 0:
+        occurrences = min(occurrences, count)
+    if len(value) + occurrences * (len(new) - len(old)) > MAX_SEQUENCE_LENGTH:
+        raise ExpressionError(f"Values are limited to {MAX_SEQUENCE_LENGTH} items")
+    return value.replace(old, new, count)
+
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: _multiply,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: _modulo,
+}
+UNARY_OPERATORS = {ast.USub: operator.neg, ast.UAdd: operator.pos}
+
+METHODS = {
+    datetime: ("isoformat", "strftime", "replace", "date", "timestamp", "weekday", "isoweekday"),
+    date: ("isoformat", "strftime", "replace", "weekday", "isoweekday"),
+    timedelta: ("total_seconds",),
+    str: ("lower", "upper", "strip", "lstrip", "rstrip", "split", "startswith", "endswith", "replace"),
+}
+ATTRIBUTES = {
+    datetime: ("year", "month", "day", "hour", "minute", "second", "microsecond"),
+    date: ("year", "month", "day"),
+    timedelta: ("days", "seconds"),
+}
+
+
+class Clock:
+    """Time of one evaluation, the same for every time function of the expression."""
+
+    __slots__ = ("timestamp", "used")
+
+    def __init__(self, timestamp: float):
+        self.timestamp = timestamp
+        self.used = False
+
+    def now(self) -> datetime:
+        self.used = True
+        return datetime.fromtimestamp(self.timestamp)
+
+    def utcnow(self) -> datetime:
+        self.used = True
+        return datetime.fromtimestamp(self.timestamp, timezone.utc).replace(tzinfo=None)
+
+    def today(self) -> date:
+        self.used = True
+        return date.fromtimestamp(self.timestamp)
+
+
+def _start_of_day(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ExpressionError("start_of_day needs a datetime")
+
+
+FUNCTIONS = {
+    "days": lambda n: timedelta(days=n),
+    "hours": lambda n: timedelta(hours=n),
+    "minutes": lambda n: timedelta(minutes=n),
+    "seconds": lambda n: timedelta(seconds=n),
+    "weeks": lambda n: timedelta(weeks=n),
+    "timedelta": timedelta,
+    "start_of_day": _start_of_day,
+    "lower": lambda value: str(value).lower(),
+    "upper": lambda value: str(value).upper(),
+    "concat": lambda *values: "".join(str(value) for value in values),
+    "str": str,
+    "int": int,
+    "float": float,
+    "round": round,
+    "abs": abs,
+    "min": min,
+    "max": max,
+    "len": len,
+}
+# Time functions, reading the clock of the evaluation
+CLOCK_FUNCTIONS = {
+    "now": Clock.now,
+    "utcnow": Clock.utcnow,
+    "today": Clock.today,
+    "datetime.now": Clock.now,
+    "datetime.utcnow": Clock.utcnow,
+    "datetime.today": Clock.now,
+    "date.today": Clock.today,
+}
+QUALIFIED_FUNCTIONS = {
+    "datetime.fromisoformat": datetime.fromisoformat,
+    "date.fromisoformat": date.fromisoformat,
+}
+CONSTANTS = {"timezone.utc": timezone.utc}
+
+Evaluator = Callable[[Clock], Any]
+
+
+def _qualified_name(node: ast.AST) -> Optional[str]:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+        return f"{node.value.id}.{node.attr}"
+    return None
+
+
+def _checked(value: Any) -> Any:
+    # Results of the other operations, bounded by the size of their operands
+    if isinstance(value, (str, list, tuple)) and len(value) > MAX_SEQUENCE_LENGTH:
+        raise ExpressionError(f"Values are limited to {MAX_SEQUENCE_LENGTH} items")
+    return value
+
+
+def _method(value: Any, name: str) -> Callable:
+    if type(value) is str and name == "replace":
+        return lambda *args: _string_replace(value, *args)
+    for value_type, names in METHODS.items():
+        if type(value) is value_type and name in names:
+            return getattr(value, name)
+    raise ExpressionError(f"Method {name} is not allowed on {type(value).__name__}")
+
+
+def _attribute(value: Any, name: str) -> Any:
+    for value_type, names in ATTRIBUTES.items():
+        if type(value) is value_type and name in names:
+            return getattr(value, name)
+    raise ExpressionError(f"Attribute {name} is not allowed on {type(value).__name__}")
+
+
+def _compile_node(node: ast.AST) -> Evaluator:
+    if isinstance(node, ast.Constant):
+        value = node.value
+        if not isinstance(value, (int, float, str, bool, type(None))):
+            raise ExpressionError(f"Constant {value!r} is not allowed")
+        return lambda clock: value
+
+    if isinstance(node, (ast.List, ast.Tuple)):
+        items = [_compile_node(item) for item in node.elts]
+        sequence_type = list if isinstance(node, ast.List) else tuple
+        return lambda clock: sequence_type(item(clock) for item in items)
+
+    if isinstance(node, ast.Dict):
+        if any(key is None for key in node.keys):
+            raise ExpressionError("Dict unpacking is not allowed")
+        entries = [(_compile_node(key), _compile_node(value)) for key, value in zip(node.keys, node.values)]
+        return lambda clock: {key(clock): value(clock) for key, value in entries}
+
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        function = BINARY_OPERATORS[type(node.op)]
+        left, right = _compile_node(node.left), _compile_node(node.right)
+        return lambda clock: _checked(function(left(clock), right(clock)))
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        function = UNARY_OPERATORS[type(node.op)]
+        operand = _compile_node(node.operand)
+        return lambda clock: function(operand(clock))
+
+    if isinstance(node, ast.Call):
+        return _compile_call(node)
+
+    name = _qualified_name(node)
+    if name in CONSTANTS:
+        constant = CONSTANTS[name]
+        return lambda clock: constant
+
+    if isinstance(node, ast.Attribute):
+        target = _compile_node(node.value)
+        attribute = node.attr
+        return lambda clock: _attribute(target(clock), attribute)
+
+    raise ExpressionError(f"{name or type(node).__name__} is not allowed")
+
+
+def _compile_call(node: ast.Call) -> Evaluator:
+    if any(keyword.arg is None for keyword in node.keywords) or any(
+            isinstance(arg, ast.Starred) for arg in node.args):
+        raise ExpressionError("Argument unpacking is not allowed")
+    args = [_compile_node(arg) for arg in node.args]
+    keywords = [(keyword.arg, _compile_node(keyword.value)) for keyword in node.keywords]
+
+    def call_args(clock: Clock):
+        return [arg(clock) for arg in args], {name: value(clock) for name, value in keywords}
+
+    name = _qualified_name(node.func)
+    if name in CLOCK_FUNCTIONS:
+        if args or keywords:
+            raise ExpressionError(f"{name}() takes no arguments")
+        clock_function = CLOCK_FUNCTIONS[name]
+        return lambda clock: clock_function(clock)
+    if name in FUNCTIONS or name in QUALIFIED_FUNCTIONS:
+        function = FUNCTIONS.get(name) or QUALIFIED_FUNCTIONS[name]
+
+        def call_function(clock: Clock) -> Any:
+            positional, named = call_args(clock)
+            return _checked(function(*positional, **named))
+        return call_function
+
+    if isinstance(node.func, ast.Attribute):
+        target = _compile_node(node.func.value)
+        method_name = node.func.attr
+
+        def call_method(clock: Clock) -> Any:
+            method = _method(target(clock), method_name)
+            positional, named = call_args(clock)
+            return _checked(method(*positional, **named))
+        return call_method
+
+    raise ExpressionError(f"Function {name or ast.unparse(node.func)} is not allowed")
+
+
+class Expression:
+    """Compiled expression, memoized per time bucket."""
+
+    __slots__ = ("source", "bucket_seconds", "time_dependent", "_evaluator", "_cached")
+
+    def __init__(self, source: str, evaluator: Evaluator, bucket_seconds: float = DEFAULT_BUCKET_SECONDS):
+        self.source = source
+        self.bucket_seconds = bucket_seconds
+        self._evaluator = evaluator
+        # Evaluated once at compile time, the clock tells whether the value depends on the time
+        clock = Clock(self._bucket_start(time.time()))
+        value = evaluator(clock)
+        self.time_dependent = clock.used
+        self._cached = (self._bucket(clock.timestamp), value)
+
+    def _bucket(self, timestamp: float) -> int:
+        return int(timestamp // self.bucket_seconds)
+
+    def _bucket_start(self, timestamp: float) -> float:
+        return self._bucket(timestamp) * self.bucket_seconds
+
+    def evaluate(self) -> Any:
+        if not self.time_dependent:
+            return self._cached[1]
+        now = time.time()
+        bucket, value = self._cached
+        if bucket == self._bucket(now):
+            return value
+        value = self._evaluator(Clock(self._bucket_start(now)))
+        self._cached = (self._bucket(now), value)
+        return value
+
+
+def compile_expression(source: str, bucket_seconds: float = DEFAULT_BUCKET_SECONDS) -> Expression:
+    """Compile an expression, raising ExpressionError when it is not valid or not allowed."""
+    if not isinstance(source, str) or len(source) > MAX_SOURCE_LENGTH:
+        raise ExpressionError(f"Expressions are strings of up to {MAX_SOURCE_LENGTH} characters")
+    if not bucket_seconds or bucket_seconds <= 0:
+        raise ExpressionError("expr_bucket_seconds must be positive")
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression {source!r}: {e.msg}") from e
+    evaluator = _compile_node(tree.body)
+    try:
+        return Expression(source, evaluator, bucket_seconds)
+    except ExpressionError:
+        raise
+    except Exception as e:
+        raise ExpressionError(f"Expression {source!r} failed: {e}") from e
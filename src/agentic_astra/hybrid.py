@@ -0,0 +1,114 @@
+"""
+Hybrid Search
+
+A find tool with a "hybrid" config runs several sub-queries concurrently and
+merges them with reciprocal rank fusion (RRF):
+
+    "hybrid": {
+        "k": 60,
+        "strategies": [
+            {"type": "vector", "limit": 50},
+            {"type": "lexical", "limit": 50},
+            {"type": "match", "attribute": "name", "weight": 2},
+            {"type": "filter", "limit": 20}
+        ]
+    }
+
+Strategy types, all combined with the filter bound from the other parameters:
+
+    vector    $vector (embedding_model) or $vectorize sort by the search query
+    lexical   $lexical sort by the search query on collections, or a $match
+              filter of the text indexed "attribute" on tables
+    match     exact match of "attribute" with the search query
+    filter    the bound filter alone, in the tool "sort" order
+
+Each strategy over-fetches "limit" documents (default 3 times the tool limit).
+A document scores the sum of weight / (k + rank) over the strategies that
+found it; documents are deduplicated by _id, or by the table primary key, and
+the tool limit is applied to the fused ranking. Strategies that need a search
+query are skipped when it is not given.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_K = 60
+DEFAULT_LIMIT = 10
+OVERFETCH_FACTOR = 3
+# Data API maximum of a sorted find
+MAX_STRATEGY_LIMIT = 1000
+STRATEGY_TYPES = ("vector", "lexical", "match", "filter")
+SEARCH_STRATEGY_TYPES = ("vector", "lexical", "match")
+
+
+class HybridStrategy:
+    """One sub-query of a hybrid find."""
+
+    __slots__ = ("name", "type", "attribute", "limit", "weight")
+
+    def __init__(self, config: Dict[str, Any], default_limit: int):
+        self.type = config.get("type")
+        if self.type not in STRATEGY_TYPES:
+            raise ValueError(f"Unknown hybrid strategy type {self.type}, expected one of {', '.join(STRATEGY_TYPES)}")
+        self.attribute = config.get("attribute")
+        if self.type == "match" and not self.attribute:
+            raise ValueError("Hybrid match strategies need an attribute")
+        self.name = config.get("name") or (f"{self.type}:{self.attribute}" if self.attribute else self.type)
+        self.limit = min(int(config.get("limit") or default_limit * OVERFETCH_FACTOR), MAX_STRATEGY_LIMIT)
+        self.weight = float(config.get("weight", 1.0))
+
+    @property
+    def needs_search_query(self) -> bool:
+        return self.type in SEARCH_STRATEGY_TYPES
+
+
+class HybridConfig:
+    """Compiled "hybrid" config of a tool."""
+
+    __slots__ = ("k", "limit", "strategies")
+
+    def __init__(self, config: Dict[str, Any], limit: Optional[int]):
+        self.k = config.get("k", DEFAULT_K)
+        self.limit = limit or DEFAULT_LIMIT
+        self.strategies = tuple(HybridStrategy(strategy, self.limit) for strategy in config.get("strategies") or ())
+        if not self.strategies:
+            raise ValueError("Hybrid configs need at least one strategy")
+
+    def active(self, search_query: Optional[str]) -> Tuple[HybridStrategy, ...]:
+        """Strategies that can run for the bound arguments."""
+        return tuple(strategy for strategy in self.strategies if search_query or not strategy.needs_search_query)
+
+
+def reciprocal_rank_fusion(ranked_lists: Iterable[Tuple[float, List[Dict[str, Any]]]], key: Any,
+                           k: float = DEFAULT_K, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Fuse ranked lists of documents, given with their weight, deduplicated by key(document)."""
+    scores = {}
+    documents = {}
+    for weight, ranked in ranked_lists:
+        seen = set()
+        for rank, document in enumerate(ranked, start=1):
+            document_key = key(document)
+            # A list counts each document once, at its best rank
+            if document_key in seen:
+                continue
+            seen.add(document_key)
+            scores[document_key] = scores.get(document_key, 0.0) + weight / (k + rank)
+            documents.setdefault(document_key, document)
+    fused = sorted(scores, key=scores.get, reverse=True)
+    if limit:
+        fused = fused[:limit]
+    return [documents[document_key] for document_key in fused]
+
+
+def document_key(primary_key: Optional[Iterable[str]] = None):
+    """Dedup key of the documents, the _id of collections or the primary key columns of tables."""
+    if primary_key:
+        columns = tuple(primary_key)
+        return lambda document: tuple(repr(document.get(column)) for column in columns)
+    return lambda document: repr(document.get("_id", id(document)))
+
+
+def and_filter(filter_dict: Dict[str, Any], condition: Dict[str, Any]) -> Dict[str, Any]:
+    """Filter matching both, without overwriting a condition on the same attribute."""
+    if any(attribute in filter_dict for attribute in condition):
+        return {"$and": [filter_dict, condition]}
+    return {**filter_dict, **condition}
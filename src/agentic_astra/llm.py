@@ -16,6 +16,15 @@ EMBEDDING_PROVIDER = {
     "slate-125m-english-rtrvr": "ibm-watsonx"
 }
 
+# Models run in-process from LOCAL_EMBEDDING_MODEL_DIR, e.g. "local/all-minilm-l6-v2"
+LOCAL_MODEL_PREFIX = "local/"
+
+
+def embedding_provider(model: str) -> str:
+    if model.startswith(LOCAL_MODEL_PREFIX):
+        return "local"
+    return EMBEDDING_PROVIDER.get(model)
+
 
 def run_prompt(prompt: str) -> str:
     base_url = os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1"
@@ -38,12 +47,8 @@ def run_prompt(prompt: str) -> str:
     return response.json()
     
 def generate_embedding(text: str, model: str = "text-embedding-3-small") -> list[float]:
-    if EMBEDDING_PROVIDER[model] == "openai":
-        return generate_embedding_openai(text, model)
-    elif EMBEDDING_PROVIDER[model] == "ibm-watsonx":
-        return generate_embedding_ibm_watsonx(text, model)
-    else:
-        raise ValueError(f"Unsupported embedding model: {model}")
+    from .embeddings import default_embedding_client
+    return default_embedding_client().embed(text, model)
 
 def generate_embedding_ibm_watsonx(text: str, model: str = "granite-embedding-278m-multilingual") -> list[float]:
     """ 
@@ -53,31 +58,7 @@ def generate_embedding_ibm_watsonx(text: str, model: str = "granite-embedding-27
       - IBM_WATSONX_API_KEY: your API key
       - IBM_WATSONX_PROJECT_ID: your project ID
     """
-    base_url = os.getenv("IBM_WATSONX_BASE_URL")
-    api_key = os.getenv("IBM_WATSONX_API_KEY")
-    project_id = os.getenv("IBM_WATSONX_PROJECT_ID")
-
-    if not base_url or not api_key or not project_id:
-        raise EnvironmentError("Missing IBM_WATSONX_BASE_URL or IBM_WATSONX_API_KEY or IBM_WATSONX_PROJECT_ID environment variables.")
-
-    url = f"{base_url.rstrip('/')}"
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
-
-    payload = {
-        "model_id": model,
-        "inputs": [text],
-        "project_id": os.getenv("IBM_WATSONX_PROJECT_ID")
-    }
-
-    response = requests.post(url, headers=headers, json=payload)
-    response.raise_for_status()
-
-    data = response.json()
-    return data["results"][0]["embedding"]
+    return generate_embedding(text, model)
 
 def generate_embedding_openai(text: str, model: str = "text-embedding-3-small") -> list[float]:
     """
@@ -87,28 +68,10 @@ def generate_embedding_openai(text: str, model: str = "text-embedding-3-small")
       - OPENAI_API_KEY: your API key
       - OPENAI_BASE_URL: the base URL of the OpenAI endpoint (e.g., https://api.openai.com/v1)
     """
-    base_url = os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1"
-    api_key = os.getenv("OPENAI_API_KEY")
-
-    if not base_url or not api_key:
-        raise EnvironmentError("Missing OPENAI_BASE_URL or OPENAI_API_KEY environment variables.")
-
-    url = f"{base_url.rstrip('/')}/embeddings"
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
-
-    payload = {
-        "model": model,
-        "input": text,
-    }
-
-    response = requests.post(url, headers=headers, json=payload)
-    response.raise_for_status()
-
-    data = response.json()
-    return data["data"][0]["embedding"]
+    return generate_embedding(text, model)
 
 
+async def generate_embedding_async(text: str, model: str = "text-embedding-3-small", timeout: float = None) -> list[float]:
+    """Generate an embedding without blocking the event loop, timeout is in seconds."""
+    from .embeddings import default_embedding_client
+    return await default_embedding_client().embed_async(text, model, timeout)
@@ -5,6 +5,9 @@ from fastmcp.tools.tool_transform import ArgTransform, forward_raw
 from .database import AstraDBManager
 from fastmcp.server.dependencies import get_context
 from .logger import get_logger
+from .query_plan import compile_plans
+from .pagination import PAGE_TOKEN_PARAM
+from .run_tool import BATCH_CALLS_PARAM, DEFAULT_BATCH_MAX_CALLS
 
 class ToolLoader:
     def __init__(self, mcp: FastMCP, astra_db_manager: AstraDBManager,tools_config: dict):
@@ -13,17 +16,37 @@ class ToolLoader:
         self.tools_config = tools_config
         self.logger = get_logger("tool_loader")
         self.tools = {}
+        self.plans = {}
 
     def load_all_tools(self):
         """Load all tools into the MCP server"""
         self.logger.info("Loading all tools into MCP server")
+        # Tools whose config does not compile are not advertised, every call to them would fail
+        self.plans = compile_plans(self.tools_config)
         self.load_database_tools()
         self.logger.info("All tools loaded successfully")
 
+    def remove_tool(self, name: str):
+        """Unregister a tool and drop its query plan"""
+        try:
+            self.mcp.remove_tool(name)
+        except Exception as e:
+            self.logger.error(f"Could not remove tool {name}: {e}")
+        self.plans.pop(name, None)
+
     def load_database_tools(self):
-        """Load all database tools dynamically"""
+        """Load the database tools that have a query plan"""
         for tool_config in self.tools_config:
-            tool = self.generate_tool(config=tool_config)
+            name = tool_config.get("name")
+            if name not in self.plans:
+                self.logger.error(f"Tool {name} is not registered, its config could not be compiled")
+                continue
+            try:
+                tool = self.generate_tool(config=tool_config)
+            except Exception as e:
+                self.logger.error(f"Could not generate tool {name}: {e}")
+                self.plans.pop(name, None)
+                continue
             self.mcp.add_tool(tool)
 
     @staticmethod   
@@ -53,6 +76,30 @@ class ToolLoader:
             if "required" in param:
                 parameters["required"].append(param["param"])
 
+        if config.get("paginate"):
+            parameters.setdefault("properties", {})[PAGE_TOKEN_PARAM] = {
+                "type": "string",
+                "description": "Token returned as next_page_token by the previous call, to get the next page of results.",
+            }
+
+        if config.get("method") == "batch":
+            call_schema = {
+                "type": "object",
+                "properties": {
+                    "tool": {"type": "string", "description": "Name of the tool to call"},
+                    "arguments": {"type": "object", "description": "Arguments of the tool"},
+                },
+                "required": ["tool"],
+            }
+            if config.get("tools"):
+                call_schema["properties"]["tool"]["enum"] = config["tools"]
+            parameters.setdefault("properties", {})[BATCH_CALLS_PARAM] = {
+                "type": "array",
+                "description": "Tool calls to run concurrently, the results are returned in the same order.",
+                "items": call_schema,
+                "maxItems": config.get("max_calls", DEFAULT_BATCH_MAX_CALLS),
+            }
+            parameters["required"].append(BATCH_CALLS_PARAM)
 
         tool = Tool(
             name=config["name"],
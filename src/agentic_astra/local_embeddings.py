@@ -0,0 +1,146 @@
+"""
+Local Embedding Provider
+
+In-process CPU embeddings with ONNX Runtime (pip install agentic-astra[local]),
+for the models named "local/<model>" in the tool config:
+
+    "embedding_model": "local/all-minilm-l6-v2"
+
+Each model is a directory of LOCAL_EMBEDDING_MODEL_DIR with the exported model
+and its Hugging Face tokenizer:
+
+    all-minilm-l6-v2/model.onnx
+    all-minilm-l6-v2/tokenizer.json
+
+With LOCAL_EMBEDDING_QUANTIZED, the int8 model (model_int8.onnx) is used,
+quantized from model.onnx on first load when it does not exist. Texts are
+embedded in batches on a dedicated thread pool, so the event loop is never
+blocked; vectors are the mean of the token embeddings, L2 normalized.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional
+from .llm import LOCAL_MODEL_PREFIX
+from .logger import get_logger
+
+try:
+    import numpy as np
+    import onnxruntime
+    from tokenizers import Tokenizer
+except ImportError:  # optional dependency
+    onnxruntime = None
+
+LOCAL_PROVIDER = "local"
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+DEFAULT_THREADS = 2
+DEFAULT_MAX_TOKENS = 256
+
+
+def model_directory(base_dir: str, model: str) -> str:
+    """Directory of a local model, the name can not leave the base directory."""
+    name = model[len(LOCAL_MODEL_PREFIX):] if model.startswith(LOCAL_MODEL_PREFIX) else model
+    if not name or name != os.path.basename(name) or name in (".", ".."):
+        raise ValueError(f"Invalid local embedding model: {model}")
+    return os.path.join(base_dir, name)
+
+
+def model_file(directory: str, quantized: bool) -> str:
+    """Model file to load, quantizing the model when the int8 file does not exist yet."""
+    path = os.path.join(directory, MODEL_FILE)
+    if not quantized:
+        return path
+    quantized_path = os.path.join(directory, QUANTIZED_MODEL_FILE)
+    if not os.path.exists(quantized_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(path, quantized_path, weight_type=QuantType.QInt8)
+    return quantized_path
+
+
+class LocalModel:
+    """ONNX session and tokenizer of one model."""
+
+    def __init__(self, directory: str, quantized: bool, intra_op_threads: int, max_tokens: int):
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        self.session = onnxruntime.InferenceSession(
+            model_file(directory, quantized), options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.tokenizer = Tokenizer.from_file(os.path.join(directory, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=max_tokens)
+        self.tokenizer.enable_padding()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            inputs["token_type_ids"] = np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+
+        token_embeddings = self.session.run(None, inputs)[0]
+        mask = attention_mask[..., None].astype(token_embeddings.dtype)
+        vectors = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors.astype(np.float32).tolist()
+
+
+class LocalEmbeddingProvider:
+    """Embeddings computed on a dedicated thread pool, with the models loaded once."""
+    logger = get_logger("local_embeddings")
+    name = LOCAL_PROVIDER
+
+    def __init__(self, model_dir: str, quantized: bool = False, threads: int = DEFAULT_THREADS,
+                 max_tokens: int = DEFAULT_MAX_TOKENS):
+        if onnxruntime is None:
+            raise EnvironmentError("Local embeddings need onnxruntime, tokenizers and numpy "
+                                   "(pip install agentic-astra[local]).")
+        self.model_dir = model_dir
+        self.quantized = quantized
+        self.threads = threads
+        self.max_tokens = max_tokens
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="local-embeddings")
+        self.models = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "LocalEmbeddingProvider":
+        # The HTTP options of the remote providers do not apply
+        model_dir = os.getenv("LOCAL_EMBEDDING_MODEL_DIR")
+        if not model_dir:
+            raise EnvironmentError("Missing LOCAL_EMBEDDING_MODEL_DIR environment variable.")
+        return cls(model_dir,
+                   quantized=(os.getenv("LOCAL_EMBEDDING_QUANTIZED") or "").lower() in ("1", "true", "yes"),
+                   threads=int(os.getenv("LOCAL_EMBEDDING_THREADS") or DEFAULT_THREADS),
+                   max_tokens=int(os.getenv("LOCAL_EMBEDDING_MAX_TOKENS") or DEFAULT_MAX_TOKENS))
+
+    def model(self, model: str) -> Any:
+        loaded = self.models.get(model)
+        if loaded is None:
+            with self._lock:
+                loaded = self.models.get(model)
+                if loaded is None:
+                    # Each worker thread runs a whole batch, ONNX Runtime threads are split between them
+                    intra_op_threads = max((os.cpu_count() or 1) // self.threads, 1)
+                    loaded = self.models[model] = LocalModel(
+                        model_directory(self.model_dir, model), self.quantized, intra_op_threads, self.max_tokens)
+                    self.logger.info(f"Loaded local embedding model {model}")
+        return loaded
+
+    def embed(self, texts: List[str], model: str, timeout: Optional[float] = None) -> List[List[float]]:
+        """Embeddings of the texts, in the same order, computed in the calling thread."""
+        return self.model(model).embed(texts)
+
+    async def embed_async(self, texts: List[str], model: str, timeout: Optional[float] = None) -> List[List[float]]:
+        """Embeddings of the texts, in the same order, computed on the thread pool."""
+        work = asyncio.get_running_loop().run_in_executor(self.executor, self.embed, texts, model)
+        if timeout:
+            return await asyncio.wait_for(work, timeout)
+        return await work
+
+    async def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,252 @@
+"""
+Metrics
+
+Prometheus metrics of the tool calls, served from /metrics in http and sse
+mode. The time of each call is broken down by phase:
+
+    validation       arguments and tool lookup
+    embedding        embedding generation of the search query
+    data_api         Data API requests
+    materialization  building the result from the documents (shaping)
+    serialization    encoding the tool result
+    audit            audit trail writes
+
+Durations are labelled by tool, method, database and status, and documents
+and payload bytes returned are counted per tool.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PHASES = ("validation", "embedding", "data_api", "materialization", "serialization", "audit")
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: Iterable[str], values: Iterable[Any], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter, per label values."""
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(labels.get(name, "") for name in self.labelnames), 0)
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in self._values.items()]
+
+
+class Histogram:
+    """Cumulative histogram of observed values, per label values."""
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._values = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        counts = self._values.get(key)
+        if counts is None:
+            # One count per bucket, then the sum
+            counts = self._values[key] = [0] * len(self.buckets) + [0.0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+        counts[-1] += value
+
+    def count(self, **labels) -> int:
+        counts = self._values.get(tuple(labels.get(name, "") for name in self.labelnames))
+        return counts[-2] if counts else 0
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, counts in self._values.items():
+            for bound, count in zip(self.buckets, counts):
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(counts[-1])}")
+            lines.append(f"{self.name}_count{labels} {counts[-2]}")
+        return lines
+
+
+# A collector returns (name, type, documentation, labelnames, {label values: value})
+Sample = Tuple[str, str, str, Tuple[str, ...], Dict[Tuple[Any, ...], float]]
+
+
+class MetricsRegistry:
+    """Set of metrics rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, name: str, collector: Callable[[], List[Sample]]):
+        """Add metrics read at scrape time, such as the stats of the cache."""
+        self._collectors[name] = collector
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.render())
+        for collector in self._collectors.values():
+            for name, type_name, documentation, labelnames, values in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {type_name}")
+                for key, value in values.items():
+                    lines.append(f"{name}{_format_labels(labelnames, key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+CALL_LABELS = ("tool", "method", "database", "status")
+TOOL_CALL_SECONDS = REGISTRY.histogram(
+    "agentic_astra_tool_call_seconds", "Duration of tool calls", CALL_LABELS)
+TOOL_PHASE_SECONDS = REGISTRY.histogram(
+    "agentic_astra_tool_phase_seconds", "Duration of the phases of tool calls", CALL_LABELS + ("phase",))
+DOCUMENTS_RETURNED = REGISTRY.counter(
+    "agentic_astra_documents_returned_total", "Documents returned by tool calls", ("tool", "method", "database"))
+PAYLOAD_BYTES = REGISTRY.counter(
+    "agentic_astra_payload_bytes_total", "Bytes of the tool results sent to clients", ("tool", "method", "database"))
+EMBEDDING_BATCH_SIZE = REGISTRY.histogram(
+    "agentic_astra_embedding_batch_size", "Texts per embedding provider request", ("provider",),
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256))
+
+_current_call = ContextVar("agentic_astra_call_metrics", default=None)
+
+
+class CallMetrics:
+    """Phase timings of one tool call, recorded when the call finishes."""
+
+    __slots__ = ("tool", "method", "database", "phases", "started", "_token")
+
+    def __init__(self, tool: str, method: str = "", database: str = ""):
+        self.tool = tool
+        self.method = method
+        self.database = database
+        self.phases = {}
+        self.started = time.perf_counter()
+        self._token = None
+
+    def __enter__(self) -> "CallMetrics":
+        self._token = _current_call.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _current_call.reset(self._token)
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+    def finish(self, status: str, documents: int = 0, payload_bytes: int = 0):
+        labels = {"tool": self.tool, "method": self.method, "database": self.database}
+        TOOL_CALL_SECONDS.observe(time.perf_counter() - self.started, status=status, **labels)
+        for name, seconds in self.phases.items():
+            TOOL_PHASE_SECONDS.observe(seconds, status=status, phase=name, **labels)
+        if documents:
+            DOCUMENTS_RETURNED.inc(documents, **labels)
+        if payload_bytes:
+            PAYLOAD_BYTES.inc(payload_bytes, **labels)
+
+
+@contextmanager
+def phase(name: str):
+    """Time a phase of the current tool call, if there is one."""
+    call = _current_call.get()
+    if call is None:
+        yield
+        return
+    with call.phase(name):
+        yield
+
+
+def cache_collector(result_cache: Any) -> Callable[[], List[Sample]]:
+    """Metrics of the result cache stats."""
+    def collect() -> List[Sample]:
+        stats = result_cache.stats()
+        samples = [
+            ("agentic_astra_cache_entries", "gauge", "Entries in the result cache", (), {(): stats["entries"]}),
+            ("agentic_astra_cache_bytes", "gauge", "Bytes used by the result cache", (), {(): stats["bytes"]}),
+        ]
+        for counter in ("hits", "stale_hits", "misses", "evictions"):
+            values = {(tool,): counters[counter] for tool, counters in stats["tools"].items()}
+            samples.append((f"agentic_astra_cache_{counter}_total", "counter",
+                            f"Result cache {counter.replace('_', ' ')}", ("tool",), values))
+        return samples
+    return collect
+
+
+def admission_collector(admission: Any) -> Callable[[], List[Sample]]:
+    """Metrics of the admission controller stats."""
+    def collect() -> List[Sample]:
+        stats = admission.stats()
+        return [
+            ("agentic_astra_active_calls", "gauge", "Tool calls running", (), {(): stats["active"]}),
+            ("agentic_astra_queued_calls", "gauge", "Tool calls waiting for a slot", (), {(): stats["queued"]}),
+            ("agentic_astra_shed_calls_total", "counter", "Tool calls shed by admission control", (),
+             {(): stats["shed"]}),
+        ]
+    return collect
+
+
+def embedding_cache_collector(embedding_cache: Any) -> Callable[[], List[Sample]]:
+    """Metrics of the embedding cache stats."""
+    def collect() -> List[Sample]:
+        stats = embedding_cache.stats()
+        return [
+            ("agentic_astra_embedding_cache_entries", "gauge", "Embeddings in the memory cache", (),
+             {(): stats["entries"]}),
+            ("agentic_astra_embedding_cache_lookups_total", "counter", "Embedding cache lookups by result",
+             ("result",), {(result,): stats[result] for result in ("memory_hits", "disk_hits", "misses")}),
+            ("agentic_astra_embedding_cache_evictions_total", "counter", "Embeddings evicted from the memory cache",
+             (), {(): stats["evictions"]}),
+        ]
+    return collect
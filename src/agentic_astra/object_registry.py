@@ -0,0 +1,141 @@
+"""
+Object Handle Registry
+
+Collection and table handles are created once and reused by every tool call,
+instead of on each find. At startup, every target of the catalog
+(db_name, collection_name or table_name) is checked in parallel, so
+misconfigured tools are reported before traffic arrives.
+
+Table and collection metadata (the descriptors listed by the Data API) are
+cached per database for metadata_ttl seconds.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional, Tuple
+from .logger import get_logger
+
+DEFAULT_METADATA_TTL = 300
+TARGET_METHODS = ("find", "find_documents")
+
+ObjectKey = Tuple[str, str, str]
+
+
+class ObjectRegistry:
+    """Cache of the collection and table handles, and of their metadata."""
+    logger = get_logger("object_registry")
+
+    def __init__(self, astra_db_manager: Any, metadata_ttl: float = DEFAULT_METADATA_TTL):
+        self.astra_db_manager = astra_db_manager
+        self.metadata_ttl = metadata_ttl
+        self._handles = {}
+        self._async_handles = {}
+        self._metadata = {}
+        self._metadata_locks = {}
+
+    @staticmethod
+    def _handle(db: Any, object_type: str, object_name: str) -> Any:
+        return db.get_collection(object_name) if object_type == "collection" else db.get_table(object_name)
+
+    def get(self, db_name: str, object_type: str, object_name: str) -> Any:
+        """Handle of a collection or table, None when the database is not available."""
+        key = (db_name, object_type, object_name)
+        handle = self._handles.get(key)
+        if handle is None:
+            db = self.astra_db_manager.get_db_by_name(db_name)
+            if not db:
+                return None
+            handle = self._handles[key] = self._handle(db, object_type, object_name)
+        return handle
+
+    async def get_async(self, db_name: str, object_type: str, object_name: str) -> Any:
+        """Async handle of a collection or table, None when the database is not available."""
+        key = (db_name, object_type, object_name)
+        handle = self._async_handles.get(key)
+        if handle is None:
+            db = await self.astra_db_manager.get_async_db_by_name(db_name)
+            if not db:
+                return None
+            handle = self._handle(db, object_type, object_name)
+            transport = getattr(self.astra_db_manager, "transport", None)
+            if transport:
+                transport.attach(handle)
+            self._async_handles[key] = handle
+        return handle
+
+    async def metadata(self, db_name: str) -> Dict[str, Dict[str, Any]]:
+        """Descriptors of the collections and tables of a database, by name."""
+        cached = self._metadata.get(db_name)
+        if cached and time.monotonic() - cached[0] < self.metadata_ttl:
+            return cached[1]
+
+        lock = self._metadata_locks.setdefault(db_name, asyncio.Lock())
+        async with lock:
+            cached = self._metadata.get(db_name)
+            if cached and time.monotonic() - cached[0] < self.metadata_ttl:
+                return cached[1]
+
+            db = await self.astra_db_manager.get_async_db_by_name(db_name)
+            if not db:
+                raise LookupError(f"Database '{db_name}' not found")
+            collections, tables = await asyncio.gather(db.list_collections(), db.list_tables())
+            metadata = {
+                "collection": {descriptor.name: descriptor for descriptor in collections},
+                "table": {descriptor.name: descriptor for descriptor in tables},
+            }
+            self._metadata[db_name] = (time.monotonic(), metadata)
+            return metadata
+
+    async def describe(self, db_name: str, object_type: str, object_name: str) -> Optional[Any]:
+        """Descriptor of a collection or table, None when it does not exist."""
+        metadata = await self.metadata(db_name)
+        return metadata[object_type].get(object_name)
+
+    async def validate(self, plans: Dict[str, Any]) -> Dict[str, str]:
+        """Check that the targets of the tools exist and create their handles.
+
+        Returns the problems found, by tool name.
+        """
+        default_db_name = self.astra_db_manager.astra_db_db_name
+        problems = {}
+        targets = {}
+        for plan in plans.values():
+            if plan.method not in TARGET_METHODS:
+                continue
+            if not plan.object_name:
+                problems[plan.name] = "No collection_name or table_name"
+                continue
+            key = (plan.db_name or default_db_name, plan.object_type, plan.object_name)
+            targets.setdefault(key, []).append(plan.name)
+
+        keys = list(targets)
+        errors = await asyncio.gather(*[self._validate_target(key) for key in keys])
+        for key, error in zip(keys, errors):
+            if error:
+                for tool_name in targets[key]:
+                    problems[tool_name] = error
+
+        for tool_name, problem in problems.items():
+            self.logger.error(f"Tool {tool_name} is misconfigured: {problem}")
+        self.logger.info(f"Validated {len(keys)} catalog targets, {len(problems)} misconfigured tools")
+        return problems
+
+    async def _validate_target(self, key: ObjectKey) -> Optional[str]:
+        db_name, object_type, object_name = key
+        try:
+            if await self.describe(db_name, object_type, object_name) is None:
+                return f"{object_type.capitalize()} '{object_name}' not found in database '{db_name}'"
+            await self.get_async(db_name, object_type, object_name)
+        except Exception as e:
+            return f"Could not check {object_type} '{object_name}' in database '{db_name}': {e}"
+        return None
+
+    def invalidate(self, db_name: Optional[str] = None):
+        """Drop the handles and metadata of a database, or of all of them."""
+        for cache in (self._handles, self._async_handles):
+            for key in [key for key in cache if db_name is None or key[0] == db_name]:
+                del cache[key]
+        if db_name is None:
+            self._metadata.clear()
+        else:
+            self._metadata.pop(db_name, None)
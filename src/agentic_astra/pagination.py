@@ -0,0 +1,43 @@
+"""
+Find Pagination
+
+Tools with "paginate": true return one Data API page per call, together with an
+opaque next_page_token. Passing the token back in the page_token argument
+returns the following page. Tokens wrap the Data API page state and are bound
+to the tool and the other arguments of the call they came from.
+"""
+
+import base64
+import hashlib
+import json
+from typing import Any, Dict, Optional
+from .utils import canonical_arguments
+
+PAGE_TOKEN_PARAM = "page_token"
+
+
+def _query_hash(tool_name: str, arguments: Optional[Dict[str, Any]]) -> str:
+    arguments = {k: v for k, v in (arguments or {}).items() if k != PAGE_TOKEN_PARAM}
+    digest = hashlib.sha256(f"{tool_name}:{canonical_arguments(arguments)}".encode())
+    return digest.hexdigest()[:16]
+
+
+def encode_page_token(tool_name: str, arguments: Optional[Dict[str, Any]], page_state: Optional[str]) -> Optional[str]:
+    """Wrap a Data API page state in an opaque token, None when there are no more pages."""
+    if not page_state:
+        return None
+    payload = json.dumps({"q": _query_hash(tool_name, arguments), "s": page_state}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_page_token(tool_name: str, arguments: Optional[Dict[str, Any]], token: str) -> str:
+    """Return the Data API page state of a token, raising ValueError if it is not valid for the call."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        query_hash, page_state = payload["q"], payload["s"]
+    except Exception:
+        raise ValueError("Invalid page token")
+    if query_hash != _query_hash(tool_name, arguments):
+        raise ValueError("Page token does not belong to this query")
+    return page_state
@@ -0,0 +1,238 @@
+"""
+Index-aware Query Planning
+
+At startup, the primary key and indexes of the target of every find tool are
+read, and each combination of the tool parameters (constant, expression and
+required parameters always, optional ones present or not) is classified:
+
+    partition_lookup   the whole partition key (or _id) is matched
+    indexed            every filtered column is indexed, or the search query
+                       uses the vector index
+    full_scan          a filtered column is not indexed, or nothing is
+                       filtered nor searched
+
+Tools with a full scan combination are handled by the scan policy, set with
+SCAN_POLICY or per tool with "scan_policy" in the tool config:
+
+    warn            log a warning (default)
+    require_limit   refuse the tool unless it has a "limit" or is paginated
+    refuse          refuse the tool, it is not registered
+"""
+
+import asyncio
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from astrapy.info import TableIndexType
+from .logger import get_logger
+from .query_plan import QueryPlan, SearchMode
+
+PARTITION_LOOKUP = "partition_lookup"
+INDEXED = "indexed"
+FULL_SCAN = "full_scan"
+ACCESS_ORDER = (PARTITION_LOOKUP, INDEXED, FULL_SCAN)
+
+SCAN_POLICIES = ("warn", "require_limit", "refuse")
+DEFAULT_SCAN_POLICY = "warn"
+PLANNED_METHODS = ("find", "find_documents")
+EQUALITY_OPERATORS = ("$eq", "$in")
+# Operator of the expressions that could not be evaluated, planned like a range
+UNKNOWN_OPERATOR = "$unknown"
+# Above this many optional parameters, only none, each one alone and all of them are classified
+MAX_ENUMERATED_PARAMS = 10
+
+Condition = Tuple[str, str]
+
+
+def indexed_columns(table_indexes: Iterable[Any], index_type: TableIndexType = TableIndexType.REGULAR) -> List[str]:
+    """Columns of the indexes of a type, map column indexes are given as {column: "$keys"}."""
+    columns = []
+    for index in table_indexes:
+        if index.index_type == index_type:
+            column = index.definition.column
+            columns.append(next(iter(column)) if isinstance(column, dict) else column)
+    return columns
+
+
+class TargetSchema:
+    """Primary key and indexed fields of a table or collection."""
+
+    __slots__ = ("object_type", "partition_by", "partition_sort", "indexed", "text_indexed", "indexing")
+
+    def __init__(self, object_type: str, partition_by: Iterable[str] = (), partition_sort: Iterable[str] = (),
+                 indexed: Iterable[str] = (), text_indexed: Iterable[str] = (),
+                 indexing: Optional[Dict[str, Any]] = None):
+        self.object_type = object_type
+        self.partition_by = tuple(partition_by)
+        self.partition_sort = tuple(partition_sort)
+        self.indexed = set(indexed)
+        self.text_indexed = set(text_indexed)
+        # Collection "indexing" option, {"allow": [...]} or {"deny": [...]}
+        self.indexing = indexing or {}
+
+    def is_indexed(self, attribute: str, operator: str) -> bool:
+        if self.object_type == "collection":
+            if attribute == "_id":
+                return True
+            allow = self.indexing.get("allow")
+            if allow is not None:
+                return "*" in allow or any(_covers(path, attribute) for path in allow)
+            return not any(_covers(path, attribute) for path in self.indexing.get("deny") or ())
+        if operator == "$match":
+            return attribute in self.text_indexed
+        return attribute in self.indexed
+
+    def classify(self, conditions: Iterable[Condition], searched: bool) -> str:
+        """Access path of a find with the filter conditions, and a vector or lexical search."""
+        conditions = [(attribute, operator) for attribute, operator in conditions if not attribute.startswith("$")]
+        if not conditions:
+            return INDEXED if searched else FULL_SCAN
+
+        matched = {attribute for attribute, operator in conditions if operator in EQUALITY_OPERATORS}
+        key = self.partition_by if self.object_type == "table" else ("_id",)
+        if key and set(key) <= matched and all(
+                attribute in key or attribute in self.partition_sort or self.is_indexed(attribute, operator)
+                for attribute, operator in conditions):
+            return PARTITION_LOOKUP
+        if all(self.is_indexed(attribute, operator) for attribute, operator in conditions):
+            return INDEXED
+        return FULL_SCAN
+
+
+def _covers(path: str, attribute: str) -> bool:
+    return attribute == path or attribute.startswith(path + ".")
+
+
+def _operator(condition: Any) -> str:
+    """Operator of a filter condition, the first key of an operator dict, otherwise $eq."""
+    if isinstance(condition, dict) and condition:
+        operator = next(iter(condition))
+        return operator if isinstance(operator, str) and operator.startswith("$") else "$eq"
+    return "$eq"
+
+
+def _expression_operator(expr: Any) -> str:
+    """Operator of the condition an expression compiles to, a range when it can not be evaluated."""
+    try:
+        return _operator(expr.evaluate())
+    except Exception:
+        return UNKNOWN_OPERATOR
+
+
+def parameter_combinations(plan: QueryPlan) -> List[Tuple[Tuple[str, ...], List[Condition], bool]]:
+    """Each combination of the optional parameters, with its filter conditions and whether it searches."""
+    always = [(attribute, _operator(condition)) for attribute, condition in plan.filter_template.items()]
+    optional = []
+    for binder in plan.binders:
+        operator = binder.operator if binder.expr is None else _expression_operator(binder.expr)
+        if binder.expr is not None or binder.param in plan.required_params:
+            always.append((binder.attribute, operator))
+        else:
+            optional.append((binder.param, (binder.attribute, operator)))
+    search_required = plan.search_param in plan.required_params
+    if plan.search_param and not search_required:
+        optional.append((plan.search_param, None))
+
+    names = [name for name, _ in optional]
+    if len(names) <= MAX_ENUMERATED_PARAMS:
+        subsets = [subset for size in range(len(names) + 1) for subset in combinations(names, size)]
+    else:
+        subsets = [()] + [(name,) for name in names] + [tuple(names)]
+
+    by_name = dict(optional)
+    result = []
+    for subset in subsets:
+        conditions = always + [by_name[name] for name in subset if by_name[name]]
+        searched = bool(plan.search_param) and (search_required or plan.search_param in subset)
+        result.append((subset, conditions, searched))
+    return result
+
+
+class IndexPlanner:
+    """Classifies the access path of the find tools and applies the scan policy."""
+    logger = get_logger("planner")
+
+    def __init__(self, astra_db_manager: Any, scan_policy: str = DEFAULT_SCAN_POLICY):
+        if scan_policy not in SCAN_POLICIES:
+            raise ValueError(f"Invalid scan policy {scan_policy}, expected one of {', '.join(SCAN_POLICIES)}")
+        self.astra_db_manager = astra_db_manager
+        self.scan_policy = scan_policy
+
+    async def schema(self, db_name: str, object_type: str, object_name: str) -> Optional[TargetSchema]:
+        handles = self.astra_db_manager.handles
+        descriptor = await handles.describe(db_name, object_type, object_name)
+        if descriptor is None:
+            return None
+        if object_type == "collection":
+            return TargetSchema(object_type, indexing=descriptor.definition.indexing)
+        table = await handles.get_async(db_name, object_type, object_name)
+        indexes = await table.list_indexes()
+        primary_key = descriptor.definition.primary_key
+        return TargetSchema(object_type,
+                            partition_by=primary_key.partition_by,
+                            partition_sort=primary_key.partition_sort,
+                            indexed=indexed_columns(indexes, TableIndexType.REGULAR),
+                            text_indexed=indexed_columns(indexes, TableIndexType.TEXT))
+
+    @staticmethod
+    def analyze(plan: QueryPlan, schema: TargetSchema) -> Dict[str, Any]:
+        """Access path of every parameter combination of a tool, and the worst of them."""
+        searchable = plan.search_mode != SearchMode.INVALID
+        access = {}
+        for subset, conditions, searched in parameter_combinations(plan):
+            access[subset] = schema.classify(conditions, searched and searchable)
+        worst = max(access.values(), key=ACCESS_ORDER.index)
+        return {
+            "access": worst,
+            "full_scans": [list(subset) for subset, path in access.items() if path == FULL_SCAN],
+            "combinations": len(access),
+        }
+
+    def action(self, plan: QueryPlan, analysis: Dict[str, Any]) -> str:
+        """ok, warn or refuse, by the scan policy of the tool."""
+        if analysis["access"] != FULL_SCAN:
+            return "ok"
+        policy = plan.config.get("scan_policy") or self.scan_policy
+        if policy == "refuse" or (policy == "require_limit" and not plan.config.get("limit") and not plan.paginate):
+            return "refuse"
+        return "warn"
+
+    async def check(self, plans: Dict[str, QueryPlan]) -> Dict[str, Dict[str, Any]]:
+        """Classify the find tools, returning the report of each one by tool name."""
+        default_db_name = self.astra_db_manager.astra_db_db_name
+        targets = {}
+        for plan in plans.values():
+            if plan.method in PLANNED_METHODS and plan.object_name:
+                key = (plan.db_name or default_db_name, plan.object_type, plan.object_name)
+                targets.setdefault(key, []).append(plan)
+
+        keys = list(targets)
+        schemas = await asyncio.gather(*[self.schema(*key) for key in keys], return_exceptions=True)
+        report = {}
+        for key, schema in zip(keys, schemas):
+            if schema is None or isinstance(schema, BaseException):
+                # Missing or unreachable targets are reported by the handle registry
+                self.logger.debug(f"Could not read the indexes of {key[1]} '{key[2]}': {schema}")
+                continue
+            for plan in targets[key]:
+                analysis = self.analyze(plan, schema)
+                analysis["action"] = self.action(plan, analysis)
+                report[plan.name] = analysis
+                self._log(plan, analysis)
+
+        refused = [name for name, analysis in report.items() if analysis["action"] == "refuse"]
+        self.logger.info(f"Planned {len(report)} tools, {len(refused)} refused for full scans")
+        return report
+
+    def _log(self, plan: QueryPlan, analysis: Dict[str, Any]):
+        if analysis["action"] == "ok":
+            self.logger.debug(f"Tool {plan.name}: {analysis['access']}")
+            return
+        combinations_text = "; ".join(", ".join(subset) or "no optional parameters"
+                                      for subset in analysis["full_scans"][:5])
+        message = (f"Tool {plan.name} does a full scan of {plan.object_type} '{plan.object_name}' "
+                   f"with {combinations_text}")
+        if analysis["action"] == "refuse":
+            self.logger.error(f"{message}, it is not registered")
+        else:
+            self.logger.warning(message)
@@ -0,0 +1,196 @@
+"""
+Tool Query Plans
+
+Compiles tool configs into query plans once, when the tools are loaded, so the
+tool call hot path only has to bind the call arguments.
+"""
+
+import itertools
+from typing import Any, Dict, List, Optional, Tuple
+from .expressions import DEFAULT_BUCKET_SECONDS, compile_expression
+from .hybrid import HybridConfig
+from .logger import get_logger
+
+logger = get_logger("query_plan")
+
+VECTOR_ATTRIBUTES = ("$vector", "$vectorize")
+# Parameters holding the search query of the tool
+SEARCH_ATTRIBUTES = VECTOR_ATTRIBUTES + ("$lexical",)
+# Every compiled plan gets a new version, so the results of a reloaded tool are not mixed up
+_plan_versions = itertools.count(1)
+
+class SearchMode:
+    EMBEDDING = "embedding"
+    VECTORIZE = "vectorize"
+    LEXICAL = "lexical"
+    INVALID = "invalid"
+
+
+class ParamBinder:
+    """Binds a single tool parameter into the filter of a call."""
+
+    __slots__ = ("param", "attribute", "operator", "expr")
+
+    def __init__(self, param: str, attribute: str, operator: str = "$eq", expr: Any = None):
+        self.param = param
+        self.attribute = attribute
+        self.operator = operator
+        self.expr = expr
+
+    def bind(self, filter_dict: Dict[str, Any], arguments: Dict[str, Any]):
+        if self.expr is not None:
+            filter_dict[self.attribute] = self.expr.evaluate()
+        elif self.param in arguments:
+            filter_dict[self.attribute] = {self.operator: arguments[self.param]}
+
+
+class QueryPlan:
+    """Precomputed execution plan of a tool config."""
+
+    __slots__ = (
+        "name",
+        "version",
+        "method",
+        "config",
+        "object_type",
+        "object_name",
+        "db_name",
+        "required_params",
+        "filter_template",
+        "binders",
+        "search_param",
+        "search_mode",
+        "embedding_model",
+        "find_options",
+        "cache_config",
+        "timeout_ms",
+        "paginate",
+        "response_config",
+        "passthrough",
+        "hybrid",
+    )
+
+    def __init__(self, tool_config: Dict[str, Any]):
+        self.name = tool_config["name"]
+        self.version = next(_plan_versions)
+        self.method = tool_config.get("method")
+        self.config = tool_config
+
+        # Where to run the query
+        self.object_type = "collection" if "collection_name" in tool_config else "table"
+        self.object_name = tool_config.get("collection_name") or tool_config.get("table_name")
+        self.db_name = tool_config.get("db_name")
+        self.cache_config = tool_config.get("cache")
+        self.timeout_ms = tool_config.get("timeout_ms")
+        self.paginate = bool(tool_config.get("paginate"))
+        self.response_config = tool_config.get("response")
+        # Raw Data API responses can only be forwarded when nothing reshapes them
+        self.passthrough = bool(tool_config.get("passthrough")) and not self.response_config and not self.paginate
+
+        parameters = tool_config.get("parameters") or []
+        self.required_params = tuple(
+            p["param"] for p in parameters if p.get("required", False) == True)
+
+        self.filter_template = {}
+        self.search_param = None
+        self.search_mode = None
+        self.embedding_model = None
+        binders = []
+
+        for param in parameters:
+            attribute = param["attribute"] if "attribute" in param else param["param"]
+
+            if attribute in SEARCH_ATTRIBUTES:
+                self.search_param = param["param"]
+                if "embedding_model" in param:
+                    self.search_mode = SearchMode.EMBEDDING
+                    self.embedding_model = param["embedding_model"]
+                elif attribute == "$vectorize":
+                    self.search_mode = SearchMode.VECTORIZE
+                elif attribute == "$lexical":
+                    self.search_mode = SearchMode.LEXICAL
+                else:
+                    self.search_mode = SearchMode.INVALID
+                continue
+
+            operator = param.get("operator", "$eq")
+
+            if "value" in param:
+                # Constants are bound once, in the filter template
+                self.filter_template[attribute] = {operator: param["value"]}
+            elif "expr" in param:
+                binders.append(ParamBinder(
+                    param["param"], attribute,
+                    expr=compile_expression(param["expr"],
+                                            param.get("expr_bucket_seconds", DEFAULT_BUCKET_SECONDS))))
+            else:
+                binders.append(ParamBinder(param["param"], attribute, operator))
+
+        self.binders = tuple(binders)
+
+        # Static find options, paginated tools return whole Data API pages, unless sorted (see find_params)
+        self.find_options = {}
+        if tool_config.get("limit") and not self.paginate:
+            self.find_options["limit"] = tool_config["limit"]
+        if "projection" in tool_config:
+            self.find_options["projection"] = tool_config["projection"]
+
+        self.hybrid = None
+        if tool_config.get("hybrid"):
+            self._compile_hybrid(tool_config["hybrid"], tool_config.get("limit"))
+
+    def _compile_hybrid(self, hybrid_config: Dict[str, Any], limit: Optional[int]):
+        if self.paginate:
+            raise ValueError("Hybrid tools can not be paginated")
+        self.hybrid = HybridConfig(hybrid_config, limit)
+        self.passthrough = False
+        for strategy in self.hybrid.strategies:
+            if strategy.needs_search_query and not self.search_param:
+                raise ValueError(f"Hybrid strategy {strategy.name} needs a $vector, $vectorize or $lexical parameter")
+            if strategy.type == "vector" and self.search_mode not in (SearchMode.EMBEDDING, SearchMode.VECTORIZE):
+                raise ValueError("Hybrid vector strategies need an embedding_model or a $vectorize parameter")
+            if strategy.type == "lexical" and self.object_type == "table" and not strategy.attribute:
+                raise ValueError("Hybrid lexical strategies on tables need the text indexed attribute")
+
+    def missing_required(self, arguments: Dict[str, Any]) -> Optional[str]:
+        """Return the first required parameter missing from the arguments."""
+        for param in self.required_params:
+            if param not in arguments:
+                return param
+        return None
+
+    def bind(self, arguments: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Bind the call arguments, returning the filter and the search query."""
+        filter_dict = dict(self.filter_template)
+        for binder in self.binders:
+            binder.bind(filter_dict, arguments)
+
+        search_query = arguments.get(self.search_param) if self.search_param else None
+        return filter_dict, search_query
+
+    def find_params(self, filter_dict: Dict[str, Any], sort: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Build the find parameters for a bound filter."""
+        find_params = dict(self.find_options)
+        if filter_dict:
+            find_params["filter"] = filter_dict
+        if sort:
+            find_params["sort"] = sort
+        elif "sort" in self.config:
+            find_params["sort"] = self.config["sort"]
+        # Sorted finds (vector, $vectorize, $lexical) return a single page without page state,
+        # the tool limit keeps it small
+        if self.paginate and "sort" in find_params and self.config.get("limit"):
+            find_params["limit"] = self.config["limit"]
+        return find_params
+
+
+def compile_plans(tools_config: List[Dict[str, Any]]) -> Dict[str, QueryPlan]:
+    """Compile the tool configs into query plans indexed by tool name."""
+    plans = {}
+    for tool_config in tools_config:
+        try:
+            plans[tool_config["name"]] = QueryPlan(tool_config)
+        except Exception as e:
+            logger.error(f"Could not compile tool {tool_config.get('name')}: {e}")
+    logger.info(f"Compiled {len(plans)} query plans")
+    return plans
@@ -0,0 +1,324 @@
+"""
+In-memory Replicas
+
+Small, slowly changing tables and collections can be pinned in memory with the
+"replica" field of the tool config:
+
+    "replica": {"refresh_interval": 300, "max_documents": 50000}
+
+The whole table or collection is loaded at startup and reloaded every
+refresh_interval seconds. Fields filtered by the tool parameters get a hash
+index and a sorted index, and finds are then evaluated locally: $eq, $in,
+$gt, $gte, $lt and $lte filters, projection and limit. Other finds, such as
+vector searches or sorted finds, still go to the Data API.
+"""
+
+import asyncio
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from astrapy.data_types import DataAPIDate, DataAPITimestamp
+from astrapy.ids import ObjectId
+from .logger import get_logger
+
+DEFAULT_REFRESH_INTERVAL = 300
+DEFAULT_MAX_DOCUMENTS = 50000
+RANGE_OPERATORS = ("$gt", "$gte", "$lt", "$lte")
+SUPPORTED_OPERATORS = ("$eq", "$in") + RANGE_OPERATORS
+
+_MISSING = object()
+
+
+def _normalize(value: Any) -> Any:
+    """Comparable, hashable form of a value, the same for a column and a filter value."""
+    if isinstance(value, (UUID, ObjectId)):
+        return str(value)
+    if isinstance(value, DataAPITimestamp):
+        return value.to_datetime(tz=timezone.utc)
+    if isinstance(value, DataAPIDate):
+        return value.to_date()
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _category(value: Any) -> Optional[str]:
+    """Values of the same category can be ordered together."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, datetime):
+        return "datetime"
+    if isinstance(value, date):
+        return "date"
+    return None
+
+
+def _hash_key(value: Any) -> Tuple[Optional[str], Any]:
+    """Key of a value in the hash index, tagged so that True and False do not match 1 and 0."""
+    return ("bool" if isinstance(value, bool) else _category(value), value)
+
+
+def _coerce(value: Any, categories: Iterable[str]) -> Any:
+    """Filter values on datetime columns can be given as ISO 8601 strings."""
+    value = _normalize(value)
+    if isinstance(value, str):
+        try:
+            if "datetime" in categories:
+                return _normalize(datetime.fromisoformat(value))
+            if "date" in categories:
+                return date.fromisoformat(value)
+        except ValueError:
+            pass
+    return value
+
+
+class FieldIndex:
+    """Hash and sorted index of one field of the replica."""
+
+    __slots__ = ("hashed", "sorted")
+
+    def __init__(self, field: str, documents: List[Dict[str, Any]]):
+        self.hashed = {}
+        by_category = {}
+        for position, document in enumerate(documents):
+            value = document.get(field, _MISSING)
+            if value is _MISSING:
+                continue
+            # Documents match array fields on any of their items
+            for item in value if isinstance(value, list) else (value,):
+                item = _normalize(item)
+                try:
+                    self.hashed.setdefault(_hash_key(item), []).append(position)
+                except TypeError:
+                    continue
+                category = _category(item)
+                if category:
+                    by_category.setdefault(category, []).append((item, position))
+        self.sorted = {}
+        for category, entries in by_category.items():
+            entries.sort(key=lambda entry: entry[0])
+            self.sorted[category] = ([item for item, _ in entries], [position for _, position in entries])
+
+    def equal(self, value: Any) -> Set[int]:
+        try:
+            return set(self.hashed.get(_hash_key(_coerce(value, self.sorted)), ()))
+        except TypeError:
+            return set()
+
+    def range(self, operator: str, value: Any) -> Set[int]:
+        value = _coerce(value, self.sorted)
+        entries = self.sorted.get(_category(value))
+        if not entries:
+            return set()
+        values, positions = entries
+        if operator == "$gt":
+            return set(positions[bisect_right(values, value):])
+        if operator == "$gte":
+            return set(positions[bisect_left(values, value):])
+        if operator == "$lt":
+            return set(positions[:bisect_left(values, value)])
+        return set(positions[:bisect_right(values, value)])
+
+
+class Replica:
+    """Snapshot of a table or collection, with indexes on the filtered fields."""
+
+    __slots__ = ("documents", "indexes", "loaded_at")
+
+    def __init__(self, documents: List[Dict[str, Any]], fields: Iterable[str]):
+        self.documents = documents
+        self.indexes = {field: FieldIndex(field, documents) for field in fields}
+        self.loaded_at = datetime.now(timezone.utc)
+
+    def _index(self, field: str) -> FieldIndex:
+        # Fields filtered by constants or expressions are indexed on first use
+        if field not in self.indexes:
+            self.indexes[field] = FieldIndex(field, self.documents)
+        return self.indexes[field]
+
+    def _match(self, field: str, condition: Any) -> Optional[Set[int]]:
+        operators = condition if isinstance(condition, dict) and condition else {"$eq": condition}
+        if not all(isinstance(operator, str) and operator in SUPPORTED_OPERATORS for operator in operators):
+            return None
+
+        index = self._index(field)
+        matched = None
+        for operator, value in operators.items():
+            if operator == "$eq":
+                positions = index.equal(value)
+            elif operator == "$in":
+                if not isinstance(value, list):
+                    return None
+                positions = set().union(*(index.equal(item) for item in value))
+            else:
+                positions = index.range(operator, value)
+            matched = positions if matched is None else matched & positions
+        return matched
+
+    def find(self, filter_dict: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None,
+             limit: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """Evaluate a find locally, None when the filter is not supported."""
+        matched = None
+        for field, condition in (filter_dict or {}).items():
+            if field.startswith("$"):
+                return None
+            positions = self._match(field, condition)
+            if positions is None:
+                return None
+            matched = positions if matched is None else matched & positions
+            if not matched:
+                return []
+
+        positions = sorted(matched) if matched is not None else range(len(self.documents))
+        documents = []
+        for position in positions:
+            if limit and len(documents) >= limit:
+                break
+            documents.append(_project(self.documents[position], projection))
+        return documents
+
+
+def _project(document: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not projection:
+        return dict(document)
+    included = [field for field, value in projection.items() if value and field != "_id"]
+    if included:
+        projected = {field: document[field] for field in included if field in document}
+        if projection.get("_id", 1) and "_id" in document:
+            projected["_id"] = document["_id"]
+        return projected
+    return {field: value for field, value in document.items() if projection.get(field, 1)}
+
+
+ReplicaKey = Tuple[str, str, str]
+
+
+class ReplicaManager:
+    """Loads and refreshes the replicas of the tools with a "replica" config."""
+    logger = get_logger("replica")
+
+    def __init__(self, astra_db_manager: Any):
+        self.astra_db_manager = astra_db_manager
+        self.replicas = {}
+        self._configs = {}
+        self._fields = {}
+        # Tools served from the replicas, by name, only these opted in with a "replica" config
+        self._plans = {}
+        self._tasks = {}
+
+    @staticmethod
+    def key(plan: Any, default_db_name: str) -> ReplicaKey:
+        return (plan.db_name or default_db_name, plan.object_type, plan.object_name)
+
+    def register(self, plans: Dict[str, Any]):
+        """Collect the tables and collections to replicate, and the fields to index."""
+        for plan in plans.values():
+            replica_config = plan.config.get("replica")
+            if not replica_config or plan.method not in ("find", "find_documents") or plan.paginate or plan.hybrid:
+                continue
+            self._plans[plan.name] = plan
+        self._collect()
+        self.logger.info(f"{len(self._configs)} replicas registered")
+
+    def _collect(self):
+        configs = {}
+        fields = {}
+        for plan in self._plans.values():
+            key = self.key(plan, self.astra_db_manager.astra_db_db_name)
+            replica_config = plan.config.get("replica")
+            config = replica_config if isinstance(replica_config, dict) else {}
+            # Tools on the same object share the replica, refreshed at the shortest interval
+            current = configs.get(key)
+            if current is None or config.get("refresh_interval", DEFAULT_REFRESH_INTERVAL) < \
+                    current.get("refresh_interval", DEFAULT_REFRESH_INTERVAL):
+                configs[key] = config
+            key_fields = fields.setdefault(key, set())
+            key_fields.update(binder.attribute for binder in plan.binders)
+            key_fields.update(plan.filter_template)
+        self._configs = configs
+        self._fields = fields
+
+    async def update(self, plans: Dict[str, Any], removed: Iterable[str]):
+        """Apply catalog changes: the removed or replaced tools, and the new tool versions."""
+        previous_configs, previous_fields = self._configs, self._fields
+        for name in removed:
+            self._plans.pop(name, None)
+        self.register(plans)
+        # Replicas no longer used, or whose config or indexed fields changed, are dropped before any await
+        for key in set(previous_configs) | set(self._configs):
+            if key in self._configs and previous_configs.get(key) == self._configs[key] \
+                    and previous_fields.get(key) == self._fields[key]:
+                continue
+            task = self._tasks.pop(key, None)
+            if task:
+                task.cancel()
+            self.replicas.pop(key, None)
+        await self.start()
+
+    async def start(self):
+        """Load the replicas not loaded yet, then refresh them in the background."""
+        keys = [key for key in self._configs if key not in self.replicas and key not in self._tasks]
+        await asyncio.gather(*[self.load(key) for key in keys])
+        for key in keys:
+            interval = self._configs.get(key, {}).get("refresh_interval", DEFAULT_REFRESH_INTERVAL)
+            if interval and key in self._configs and key not in self._tasks:
+                self._tasks[key] = asyncio.create_task(self._refresh(key, interval))
+
+    async def load(self, key: ReplicaKey) -> bool:
+        db_name, object_type, object_name = key
+        config = self._configs.get(key)
+        if config is None:
+            return False
+        max_documents = config.get("max_documents", DEFAULT_MAX_DOCUMENTS)
+        try:
+            target = await self.astra_db_manager.handles.get_async(db_name, object_type, object_name)
+            documents = []
+            async for document in target.find({}, limit=max_documents + 1):
+                documents.append(document)
+            if len(documents) > max_documents:
+                self.logger.error(f"{object_type} '{object_name}' has more than {max_documents} documents, "
+                                  f"it is not replicated")
+                self.replicas.pop(key, None)
+                return False
+            if self._configs.get(key) is not config:
+                # Dropped or reconfigured by a catalog reload meanwhile
+                return False
+            self.replicas[key] = Replica(documents, self._fields.get(key, ()))
+            self.logger.info(f"Loaded replica of {object_type} '{object_name}' with {len(documents)} documents")
+            return True
+        except Exception as e:
+            # The previous snapshot, if any, is kept
+            self.logger.error(f"Failed to load replica of {object_type} '{object_name}': {e}")
+            return False
+
+    async def _refresh(self, key: ReplicaKey, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.load(key)
+
+    def find(self, plan: Any, find_params: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Documents found in the replica of the tool, None when the Data API has to be queried."""
+        if "sort" in find_params:
+            return None
+        # Other tools on the same table or collection may not accept stale data
+        if plan.name not in self._plans or not plan.config.get("replica"):
+            return None
+        replica = self.replicas.get(self.key(plan, self.astra_db_manager.astra_db_db_name))
+        if replica is None:
+            return None
+        return replica.find(find_params.get("filter"), find_params.get("projection"), find_params.get("limit"))
+
+    async def close(self):
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks = {}
@@ -5,9 +5,23 @@ from .logger import get_logger
 import mcp.types as types
 import json
 from .database import AstraDBManager
-import os
-from datetime import datetime # for datetime eval expressions that can be used in the tool config
+from .query_plan import QueryPlan, compile_plans
+from .cache import ResultCache
+from .singleflight import SingleFlight
+from .admission import AdmissionController, Overloaded
+from .deadline import Deadline, DeadlineExceeded
+from .shaping import shape_result
+from .serialization import to_tool_result
+from .metrics import CallMetrics, phase
+import asyncio
+from datetime import datetime
 import uuid
+from typing import Any
+
+BATCH_CALLS_PARAM = "calls"
+DEFAULT_BATCH_MAX_CALLS = 10
+FIND_METHODS = ("find", "find_documents")
+BATCH_METHODS = FIND_METHODS + ("list_collections",)
 
 class AuditStatus:
     STARTED = "started"
@@ -18,11 +32,50 @@ class RunToolMiddleware(Middleware):
     
     logger = get_logger("RunToolMiddleware")
 
-    def __init__(self, astra_db_manager: AstraDBManager, tools_config: dict):
+    def __init__(self, astra_db_manager: AstraDBManager, tools_config: dict, plans: dict[str, QueryPlan] = None,
+                 result_cache: ResultCache = None, admission: AdmissionController = None,
+                 default_timeout_ms: int = 30000):
         self.astra_db_manager = astra_db_manager
         self.tools_config = tools_config
+        self.plans = plans if plans is not None else compile_plans(tools_config)
+        self.result_cache = result_cache or ResultCache()
+        self.single_flight = SingleFlight()
+        self.admission = admission or AdmissionController()
+        self.default_timeout_ms = default_timeout_ms
 
     async def on_call_tool(self, context: MiddlewareContext, call_next):
+        # Timed by phase, the metrics are recorded with the status of the call
+        with CallMetrics(context.message.name) as call:
+            status = "error"
+            try:
+                result = await self._call_tool(context, call)
+                status = self._status(result)
+                return result
+            except asyncio.CancelledError:
+                status = "cancelled"
+                raise
+            finally:
+                documents = 0
+                payload_bytes = 0
+                if status == "ok":
+                    if call.method in FIND_METHODS and isinstance(result.structured_content, dict):
+                        documents = result.structured_content.get("count", 0)
+                    payload_bytes = sum(len(content.text) for content in result.content
+                                        if isinstance(content, types.TextContent))
+                call.finish(status, documents=documents, payload_bytes=payload_bytes)
+
+    @staticmethod
+    def _status(result: ToolResult) -> str:
+        error = result.structured_content.get("error") if isinstance(result.structured_content, dict) else None
+        if not error:
+            return "ok"
+        return {"overloaded": "overloaded", "deadline exceeded": "deadline_exceeded"}.get(error, "error")
+
+    async def _audit(self, **kwargs):
+        with phase("audit"):
+            await self.astra_db_manager.log_audit_async(**kwargs)
+
+    async def _call_tool(self, context: MiddlewareContext, call: CallMetrics) -> ToolResult:
         # Access the tool object to check its metadata
         if not context.fastmcp_context:
             ToolError("No context found")
@@ -34,22 +87,23 @@ class RunToolMiddleware(Middleware):
         self.logger.info(f"Run ID: {run_id}")
         self.logger.info(f"Start timestamp: {start_timestamp}")
         self.logger.info(f"Context: {context}")
-        self.astra_db_manager.log_audit(tool_id=tool_name, 
+        await self._audit(tool_id=tool_name, 
                                        client_id=context.fastmcp_context.client_id, 
                                        run_id=run_id, 
                                        start_timestamp=start_timestamp,
                                        status=AuditStatus.STARTED)
         
         try:
-            arguments = context.message.arguments
+            with phase("validation"):
+                arguments = context.message.arguments or {}
             self.logger.debug(f"Arguments: {arguments}")
-            self.astra_db_manager.log_audit(tool_id=tool_name, 
+            await self._audit(tool_id=tool_name, 
                                        run_id=run_id, 
                                        parameters= json.dumps(arguments),
                                        status=AuditStatus.STARTED)
         except Exception as e:
             self.logger.error(f"Error getting arguments: {e}")
-            self.astra_db_manager.log_audit(tool_id=tool_name, 
+            await self._audit(tool_id=tool_name, 
                                        run_id=run_id, 
                                        end_timestamp=datetime.now().isoformat(),
                                        status=AuditStatus.FAILED,
@@ -57,40 +111,170 @@ class RunToolMiddleware(Middleware):
                                        status_message=f"Error getting arguments: {e}",
                                        status_details=str(e),
                                        error=str(e))
-            return ToolResult({"error": f"Error getting arguments: {e}"})
+            return to_tool_result({"error": f"Error getting arguments: {e}"})
 
-        tool_config = next(
-            (t for t in self.tools_config if t['name'] == tool_name), None)
+        with phase("validation"):
+            plan = self.plans.get(tool_name)
 
-        if not tool_config:
-            ToolError(f"Tool {tool_name} not found")
-        else:
-            self.logger.debug(f"Tool config: {tool_config}")
+            if not plan:
+                raise ToolError(f"Tool {tool_name} not found")
+            else:
+                self.logger.debug(f"Tool config: {plan.config}")
+            call.method = plan.method
+            call.database = plan.db_name or self.astra_db_manager.astra_db_db_name or ""
 
-        # Check arguments            
-        for param in tool_config["parameters"]:
-            if param["param"] not in arguments and param.get("required", False) == True:
-                self.logger.error(f"Parameter {param['param']} is required")
-                return ToolResult({"error": f"Parameter {param['param']} is required"})
+            # Check arguments
+            missing_param = plan.missing_required(arguments)
+        if missing_param:
+            self.logger.error(f"Parameter {missing_param} is required")
+            return to_tool_result({"error": f"Parameter {missing_param} is required"})
+
+        # The client can shorten the tool deadline with "timeout_ms" in the call _meta
+        meta = getattr(context.message, "meta", None)
+        deadline = Deadline.for_call(plan.timeout_ms or self.default_timeout_ms,
+                                     getattr(meta, "timeout_ms", None))
 
         # Run methods
-        if tool_config["method"] == "find" or tool_config["method"] == "find_documents":
-            result = self.astra_db_manager.find(
-                arguments=arguments,
-                tool_config=tool_config)
+        try:
+            if plan.method == "batch":
+                # Each call of the batch has its own deadline, within the one of the batch
+                result = await self._batch(plan, arguments, deadline)
+                await self._audit(tool_id=tool_name, 
+                                           run_id=run_id, 
+                                           end_timestamp=datetime.now().isoformat(),
+                                           status=AuditStatus.COMPLETED,
+                                           status_code=200)
+                return to_tool_result(result)
+
+            async with asyncio.timeout(deadline.remaining()):
+                if plan.method in FIND_METHODS:
+                    result = await self._find_cached(plan, arguments, deadline)
 
-            self.logger.debug(f"Result: {result}")
-            self.astra_db_manager.log_audit(tool_id=tool_name, 
+                    self.logger.debug(f"Result: {result}")
+                    await self._audit(tool_id=tool_name, 
+                                               run_id=run_id, 
+                                               end_timestamp=datetime.now().isoformat(),
+                                               status=AuditStatus.COMPLETED,
+                                               status_code=200)
+                    return to_tool_result(result)
+
+                if plan.method == "list_collections":
+                    result = await self._admitted(plan, self.astra_db_manager.list_collections_async)
+                    self.logger.debug(f"Result: {result}")
+                    return to_tool_result(result)
+        except Overloaded as e:
+            self.logger.warning(str(e))
+            await self._audit(tool_id=tool_name, 
+                                       run_id=run_id, 
+                                       end_timestamp=datetime.now().isoformat(),
+                                       status=AuditStatus.FAILED,
+                                       status_code=503,
+                                       status_message=str(e),
+                                       error=e.reason)
+            return to_tool_result(e.to_dict())
+        except (DeadlineExceeded, TimeoutError):
+            self.logger.error(f"Tool {tool_name} exceeded its deadline of {deadline.timeout_ms} ms")
+            await self._audit(tool_id=tool_name, 
                                        run_id=run_id, 
                                        end_timestamp=datetime.now().isoformat(),
-                                       status=AuditStatus.COMPLETED,
-                                       status_code=200)
-            return ToolResult(structured_content=result)
-
-        if tool_config["method"] == "list_collections":
-            result = self.astra_db_manager.list_collections()
-            self.logger.debug(f"Result: {result}")
-            return ToolResult(structured_content=result)
+                                       status=AuditStatus.FAILED,
+                                       status_code=504,
+                                       status_message=f"Deadline of {deadline.timeout_ms} ms exceeded",
+                                       error="deadline exceeded")
+            return to_tool_result({
+                "error": "deadline exceeded",
+                "timeout_ms": deadline.timeout_ms,
+            })
+        except asyncio.CancelledError:
+            # Cancelled or disconnected client, the in-flight work is aborted
+            self.logger.warning(f"Tool {tool_name} run {run_id} cancelled")
+            raise
         
+        if plan.method == "cache_stats":
+            return to_tool_result(self.result_cache.stats())
+
         # Method not implemented
-        ToolError(f"Method {tool_config['method']} not allowed")
+        raise ToolError(f"Method {plan.method} not allowed")
+
+    async def _find_cached(self, plan: QueryPlan, arguments: dict, deadline: Deadline):
+        """Run find through the result cache, identical concurrent calls share a single backend execution.
+
+        The shared execution has the full timeout of the tool, as it may outlive the caller that
+        started it, and each caller only waits for it until its own deadline.
+        """
+        timeout_ms = plan.timeout_ms or self.default_timeout_ms
+        async with asyncio.timeout(deadline.remaining()):
+            return await self.result_cache.get_or_load(
+                plan.name, plan.cache_config, arguments,
+                lambda: self.single_flight.do(
+                    ResultCache.key(plan.name, arguments, plan.version),
+                    lambda: self._find(plan, arguments, Deadline(timeout_ms))),
+                version=plan.version)
+
+    async def _batch(self, plan: QueryPlan, arguments: dict, deadline: Deadline) -> dict:
+        """Run the calls of a batch concurrently, results are returned in order with errors per call."""
+        calls = arguments.get(BATCH_CALLS_PARAM)
+        if not isinstance(calls, list) or not calls:
+            return {"error": f"Parameter {BATCH_CALLS_PARAM} must be a non-empty list of tool calls"}
+        max_calls = plan.config.get("max_calls", DEFAULT_BATCH_MAX_CALLS)
+        if len(calls) > max_calls:
+            return {"error": f"A batch can have at most {max_calls} calls"}
+
+        # The calls use the plans of the catalog the batch started with, even if it is reloaded meanwhile
+        plans = self.plans
+        results = await asyncio.gather(*[self._batch_call(plan, call, deadline, plans) for call in calls])
+        return {
+            "success": all("error" not in entry for entry in results),
+            "count": len(results),
+            "results": results,
+        }
+
+    async def _batch_call(self, batch_plan: QueryPlan, call: Any, deadline: Deadline,
+                          plans: dict[str, QueryPlan] = None) -> dict:
+        """Run one call of a batch, any failure is returned as the error of the entry."""
+        tool_name = call.get("tool") if isinstance(call, dict) else None
+        plan = (plans if plans is not None else self.plans).get(tool_name)
+        allowed_tools = batch_plan.config.get("tools")
+        if not plan or plan.method not in BATCH_METHODS or (allowed_tools and tool_name not in allowed_tools):
+            return {"tool": tool_name, "error": f"Tool {tool_name} cannot be run in a batch"}
+
+        arguments = call.get("arguments") or {}
+        missing_param = plan.missing_required(arguments)
+        if missing_param:
+            return {"tool": tool_name, "error": f"Parameter {missing_param} is required"}
+
+        call_deadline = Deadline.for_call(plan.timeout_ms or self.default_timeout_ms, deadline.remaining_ms())
+        try:
+            async with asyncio.timeout(call_deadline.remaining()):
+                if plan.method == "list_collections":
+                    result = await self._admitted(plan, self.astra_db_manager.list_collections_async)
+                else:
+                    result = await self._find_cached(plan, arguments, call_deadline)
+        except Overloaded as e:
+            self.logger.warning(str(e))
+            return {"tool": tool_name, **e.to_dict()}
+        except (DeadlineExceeded, TimeoutError):
+            self.logger.error(f"Batch call of {tool_name} exceeded its deadline of {call_deadline.timeout_ms} ms")
+            return {"tool": tool_name, "error": "deadline exceeded", "timeout_ms": call_deadline.timeout_ms}
+        except Exception as e:
+            self.logger.error(f"Batch call of {tool_name} failed: {e}")
+            return {"tool": tool_name, "error": str(e)}
+
+        if isinstance(result, str):
+            # Raw Data API response of a passthrough tool
+            result = json.loads(result)
+        if isinstance(result, dict) and "error" in result:
+            return {"tool": tool_name, "error": result["error"]}
+        return {"tool": tool_name, "result": result}
+
+    async def _find(self, plan: QueryPlan, arguments: dict, deadline: Deadline):
+        """Run find within the tool limits and shape its result."""
+        result = await self._admitted(plan, lambda: self.astra_db_manager.find_async(
+            arguments=arguments, plan=plan, deadline=deadline))
+        with phase("materialization"):
+            return shape_result(result, plan.response_config)
+
+    async def _admitted(self, plan: QueryPlan, fn):
+        """Run fn within the concurrency limits of the tool."""
+        async with self.admission.admit(plan.name, plan.config.get("concurrency")):
+            return await fn()
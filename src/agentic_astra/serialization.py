@@ -0,0 +1,146 @@
+"""
+Result Serialization
+
+Converts Data API results into plain JSON values with a single representation
+for the astrapy types:
+
+    DataAPITimestamp, datetime  -> ISO 8601 string ("2025-01-02T03:04:05.123Z")
+    DataAPIDate, DataAPITime    -> ISO 8601 string
+    DataAPIDuration             -> ISO 8601 duration string ("PT1H2M")
+    DataAPIVector               -> list of floats
+    UUID, ObjectId              -> string
+    Decimal                     -> float
+    DataAPIMap                  -> object, or list of [key, value] pairs for non-string keys
+    DataAPISet, set, tuple      -> list
+    bytes                       -> base64 string
+
+Values are converted with a per-type dispatch table and encoded once. orjson is
+used for encoding when it is installed (pip install agentic-astra[fast]).
+"""
+
+import base64
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+
+import mcp.types as types
+from astrapy.data_types import (
+    DataAPIDate,
+    DataAPIDuration,
+    DataAPIMap,
+    DataAPISet,
+    DataAPITime,
+    DataAPITimestamp,
+    DataAPIVector,
+)
+from astrapy.ids import ObjectId
+from fastmcp.tools.tool import ToolResult
+from .metrics import phase
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _map_to_jsonable(value: DataAPIMap) -> Any:
+    if all(isinstance(key, str) for key in value.keys()):
+        return {key: to_jsonable(item) for key, item in value.items()}
+    return [[to_jsonable(key), to_jsonable(item)] for key, item in value.items()]
+
+
+def _datetime_to_string(value: datetime) -> str:
+    return value.isoformat()
+
+
+_CONVERTERS: Dict[type, Callable[[Any], Any]] = {
+    DataAPITimestamp: lambda value: value.to_string(),
+    DataAPIDate: lambda value: value.to_string(),
+    DataAPITime: lambda value: value.to_string(),
+    DataAPIDuration: lambda value: value.to_string(),
+    DataAPIVector: lambda value: list(value.data),
+    DataAPIMap: _map_to_jsonable,
+    DataAPISet: lambda value: [to_jsonable(item) for item in value],
+    UUID: str,
+    ObjectId: str,
+    Decimal: float,
+    datetime: _datetime_to_string,
+    date: lambda value: value.isoformat(),
+    time: lambda value: value.isoformat(),
+    set: lambda value: [to_jsonable(item) for item in value],
+    tuple: lambda value: [to_jsonable(item) for item in value],
+    bytes: lambda value: base64.b64encode(value).decode(),
+}
+
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convert a Data API result into plain JSON values."""
+    value_type = type(value)
+    if value_type in _PLAIN_TYPES:
+        return value
+    if value_type is dict:
+        return {key: to_jsonable(item) for key, item in value.items()}
+    if value_type is list:
+        return [to_jsonable(item) for item in value]
+
+    converter = _CONVERTERS.get(value_type)
+    if converter:
+        return converter(value)
+    # Subclasses, such as the UUID of other libraries or dict based UDTs
+    for base, converter in _CONVERTERS.items():
+        if isinstance(value, base):
+            return converter(value)
+    if isinstance(value, dict):
+        return {key: to_jsonable(item) for key, item in value.items()}
+    return str(value)
+
+
+def _default(value: Any) -> Any:
+    converted = to_jsonable(value)
+    if converted is value:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return converted
+
+
+def dumps(value: Any) -> str:
+    """Encode a result as JSON, astrapy types included."""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default).decode()
+    return json.dumps(value, default=_default, separators=(",", ":"))
+
+
+# Top-level errors of the Data API come after the data, within the end of the body
+ERRORS_SCAN_BYTES = 4096
+
+
+def response_errors(body: str) -> Optional[List[Any]]:
+    """Top-level errors of a raw Data API response, the body is only decoded when it may have some."""
+    if body.lstrip()[:8] == '{"data":' and '"errors"' not in body[-ERRORS_SCAN_BYTES:]:
+        return None
+    try:
+        response = json.loads(body)
+    except ValueError:
+        return [{"message": body}]
+    if not isinstance(response, dict):
+        return [{"message": body}]
+    return response.get("errors") or None
+
+
+def to_tool_result(result: Any) -> ToolResult:
+    """Build the tool result, encoding the content only once.
+
+    Strings are raw Data API JSON forwarded as they are, by passthrough tools.
+    """
+    with phase("serialization"):
+        if isinstance(result, str):
+            return ToolResult(content=[types.TextContent(type="text", text=result)])
+
+        structured_content = to_jsonable(result)
+        return ToolResult(
+            content=[types.TextContent(type="text", text=dumps(structured_content))],
+            structured_content=structured_content,
+        )
@@ -4,10 +4,24 @@ import json
 from dotenv import load_dotenv
 from fastmcp import FastMCP
 from .load_tools import ToolLoader
+from .catalog_watcher import DEFAULT_RELOAD_INTERVAL, CatalogWatcher, CollectionCatalogSource, FileCatalogSource, \
+    SessionTracker
 from .database import AstraDBManager
+from .embedding_batcher import EmbeddingBatcher
+from .embedding_cache import EmbeddingCache
+from .embeddings import EmbeddingClient
+from .endpoint_cache import EndpointCache
+from .transport import DataAPITransport
+from .planner import DEFAULT_SCAN_POLICY, SCAN_POLICIES, IndexPlanner
 from fastmcp.server.dependencies import get_context
 from .logger import get_logger
 from .run_tool import RunToolMiddleware
+from .cache import ResultCache
+from .admission import AdmissionController
+from .metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE, cache_collector, admission_collector, \
+    embedding_cache_collector
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
 import asyncio
 from fastmcp.server.auth.providers.jwt import StaticTokenVerifier, TokenVerifier
 from fastmcp.server.dependencies import get_http_headers
@@ -70,15 +84,101 @@ async def main():
     parser.add_argument("--catalog_collection", "-c",
                         default=os.getenv("ASTRA_DB_CATALOG_COLLECTION") or "tool_catalog")
     parser.add_argument("--tags")  # For filtering tools
+    parser.add_argument("--catalog_reload_interval", type=float,
+                        default=float(os.getenv("CATALOG_RELOAD_INTERVAL") or DEFAULT_RELOAD_INTERVAL),
+                        help="Seconds between checks of the catalog for changed tools, 0 to disable hot reload")
     parser.add_argument("--auth", default=True,
                         action="store_true", help="Disable authentication")
     parser.add_argument("--audit", default=False,
                         action="store_true", help="Enable audit trail")
+    parser.add_argument("--audit_batch_size", type=int,
+                        default=int(os.getenv("AUDIT_BATCH_SIZE") or 50),
+                        help="Audit rows written per insert_many")
+    parser.add_argument("--audit_flush_interval", type=float,
+                        default=float(os.getenv("AUDIT_FLUSH_INTERVAL") or 1.0),
+                        help="Seconds between audit trail flushes")
+    parser.add_argument("--audit_queue_size", type=int,
+                        default=int(os.getenv("AUDIT_QUEUE_SIZE") or 10000),
+                        help="Maximum audit rows waiting to be written")
+    parser.add_argument("--audit_overflow", choices=["block", "drop-oldest", "sample"],
+                        default=os.getenv("AUDIT_OVERFLOW_POLICY") or "block",
+                        help="What to do when the audit queue is full")
+    parser.add_argument("--cache_max_bytes", type=int,
+                        default=int(os.getenv("RESULT_CACHE_MAX_BYTES") or 64 * 1024 * 1024),
+                        help="Memory budget of the tool result cache")
+    parser.add_argument("--max_concurrency", type=int,
+                        default=int(os.getenv("MAX_CONCURRENCY") or 64),
+                        help="Maximum tool calls running at the same time")
+    parser.add_argument("--queue_delay_target_ms", type=int,
+                        default=int(os.getenv("QUEUE_DELAY_TARGET_MS") or 500),
+                        help="Tool calls waiting longer than this are shed")
+    parser.add_argument("--max_queue_size", type=int,
+                        default=int(os.getenv("MAX_QUEUE_SIZE") or 1000),
+                        help="Maximum tool calls waiting for a slot")
+    parser.add_argument("--tool_timeout_ms", type=int,
+                        default=int(os.getenv("TOOL_TIMEOUT_MS") or 30000),
+                        help="Deadline of tool calls without a timeout_ms in their config, must be positive")
+    parser.add_argument("--endpoint_cache_file",
+                        default=os.getenv("ENDPOINT_CACHE_FILE"),
+                        help="File caching the database endpoints resolved with the DevOps API")
+    parser.add_argument("--endpoint_cache_ttl", type=float,
+                        default=float(os.getenv("ENDPOINT_CACHE_TTL") or 86400),
+                        help="Seconds the cached database endpoints are used, 0 to disable the cache")
+    parser.add_argument("--metadata_ttl", type=float,
+                        default=float(os.getenv("METADATA_TTL") or 300),
+                        help="Seconds the table and collection metadata are cached")
+    parser.add_argument("--http_max_connections", type=int,
+                        default=int(os.getenv("HTTP_MAX_CONNECTIONS") or 100),
+                        help="Maximum connections to the Data API")
+    parser.add_argument("--http_max_keepalive_connections", type=int,
+                        default=int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS") or 20),
+                        help="Maximum idle connections kept open to the Data API")
+    parser.add_argument("--http_keepalive_expiry", type=float,
+                        default=float(os.getenv("HTTP_KEEPALIVE_EXPIRY") or 60),
+                        help="Seconds idle connections are kept open")
+    parser.add_argument("--http2", action="store_true",
+                        default=(os.getenv("HTTP2") or "").lower() in ("1", "true", "yes"),
+                        help="Use HTTP/2 for the Data API")
+    parser.add_argument("--http_warm_connections", type=int,
+                        default=int(os.getenv("HTTP_WARM_CONNECTIONS") or 4),
+                        help="Connections opened to each database endpoint at startup, 0 to disable")
+    parser.add_argument("--http_keepalive_ping_interval", type=float,
+                        default=float(os.getenv("HTTP_KEEPALIVE_PING_INTERVAL") or 30),
+                        help="Seconds between keep-alive pings of the warm connections, 0 to disable")
+    parser.add_argument("--embedding_max_retries", type=int,
+                        default=int(os.getenv("EMBEDDING_MAX_RETRIES") or 2),
+                        help="Retries of embedding requests rejected with 429 or 5xx, within the call deadline")
+    parser.add_argument("--embedding_max_connections", type=int,
+                        default=int(os.getenv("EMBEDDING_MAX_CONNECTIONS") or 20),
+                        help="Maximum connections to each embedding provider")
+    parser.add_argument("--embedding_batch_size", type=int,
+                        default=int(os.getenv("EMBEDDING_BATCH_SIZE") or 32),
+                        help="Maximum texts per embedding request, 1 to disable batching")
+    parser.add_argument("--embedding_batch_window_ms", type=float,
+                        default=float(os.getenv("EMBEDDING_BATCH_WINDOW_MS") or 5),
+                        help="Milliseconds concurrent embedding requests are collected for a batch")
+    parser.add_argument("--embedding_cache_size", type=int,
+                        default=int(os.getenv("EMBEDDING_CACHE_SIZE") or 10000),
+                        help="Embeddings of search queries kept in memory")
+    parser.add_argument("--embedding_cache_file",
+                        default=os.getenv("EMBEDDING_CACHE_FILE") or None,
+                        help="SQLite file keeping the embeddings of search queries across restarts")
+    parser.add_argument("--embedding_cache_max_disk_entries", type=int,
+                        default=int(os.getenv("EMBEDDING_CACHE_MAX_DISK_ENTRIES") or 1000000),
+                        help="Embeddings kept in the embedding cache file")
+    parser.add_argument("--scan_policy", choices=SCAN_POLICIES,
+                        default=os.getenv("SCAN_POLICY") or DEFAULT_SCAN_POLICY,
+                        help="Handling of the tools whose finds can scan a whole table or collection")
+    parser.add_argument("--metrics_path",
+                        default=os.getenv("METRICS_PATH", "/metrics"),
+                        help="Route of the Prometheus metrics in http and sse mode, empty to disable")
     parser.add_argument("--env-file", help="Environment variables file to load")
     parser.add_argument("--env-var", action="append",
                         help="Environment variables in KEY=VALUE format (can be used multiple times)")
 
     args = parser.parse_args()
+    if args.tool_timeout_ms <= 0:
+        parser.error("--tool_timeout_ms (or TOOL_TIMEOUT_MS env var) must be positive")
 
     # Validate required arguments
     required_args = []
@@ -94,16 +194,44 @@ async def main():
     astra_db_manager = None
     
     try:    
+        embedding_cache = EmbeddingCache(
+            max_entries=args.embedding_cache_size,
+            path=args.embedding_cache_file,
+            max_disk_entries=args.embedding_cache_max_disk_entries)
         astra_db_manager = AstraDBManager(
             token=args.astra_token,
             endpoint=args.astra_endpoint,
-            db_name=args.astra_db_name)
+            db_name=args.astra_db_name,
+            endpoint_cache=EndpointCache(
+                args.astra_token,
+                path=args.endpoint_cache_file,
+                ttl=args.endpoint_cache_ttl),
+            metadata_ttl=args.metadata_ttl,
+            transport=DataAPITransport(
+                max_connections=args.http_max_connections,
+                max_keepalive_connections=args.http_max_keepalive_connections,
+                keepalive_expiry=args.http_keepalive_expiry,
+                http2=args.http2,
+                warm_connections=args.http_warm_connections,
+                ping_interval=args.http_keepalive_ping_interval),
+            embeddings=EmbeddingClient(
+                max_retries=args.embedding_max_retries,
+                max_connections=args.embedding_max_connections,
+                cache=embedding_cache,
+                batcher=EmbeddingBatcher(
+                    max_batch_size=args.embedding_batch_size,
+                    window_ms=args.embedding_batch_window_ms) if args.embedding_batch_size > 1 else None))
     except Exception as e:
         logger.error(f"Error initializing Astra DB manager: {e}")
         raise ValueError(f"Error initializing Astra DB manager: {e}")
 
     if args.audit:
-        astra_db_manager.setup_audit_trail(args.astra_db_audit_table)
+        astra_db_manager.setup_audit_trail(
+            args.astra_db_audit_table,
+            batch_size=args.audit_batch_size,
+            flush_interval=args.audit_flush_interval,
+            max_queue_size=args.audit_queue_size,
+            overflow_policy=args.audit_overflow)
         logger.info(f"Audit table name: {args.astra_db_audit_table}")
 
     # Initialize MCP
@@ -127,12 +255,13 @@ async def main():
     tools_config_content = None
     if args.catalog_file:
         logger.info(f"Loading tools config from {args.catalog_file}")
-        tools_config_content = json.load(open(args.catalog_file))
+        catalog_source = FileCatalogSource(args.catalog_file)
     else:
         logger.info(
             f"Loading tools Astra collection {args.catalog_collection}")
-        tools_config_content = astra_db_manager.get_catalog_content(
-            collection_name=args.catalog_collection, tags=args.tags)
+        catalog_source = CollectionCatalogSource(
+            astra_db_manager, args.catalog_collection, tags=args.tags)
+    tools_config_content = catalog_source.load()
 
     logger.info(f"Tools config content: {tools_config_content}")
     if not tools_config_content or len(tools_config_content) == 0:
@@ -140,27 +269,77 @@ async def main():
             "No tools found. Load tools to Astra DB collection or reference the catalog file")
         return
 
-    # Add middleware to process tool calling
-    mcp.add_middleware(RunToolMiddleware(
-        astra_db_manager, tools_config_content))
-
     logger.info("Initializing Agentic Astra MCP Server")
     logger.info(f"Starting Agentic Astra MCP Server on port {args.port}")
 
-    # Generate tools based on tools config content
+    # Generate tools and query plans based on tools config content
     tool_loader = ToolLoader(mcp, astra_db_manager, tools_config_content)
     tool_loader.load_all_tools()
 
     logger.info("All tools loaded successfully")
 
+    # Add middleware to process tool calling
+    result_cache = ResultCache(max_bytes=args.cache_max_bytes)
+    admission = AdmissionController(
+        max_concurrency=args.max_concurrency,
+        queue_delay_target_ms=args.queue_delay_target_ms,
+        max_queue_size=args.max_queue_size)
+    run_tool_middleware = RunToolMiddleware(
+        astra_db_manager, tools_config_content, tool_loader.plans,
+        result_cache=result_cache,
+        admission=admission,
+        default_timeout_ms=args.tool_timeout_ms)
+    mcp.add_middleware(run_tool_middleware)
+
+    # Prometheus metrics, next to the MCP app in http and sse mode
+    REGISTRY.register_collector("result_cache", cache_collector(result_cache))
+    REGISTRY.register_collector("admission", admission_collector(admission))
+    REGISTRY.register_collector("embedding_cache", embedding_cache_collector(embedding_cache))
+    if args.metrics_path:
+        @mcp.custom_route(args.metrics_path, methods=["GET"])
+        async def metrics(request: Request) -> Response:
+            return PlainTextResponse(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
     app = None
+    catalog_watcher = None
     # Return the appropriate transport app
-    if args.transport == "http" or args.transport == "sse":
-        await mcp.run_async(transport=args.transport, host=args.host, port=args.port, log_level=args.log_level)
-    elif args.transport == "stdio":
-        await mcp.run_async(transport=args.transport, log_level=args.log_level)
-    else:
-        raise ValueError(f"Invalid transport: {args.transport}")
+    try:
+        # Report misconfigured tools before traffic arrives, and create the handles of the others
+        misconfigured_tools = await astra_db_manager.handles.validate(tool_loader.plans)
+        if misconfigured_tools:
+            logger.error(f"{len(misconfigured_tools)} misconfigured tools: {', '.join(misconfigured_tools)}")
+
+        # Full scan tools are warned about, or not registered, by the scan policy
+        planner = IndexPlanner(astra_db_manager, args.scan_policy)
+        plan_report = await planner.check(tool_loader.plans)
+        for tool_name, analysis in plan_report.items():
+            if analysis["action"] == "refuse":
+                tool_loader.remove_tool(tool_name)
+
+        await astra_db_manager.warm_up_connections()
+
+        # Pinned in-memory replicas of small reference tables and collections
+        await astra_db_manager.setup_replicas(tool_loader.plans)
+
+        # Changed tools of the catalog are swapped in without a restart
+        if args.catalog_reload_interval > 0:
+            session_tracker = SessionTracker()
+            mcp.add_middleware(session_tracker)
+            catalog_watcher = CatalogWatcher(tool_loader, run_tool_middleware, catalog_source,
+                                             interval=args.catalog_reload_interval, planner=planner,
+                                             sessions=session_tracker)
+            catalog_watcher.start()
+        if args.transport == "http" or args.transport == "sse":
+            await mcp.run_async(transport=args.transport, host=args.host, port=args.port, log_level=args.log_level)
+        elif args.transport == "stdio":
+            await mcp.run_async(transport=args.transport, log_level=args.log_level)
+        else:
+            raise ValueError(f"Invalid transport: {args.transport}")
+    finally:
+        # Flush pending audit trail rows on shutdown
+        if catalog_watcher:
+            await catalog_watcher.close()
+        await astra_db_manager.close()
     logger.info("Agentic Astra MCP Server started successfully")
 
 
@@ -0,0 +1,94 @@
+"""
+Response Shaping
+
+Trims find results before they are sent to the MCP client, as set by the
+"response" field of the tool config:
+
+    "response": {"keep_vectors": false, "max_string_length": 2000, "max_bytes": 65536}
+
+Vector fields ($vector and vector columns) are dropped unless keep_vectors is
+set, strings longer than max_string_length are truncated, and documents stop
+being added once the response reaches max_bytes. What was elided is reported
+in the "elided" entry of the result.
+"""
+
+from typing import Any, Dict, Optional
+from astrapy.data_types import DataAPIVector
+from .serialization import dumps
+
+VECTOR_FIELDS = ("$vector",)
+TRUNCATION_MARK = "..."
+
+
+class _Elided:
+    __slots__ = ("fields", "truncated_strings")
+
+    def __init__(self):
+        self.fields = set()
+        self.truncated_strings = 0
+
+
+def _shape_value(value: Any, keep_vectors: bool, max_string_length: Optional[int], elided: _Elided, path: str) -> Any:
+    if isinstance(value, str):
+        if max_string_length and len(value) > max_string_length:
+            elided.truncated_strings += 1
+            return value[:max_string_length] + TRUNCATION_MARK
+        return value
+    if isinstance(value, dict):
+        return _shape_document(value, keep_vectors, max_string_length, elided, path)
+    if isinstance(value, list) and max_string_length:
+        return [_shape_value(item, keep_vectors, max_string_length, elided, path) for item in value]
+    return value
+
+
+def _shape_document(document: Dict[str, Any], keep_vectors: bool, max_string_length: Optional[int],
+                    elided: _Elided, path: str = "") -> Dict[str, Any]:
+    shaped = {}
+    for key, value in document.items():
+        field = f"{path}{key}"
+        if not keep_vectors and (key in VECTOR_FIELDS or isinstance(value, DataAPIVector)):
+            elided.fields.add(field)
+            continue
+        shaped[key] = _shape_value(value, keep_vectors, max_string_length, elided, f"{field}.")
+    return shaped
+
+
+def _document_size(document: Dict[str, Any]) -> int:
+    return len(dumps(document))
+
+
+def shape_result(result: Any, response_config: Optional[Dict[str, Any]] = None) -> Any:
+    """Shape the documents of a find result, errors and raw results are returned as they are."""
+    if not isinstance(result, dict) or "documents" not in result:
+        return result
+
+    response_config = response_config or {}
+    keep_vectors = response_config.get("keep_vectors", False)
+    max_string_length = response_config.get("max_string_length")
+    max_bytes = response_config.get("max_bytes")
+
+    elided = _Elided()
+    documents = []
+    size = 0
+    omitted = 0
+    for document in result["documents"]:
+        if omitted:
+            omitted += 1
+            continue
+        shaped = _shape_document(document, keep_vectors, max_string_length, elided)
+        if max_bytes:
+            document_size = _document_size(shaped)
+            if size + document_size > max_bytes and documents:
+                omitted += 1
+                continue
+            size += document_size
+        documents.append(shaped)
+
+    shaped_result = {**result, "count": len(documents), "documents": documents}
+    if elided.fields or elided.truncated_strings or omitted:
+        shaped_result["elided"] = {
+            "fields": sorted(elided.fields),
+            "truncated_strings": elided.truncated_strings,
+            "documents": omitted,
+        }
+    return shaped_result
@@ -0,0 +1,56 @@
+"""
+Single-flight execution
+
+Identical tool calls running at the same time share one backend execution and
+its result. The shared execution is cancelled only when all its callers are gone.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from .logger import get_logger
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution."""
+    logger = get_logger("single_flight")
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn, or join the execution already in flight for the key."""
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.create_task(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            self.shared += 1
+            self.logger.debug(f"Joining in-flight call {key}")
+
+        call.waiters += 1
+        try:
+            # Shielded, so a cancelled caller does not cancel the other ones
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                self.logger.debug(f"All callers of {key} are gone, cancelling it")
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def in_flight(self) -> int:
+        return len(self._calls)
@@ -20,6 +20,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from agentic_astra.database import AstraDBManager
 from agentic_astra.logger import get_logger
 from agentic_astra.llm import run_prompt
+from agentic_astra.planner import indexed_columns
 from agentic_astra.tool_agent_prompt import prompt as tool_agent_prompt
 
 # Load environment variables
@@ -54,11 +55,7 @@ class AstraToolAgent:
 
             
     def get_indexed_columns(self, table_indexes: List[Dict[str, Any]], index_type: TableIndexType = TableIndexType.REGULAR) -> List[str]:
-        indexed_columns = []
-        for index in table_indexes:
-            if index.index_type == index_type:
-                indexed_columns.append(index.definition.column)
-        return indexed_columns
+        return indexed_columns(table_indexes, index_type)
 
     def get_table_schema(self) -> Optional[Dict[str, Any]]:
         """Get table schema information from Astra DB."""
@@ -38,7 +38,7 @@ Generate the tool specification in the following format:
             "operator": < The operator to use to filter the parameter - if not filled, the operator is $eq | type: String | default: $eq | If the attribute is not a vector column, do not fill this field>,
             "enum": <enum of the parameter - Array of Strings | If no enum detected, do not fill this field>,
             "embedding_model": <embedding model of the parameter - String | If no embedding model detected, do not fill this field>,
-            "expr": <if theres a expression for the parameters, like filter conditions, add it here. Use python basic operations or datetime operations | type: String | default: None | If unknown, do not fill this field>,
+            "expr": <if theres a expression for the parameters, like filter conditions, add it here. Use literals, arithmetic, and the time and string functions of the expression language, like now() - days(7) | type: String | default: None | If unknown, do not fill this field>,
             "value": <if theres a static value for the parameters, like filter conditions, add it here | type: Any | default: None | If unknown, do not fill this field>,
             "info": <inform if the attribute is part of partitionk key, sorting key, indexed column or vector column | type: String | default: "">
         }},
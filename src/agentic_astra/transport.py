@@ -0,0 +1,137 @@
+"""
+Data API Transport
+
+Shared, tuned HTTP clients for all the Data API traffic. astrapy uses one
+class-level httpx.Client for sync calls, and a new httpx.AsyncClient for every
+collection, table and database handle; both are replaced by clients with
+configurable pool limits, keep-alive expiry and optional HTTP/2
+(pip install agentic-astra[http2]).
+
+At startup, connections are opened to every resolved database endpoint, and a
+lightweight keep-alive ping keeps them warm between bursts of traffic.
+
+astrapy (2.1) has no option to pass HTTP clients, so this relies on its
+internals: the APICommander.client class attribute used by every sync request,
+and the async_client attribute each APICommander creates in __init__, found on
+the handles through vars(). The clients replaced here are closed, and the
+original sync client is put back on close(). astrapy is pinned to 2.1, and
+these attributes are checked before use: when they are not found, astrapy
+keeps its own clients and a warning is logged.
+"""
+
+import asyncio
+from typing import Any, Iterable
+
+import httpx
+from astrapy.utils.api_commander import APICommander
+from .logger import get_logger
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+DEFAULT_WARM_CONNECTIONS = 4
+DEFAULT_PING_INTERVAL = 30.0
+
+
+class DataAPITransport:
+    """Connection pools shared by every Data API handle."""
+    logger = get_logger("transport")
+
+    def __init__(self,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+                 keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+                 http2: bool = False,
+                 warm_connections: int = DEFAULT_WARM_CONNECTIONS,
+                 ping_interval: float = DEFAULT_PING_INTERVAL):
+        limits = httpx.Limits(max_connections=max_connections,
+                              max_keepalive_connections=max_keepalive_connections,
+                              keepalive_expiry=keepalive_expiry)
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                self.logger.warning("HTTP/2 needs the h2 package (pip install agentic-astra[http2]), using HTTP/1.1")
+                http2 = False
+        self.http2 = http2
+        self.warm_connections = min(warm_connections, max_keepalive_connections)
+        self.ping_interval = ping_interval
+        self.client = httpx.Client(limits=limits, http2=http2)
+        self.async_client = httpx.AsyncClient(limits=limits, http2=http2)
+        self.endpoints = []
+        self._ping_task = None
+        self._installed_over = None
+        self._close_tasks = set()
+        self._unclosed = []
+
+    def install(self):
+        """Use the shared sync client for every astrapy sync call."""
+        if not isinstance(getattr(APICommander, "client", None), httpx.Client):
+            self.logger.warning("astrapy has no APICommander.client, its sync requests keep their own client")
+            return
+        if self._installed_over is None:
+            self._installed_over = APICommander.client
+        APICommander.client = self.client
+
+    def attach(self, handle: Any) -> Any:
+        """Use the shared async client for the requests of an astrapy handle."""
+        for value in vars(handle).values():
+            if not isinstance(value, APICommander):
+                continue
+            replaced = getattr(value, "async_client", None)
+            if not isinstance(replaced, httpx.AsyncClient):
+                self.logger.warning(f"astrapy has no APICommander.async_client, {type(handle).__name__} "
+                                    f"keeps its own client")
+                continue
+            if replaced is not self.async_client:
+                value.async_client = self.async_client
+                self._close_later(replaced)
+        return handle
+
+    def _close_later(self, client: httpx.AsyncClient):
+        # The client astrapy created for the handle, closed in the background, or by close() outside of a loop
+        try:
+            task = asyncio.get_running_loop().create_task(client.aclose())
+        except RuntimeError:
+            self._unclosed.append(client)
+            return
+        self._close_tasks.add(task)
+        task.add_done_callback(self._close_tasks.discard)
+
+    async def _touch(self, endpoint: str, connections: int):
+        # Any response keeps the connection, the status is not relevant
+        async def request():
+            try:
+                await self.async_client.get(endpoint, timeout=10.0)
+            except httpx.HTTPError as e:
+                self.logger.debug(f"Keep-alive request to {endpoint} failed: {e}")
+        await asyncio.gather(*[request() for _ in range(connections)])
+
+    async def warm_up(self, endpoints: Iterable[str]):
+        """Open pooled connections to the endpoints, then keep them warm."""
+        self.endpoints = sorted(set(endpoint.rstrip("/") for endpoint in endpoints if endpoint))
+        if not self.endpoints or not self.warm_connections:
+            return
+        await asyncio.gather(*[self._touch(endpoint, self.warm_connections) for endpoint in self.endpoints])
+        self.logger.info(f"Opened {self.warm_connections} connections to {len(self.endpoints)} endpoints")
+        if self.ping_interval and self._ping_task is None:
+            self._ping_task = asyncio.create_task(self._keep_alive())
+
+    async def _keep_alive(self):
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            await asyncio.gather(*[self._touch(endpoint, self.warm_connections) for endpoint in self.endpoints])
+
+    async def close(self):
+        if self._ping_task:
+            self._ping_task.cancel()
+            await asyncio.gather(self._ping_task, return_exceptions=True)
+            self._ping_task = None
+        await asyncio.gather(*self._close_tasks, *[client.aclose() for client in self._unclosed],
+                             return_exceptions=True)
+        self._unclosed = []
+        await self.async_client.aclose()
+        if self._installed_over is not None and APICommander.client is self.client:
+            APICommander.client = self._installed_over
+            self._installed_over = None
+        self.client.close()
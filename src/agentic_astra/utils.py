@@ -1,4 +1,5 @@
 import re
+import json
 from typing import Any
 import os
 # Define development tokens and their associated claims
@@ -103,4 +104,17 @@ def add_underscore_to_dict_keys(data: Any) -> Any:
         return [add_underscore_to_dict_keys(item) for item in data]
     else:
         # Return primitive values as-is
-        return data
\ No newline at end of file
+        return data
+
+
+def canonical_arguments(arguments: Any) -> str:
+    """
+    Serialize tool call arguments in a canonical form, to be used as a key.
+    
+    Args:
+        arguments: The tool call arguments
+    
+    Returns:
+        A JSON string with sorted keys and no whitespace
+    """
+    return json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), default=str)
@@ -0,0 +1,66 @@
+"""
+Test cases for admission control and load shedding.
+"""
+import asyncio
+import pytest
+from agentic_astra.admission import AdmissionController, Overloaded
+
+
+@pytest.mark.asyncio
+async def test_tool_concurrency_limit():
+    """No more than max_concurrency calls of a tool run at the same time."""
+    admission = AdmissionController(max_concurrency=10, queue_delay_target_ms=1000)
+    running = 0
+    peak = 0
+
+    async def call():
+        nonlocal running, peak
+        async with admission.admit("tool", {"max_concurrency": 2}):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*[call() for _ in range(6)])
+    assert peak == 2
+    assert admission.active == 0
+
+
+@pytest.mark.asyncio
+async def test_priority_order():
+    """Queued calls with higher priority are admitted first."""
+    admission = AdmissionController(max_concurrency=1, queue_delay_target_ms=1000)
+    order = []
+
+    async def call(name, priority):
+        async with admission.admit(name, {"priority": priority}):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    blocker = asyncio.create_task(call("blocker", 0))
+    await asyncio.sleep(0)
+    low = asyncio.create_task(call("low", 0))
+    high = asyncio.create_task(call("high", 5))
+    await asyncio.gather(blocker, low, high)
+    assert order == ["blocker", "high", "low"]
+
+
+@pytest.mark.asyncio
+async def test_shed_after_queue_delay_target():
+    """Calls waiting longer than the queue delay target are shed."""
+    admission = AdmissionController(max_concurrency=1, queue_delay_target_ms=10)
+    release = asyncio.Event()
+
+    async def slow():
+        async with admission.admit("tool"):
+            await release.wait()
+
+    task = asyncio.create_task(slow())
+    await asyncio.sleep(0)
+    with pytest.raises(Overloaded):
+        async with admission.admit("tool"):
+            pass
+    release.set()
+    await task
+    assert admission.shed == 1
+    assert admission.active == 0
@@ -0,0 +1,63 @@
+"""
+Test cases for the background audit trail writer.
+"""
+import asyncio
+import pytest
+from agentic_astra.audit import AuditWriter, OverflowPolicy
+
+
+class FakeAuditTable:
+    """Async table stand-in that records the insert_many batches."""
+
+    def __init__(self):
+        self.batches = []
+
+    async def insert_many(self, rows):
+        self.batches.append(rows)
+
+
+@pytest.mark.asyncio
+async def test_events_merged_per_run():
+    """All the events of a run are written as a single row."""
+    table = FakeAuditTable()
+    writer = AuditWriter(table, batch_size=10, flush_interval=10)
+    await writer.submit({"tool_id": "t", "run_id": 1, "date": "2025-01-01", "status": "started"})
+    await writer.submit({"tool_id": "t", "run_id": 1, "date": "2025-01-02", "parameters": "{}"})
+    await writer.submit({"tool_id": "t", "run_id": 1, "status": "completed", "status_code": 200})
+    await writer.close()
+
+    assert table.batches == [[{
+        "tool_id": "t",
+        "run_id": 1,
+        "date": "2025-01-01",
+        "status": "completed",
+        "parameters": "{}",
+        "status_code": 200,
+    }]]
+
+
+@pytest.mark.asyncio
+async def test_flush_by_batch_size():
+    """A full batch of finished runs is written without waiting for the interval."""
+    table = FakeAuditTable()
+    writer = AuditWriter(table, batch_size=2, flush_interval=10)
+    for run_id in range(4):
+        await writer.submit({"tool_id": "t", "run_id": run_id, "status": "completed"})
+    await asyncio.sleep(0.01)
+
+    assert [len(batch) for batch in table.batches] == [2, 2]
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest():
+    """The oldest run is dropped when the queue is full."""
+    table = FakeAuditTable()
+    writer = AuditWriter(table, max_queue_size=2, flush_interval=10,
+                         overflow_policy=OverflowPolicy.DROP_OLDEST)
+    for run_id in range(3):
+        await writer.submit({"tool_id": "t", "run_id": run_id, "status": "started"})
+    await writer.close()
+
+    assert [row["run_id"] for row in table.batches[0]] == [1, 2]
+    assert writer.dropped == 1
@@ -0,0 +1,70 @@
+"""
+Test cases for the batch method of RunToolMiddleware.
+"""
+import asyncio
+import pytest
+from types import SimpleNamespace
+from agentic_astra.run_tool import RunToolMiddleware
+
+TOOLS = [
+    {"name": "customers", "method": "find", "collection_name": "customers",
+     "parameters": [{"param": "customer_id", "description": "Customer ID", "required": 1}]},
+    {"name": "tickets", "method": "find", "collection_name": "tickets", "parameters": []},
+    {"name": "batch", "method": "batch", "parameters": [], "max_calls": 3},
+]
+
+
+class FakeManager:
+    astra_db_db_name = "db"
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+    async def find_async(self, arguments=None, plan=None, **kwargs):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if plan.name == "tickets":
+            raise RuntimeError("tickets unavailable")
+        return {"success": True, "count": 1, "documents": [{"tool": plan.name}]}
+
+    async def log_audit_async(self, **kwargs):
+        pass
+
+
+def call(name, arguments):
+    return SimpleNamespace(fastmcp_context=SimpleNamespace(client_id="test"),
+                           message=SimpleNamespace(name=name, arguments=arguments))
+
+
+@pytest.mark.asyncio
+async def test_batch_results_in_order():
+    """Calls run concurrently and errors are isolated per entry."""
+    manager = FakeManager()
+    middleware = RunToolMiddleware(manager, TOOLS)
+    result = await middleware.on_call_tool(call("batch", {"calls": [
+        {"tool": "customers", "arguments": {"customer_id": "1"}},
+        {"tool": "tickets"},
+        {"tool": "customers", "arguments": {}},
+    ]}), None)
+
+    entries = result.structured_content["results"]
+    assert entries[0] == {"tool": "customers", "result": {"success": True, "count": 1,
+                                                          "documents": [{"tool": "customers"}]}}
+    assert entries[1] == {"tool": "tickets", "error": "tickets unavailable"}
+    assert entries[2] == {"tool": "customers", "error": "Parameter customer_id is required"}
+    assert result.structured_content["success"] is False
+    assert manager.max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_limits():
+    """Batches cannot exceed max_calls or nest other batches."""
+    middleware = RunToolMiddleware(FakeManager(), TOOLS)
+    result = await middleware.on_call_tool(call("batch", {"calls": [{"tool": "tickets"}] * 4}), None)
+    assert result.structured_content == {"error": "A batch can have at most 3 calls"}
+
+    result = await middleware.on_call_tool(call("batch", {"calls": [{"tool": "batch"}]}), None)
+    assert result.structured_content["results"][0]["error"] == "Tool batch cannot be run in a batch"
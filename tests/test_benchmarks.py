@@ -0,0 +1,14 @@
+"""
+Smoke test of the benchmark suite against the Data API stand-in.
+"""
+from benchmarks.run import run_suite
+
+
+def test_benchmark_suite():
+    """Every benchmark runs without errors and reports its latencies."""
+    report = run_suite(latency_ms=0, jitter_ms=0, concurrency=[2], catalog_sizes=[5], operations=4, repeat=1)
+    benchmarks = [result["benchmark"] for result in report["results"]]
+    assert benchmarks == ["on_call_tool", "find_async", "find", "load_tools", "catalog"]
+    for result in report["results"]:
+        assert result["errors"] == 0
+        assert result["p99_ms"] >= result["p50_ms"] > 0
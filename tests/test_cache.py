@@ -0,0 +1,76 @@
+"""
+Test cases for the tool result cache.
+"""
+import asyncio
+import pytest
+from agentic_astra.cache import ResultCache
+
+
+class Loader:
+    """Counts the backend calls and returns a new result on each one."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return {"success": True, "count": self.calls, "documents": []}
+
+
+@pytest.mark.asyncio
+async def test_hit_and_miss():
+    """The second identical call is served from the cache."""
+    cache = ResultCache()
+    loader = Loader()
+    config = {"ttl": 60}
+    first = await cache.get_or_load("tool", config, {"a": 1, "b": 2}, loader)
+    second = await cache.get_or_load("tool", config, {"b": 2, "a": 1}, loader)
+
+    assert first == second
+    assert loader.calls == 1
+    assert cache.stats()["tools"]["tool"]["hits"] == 1
+    assert cache.stats()["tools"]["tool"]["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_not_cached_without_config():
+    """Tools without a cache config always call the backend."""
+    cache = ResultCache()
+    loader = Loader()
+    await cache.get_or_load("tool", None, {}, loader)
+    await cache.get_or_load("tool", None, {}, loader)
+    assert loader.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_max_entries_lru():
+    """The least recently used entry of a tool is evicted."""
+    cache = ResultCache()
+    loader = Loader()
+    config = {"ttl": 60, "max_entries": 2}
+    await cache.get_or_load("tool", config, {"q": 1}, loader)
+    await cache.get_or_load("tool", config, {"q": 2}, loader)
+    await cache.get_or_load("tool", config, {"q": 1}, loader)
+    await cache.get_or_load("tool", config, {"q": 3}, loader)
+
+    assert cache.stats()["tools"]["tool"]["evictions"] == 1
+    await cache.get_or_load("tool", config, {"q": 1}, loader)
+    assert loader.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate():
+    """Expired entries are served while a background refresh runs."""
+    cache = ResultCache()
+    loader = Loader()
+    config = {"ttl": 0.1, "stale_while_revalidate": 60}
+    await cache.get_or_load("tool", config, {}, loader)
+    await asyncio.sleep(0.15)
+
+    stale = await cache.get_or_load("tool", config, {}, loader)
+    assert stale["count"] == 1
+    await asyncio.sleep(0)
+
+    fresh = await cache.get_or_load("tool", config, {}, loader)
+    assert fresh["count"] == 2
+    assert cache.stats()["tools"]["tool"]["stale_hits"] == 1
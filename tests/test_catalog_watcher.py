@@ -0,0 +1,228 @@
+"""
+Test cases for the hot reload of the tool catalog.
+"""
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+from fastmcp import FastMCP
+
+from agentic_astra.cache import ResultCache
+from agentic_astra.catalog_watcher import CatalogWatcher, FileCatalogSource, SessionTracker, diff_catalog, \
+    fingerprint
+from agentic_astra.load_tools import ToolLoader
+from agentic_astra.replica import ReplicaManager
+from agentic_astra.run_tool import RunToolMiddleware
+
+ORDERS = {
+    "name": "search_orders",
+    "description": "Search orders",
+    "method": "find",
+    "collection_name": "orders",
+    "parameters": [{"param": "status", "description": "Status of the orders"}],
+}
+PRODUCTS = {
+    "name": "search_products",
+    "description": "Search products",
+    "method": "find",
+    "collection_name": "products",
+    "parameters": [{"param": "color", "description": "Color of the products"}],
+}
+CUSTOMERS = {
+    "name": "search_customers",
+    "description": "Search customers",
+    "method": "find",
+    "collection_name": "customers",
+    "parameters": [{"param": "country", "description": "Country of the customers"}],
+}
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+
+class FakeCollection:
+    def find(self, filter_dict, limit=None):
+        return FakeCursor([{"_id": "1", "status": "open", "color": "red"}])
+
+
+class FakeHandles:
+    def __init__(self):
+        self.validated = []
+
+    async def validate(self, plans):
+        self.validated.extend(plans)
+        return {}
+
+    async def get_async(self, db_name, object_type, object_name):
+        return FakeCollection()
+
+
+class FakeManager:
+    astra_db_db_name = "db"
+
+    def __init__(self):
+        self.handles = FakeHandles()
+        self.replicas = None
+
+
+class FakeSession:
+    def __init__(self):
+        self.notified = 0
+
+    async def send_tool_list_changed(self):
+        self.notified += 1
+
+
+def write_catalog(path, tools_config, mtime):
+    path.write_text(json.dumps(tools_config))
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_diff_catalog():
+    fingerprints = {config["name"]: fingerprint(config) for config in (ORDERS, PRODUCTS)}
+    # Key order and the database _id do not count as changes
+    reordered = {**dict(reversed(list(ORDERS.items()))), "_id": "abc"}
+    diff = diff_catalog(fingerprints, [reordered, {**PRODUCTS, "limit": 5}, CUSTOMERS])
+    assert (diff.added, diff.updated, diff.removed) == (["search_customers"], ["search_products"], [])
+    diff = diff_catalog(fingerprints, [ORDERS])
+    assert (diff.added, diff.updated, diff.removed) == ([], [], ["search_products"])
+    assert not diff_catalog(fingerprints, [PRODUCTS, ORDERS])
+
+
+@pytest.mark.asyncio
+async def test_reload_swaps_the_changed_tools(tmp_path):
+    path = tmp_path / "catalog.json"
+    write_catalog(path, [ORDERS, PRODUCTS], 1_000_000_000)
+    source = FileCatalogSource(str(path))
+    mcp = FastMCP("test")
+    manager = FakeManager()
+    loader = ToolLoader(mcp, manager, source.load())
+    loader.load_all_tools()
+    middleware = RunToolMiddleware(manager, loader.tools_config, loader.plans, result_cache=ResultCache())
+    watcher = CatalogWatcher(loader, middleware, source)
+
+    # Unchanged file, nothing is read
+    assert not await watcher.reload()
+
+    in_flight = middleware.plans["search_products"]
+    write_catalog(path, [{**PRODUCTS, "limit": 5}, CUSTOMERS], 2_000_000_000)
+    diff = await watcher.reload()
+    assert (diff.added, diff.updated, diff.removed) == (["search_customers"], ["search_products"], ["search_orders"])
+    assert sorted(await mcp.get_tools()) == ["search_customers", "search_products"]
+    assert middleware.plans is loader.plans
+    assert sorted(middleware.plans) == ["search_customers", "search_products"]
+    assert middleware.plans["search_products"].find_options["limit"] == 5
+    assert [config["name"] for config in middleware.tools_config] == ["search_products", "search_customers"]
+    assert sorted(manager.handles.validated) == ["search_customers", "search_products"]
+    # Calls that already hold the previous plan keep it
+    assert "limit" not in in_flight.find_options
+
+
+@pytest.mark.asyncio
+async def test_failed_versions_keep_the_previous_one(tmp_path):
+    path = tmp_path / "catalog.json"
+    write_catalog(path, [ORDERS], 1_000_000_000)
+    source = FileCatalogSource(str(path))
+    mcp = FastMCP("test")
+    loader = ToolLoader(mcp, FakeManager(), source.load())
+    loader.load_all_tools()
+    middleware = RunToolMiddleware(FakeManager(), loader.tools_config, loader.plans, result_cache=ResultCache())
+    watcher = CatalogWatcher(loader, middleware, source)
+
+    broken = {key: value for key, value in ORDERS.items() if key != "parameters"}
+    write_catalog(path, [broken], 2_000_000_000)
+    diff = await watcher.reload()
+    assert diff.updated == ["search_orders"]
+    assert list(await mcp.get_tools()) == ["search_orders"]
+    assert middleware.plans["search_orders"].config == ORDERS
+
+    # An empty catalog is ignored
+    write_catalog(path, [], 3_000_000_000)
+    assert not await watcher.reload()
+    assert list(middleware.plans) == ["search_orders"]
+
+
+@pytest.mark.asyncio
+async def test_reload_updates_the_replicas_and_notifies_the_sessions(tmp_path):
+    path = tmp_path / "catalog.json"
+    cached_orders = {**ORDERS, "replica": {"refresh_interval": 0}}
+    write_catalog(path, [cached_orders, PRODUCTS], 1_000_000_000)
+    source = FileCatalogSource(str(path))
+    manager = FakeManager()
+    loader = ToolLoader(FastMCP("test"), manager, source.load())
+    loader.load_all_tools()
+    manager.replicas = ReplicaManager(manager)
+    manager.replicas.register(loader.plans)
+    await manager.replicas.start()
+    middleware = RunToolMiddleware(manager, loader.tools_config, loader.plans, result_cache=ResultCache())
+    sessions = SessionTracker()
+    session = FakeSession()
+    sessions.sessions.add(session)
+    watcher = CatalogWatcher(loader, middleware, source, sessions=sessions)
+    assert list(manager.replicas.replicas) == [("db", "collection", "orders")]
+
+    # The orders replica is no longer used, products opt in
+    write_catalog(path, [ORDERS, {**PRODUCTS, "replica": {"refresh_interval": 0}}], 2_000_000_000)
+    await watcher.reload()
+    assert list(manager.replicas.replicas) == [("db", "collection", "products")]
+    plan = middleware.plans["search_products"]
+    assert manager.replicas.find(plan, plan.find_params(plan.bind({"color": "red"})[0]))
+    assert manager.replicas.find(middleware.plans["search_orders"], {}) is None
+    assert session.notified == 1
+    await manager.replicas.close()
+
+
+class SlowFindManager(FakeManager):
+    def __init__(self):
+        super().__init__()
+        self.finds = 0
+
+    async def find_async(self, arguments=None, plan=None, **kwargs):
+        self.finds += 1
+        await asyncio.sleep(0.1)
+        return {"success": True, "count": 1, "documents": [{"limit": plan.find_options.get("limit")}]}
+
+    async def log_audit_async(self, **kwargs):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_loads_of_the_previous_version_are_not_shared(tmp_path):
+    """Calls after a reload neither join nor read the results of the previous version of the tool."""
+    path = tmp_path / "catalog.json"
+    cached_products = {**PRODUCTS, "cache": {"ttl": 60}}
+    write_catalog(path, [cached_products], 1_000_000_000)
+    source = FileCatalogSource(str(path))
+    manager = SlowFindManager()
+    loader = ToolLoader(FastMCP("test"), manager, source.load())
+    loader.load_all_tools()
+    middleware = RunToolMiddleware(manager, loader.tools_config, loader.plans, result_cache=ResultCache())
+    watcher = CatalogWatcher(loader, middleware, source)
+
+    def call():
+        context = SimpleNamespace(fastmcp_context=SimpleNamespace(client_id="test"),
+                                  message=SimpleNamespace(name="search_products", arguments={"color": "red"}))
+        return middleware.on_call_tool(context, None)
+
+    previous = asyncio.create_task(call())
+    await asyncio.sleep(0.01)
+    write_catalog(path, [{**cached_products, "limit": 5}], 2_000_000_000)
+    await watcher.reload()
+    current = await call()
+    assert current.structured_content["documents"] == [{"limit": 5}]
+    assert (await previous).structured_content["documents"] == [{"limit": None}]
+
+    # The late result of the previous version is not served
+    assert (await call()).structured_content["documents"] == [{"limit": 5}]
+    assert manager.finds == 2
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from agentic_astra.embedding_batcher import EmbeddingBatcher
+from agentic_astra.embeddings import EmbeddingClient
+
+
+class FakeProvider:
+    name = "fake"
+
+    def __init__(self, error=None, delay=0.0):
+        self.calls = []
+        self.error = error
+        self.delay = delay
+
+    async def embed_async(self, texts, model, timeout=None):
+        self.calls.append((list(texts), model, timeout))
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [[float(len(text))] for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_provider_call():
+    provider = FakeProvider()
+    batcher = EmbeddingBatcher(max_batch_size=10, window_ms=5)
+    vectors = await asyncio.gather(*[batcher.embed(provider, text, "model", timeout=1)
+                                     for text in ("a", "bb", "ccc", "a")])
+    assert vectors == [[1.0], [2.0], [3.0], [1.0]]
+    assert len(provider.calls) == 1
+    texts, model, timeout = provider.calls[0]
+    assert texts == ["a", "bb", "ccc"]
+    assert model == "model"
+    assert 0 < timeout <= 1
+
+
+@pytest.mark.asyncio
+async def test_full_batches_are_sent_without_waiting():
+    provider = FakeProvider()
+    batcher = EmbeddingBatcher(max_batch_size=2, window_ms=10000)
+    vectors = await asyncio.wait_for(asyncio.gather(*[batcher.embed(provider, str(index) * index, "model")
+                                                      for index in range(1, 5)]), timeout=1)
+    assert vectors == [[1.0], [2.0], [3.0], [4.0]]
+    assert [texts for texts, _, _ in provider.calls] == [["1", "22"], ["333", "4444"]]
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller_and_cancelled_callers_do_not_cancel_the_batch():
+    batcher = EmbeddingBatcher(window_ms=1)
+    failing = FakeProvider(error=RuntimeError("rate limited"))
+    results = await asyncio.gather(batcher.embed(failing, "a", "model"), batcher.embed(failing, "b", "model"),
+                                   return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    slow = FakeProvider(delay=0.05)
+    impatient = asyncio.create_task(asyncio.wait_for(batcher.embed(slow, "a", "model"), timeout=0.01))
+    patient = asyncio.create_task(batcher.embed(slow, "bb", "model"))
+    with pytest.raises(asyncio.TimeoutError):
+        await impatient
+    assert await patient == [2.0]
+    await batcher.close()
+
+
+@pytest.mark.asyncio
+async def test_client_batches_by_model():
+    provider = FakeProvider()
+    client = EmbeddingClient(batcher=EmbeddingBatcher(window_ms=5))
+    client.providers["openai"] = provider
+    await asyncio.gather(client.embed_async("a", "text-embedding-3-small"),
+                         client.embed_async("b", "text-embedding-3-small"),
+                         client.embed_async("c", "text-embedding-3-large"))
+    assert sorted((model, texts) for texts, model, _ in provider.calls) == [
+        ("text-embedding-3-large", ["c"]), ("text-embedding-3-small", ["a", "b"])]
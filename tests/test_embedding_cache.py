@@ -0,0 +1,66 @@
+import pytest
+
+from agentic_astra.embedding_cache import EmbeddingCache
+from agentic_astra.embeddings import EmbeddingClient
+from agentic_astra.metrics import embedding_cache_collector
+
+
+def test_memory_lru_with_normalized_keys():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("model", "red  dress ", [1.0, 2.0])
+    assert cache.get("model", "red dress") == [1.0, 2.0]
+    assert cache.get("other-model", "red dress") is None
+
+    cache.put("model", "blue dress", [3.0])
+    cache.get("model", "red dress")
+    cache.put("model", "green dress", [4.0])
+    assert cache.get("model", "blue dress") is None
+    assert cache.get("model", "red dress") == [1.0, 2.0]
+    assert cache.stats() == {"memory_hits": 3, "disk_hits": 0, "misses": 2, "evictions": 1, "entries": 2}
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restarts(tmp_path):
+    path = str(tmp_path / "embeddings.db")
+    cache = EmbeddingCache(path=path)
+    await cache.put_async("model", "cheap flights to MIA", [0.5, 0.25])
+    cache.close()
+
+    cache = EmbeddingCache(max_entries=1, path=path)
+    assert await cache.get_async("model", "cheap flights to MIA") == [0.5, 0.25]
+    assert cache.get("model", "cheap flights to MIA") == [0.5, 0.25]
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.stats()["memory_hits"] == 1
+    cache.close()
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path / "embeddings.db"), max_disk_entries=2)
+    for index in range(4):
+        cache.put("model", f"query {index}", [float(index)])
+    cache.close()
+
+    cache = EmbeddingCache(path=str(tmp_path / "embeddings.db"))
+    assert cache.disk_entries() == 2
+    assert cache.get("model", "query 0") is None
+    assert cache.get("model", "query 3") == [3.0]
+
+
+@pytest.mark.asyncio
+async def test_client_skips_the_provider_on_hits():
+    calls = []
+
+    class FakeProvider:
+        async def embed_async(self, texts, model, timeout=None):
+            calls.append(texts)
+            return [[float(len(text))] for text in texts]
+
+    client = EmbeddingClient(cache=EmbeddingCache())
+    client.providers["openai"] = FakeProvider()
+    assert await client.embed_async("red dress", "text-embedding-3-small") == [9.0]
+    assert await client.embed_async(" red dress", "text-embedding-3-small") == [9.0]
+    assert len(calls) == 1
+
+    samples = {name: values for name, _, _, _, values in embedding_cache_collector(client.cache)()}
+    assert samples["agentic_astra_embedding_cache_lookups_total"][("memory_hits",)] == 1
+    assert samples["agentic_astra_embedding_cache_lookups_total"][("misses",)] == 1
@@ -0,0 +1,80 @@
+import time
+
+import httpx
+import pytest
+
+from agentic_astra.embeddings import EmbeddingClient, OpenAIEmbeddingProvider, WatsonxEmbeddingProvider
+
+
+def mock_provider(provider, handler):
+    provider.client = httpx.Client(transport=httpx.MockTransport(handler))
+    provider.async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return provider
+
+
+def openai_response(texts):
+    # Out of order, the provider sorts by index
+    return {"data": [{"index": index, "embedding": [float(index)]} for index in reversed(range(len(texts)))]}
+
+
+@pytest.mark.asyncio
+async def test_retries_rate_limited_requests():
+    statuses = [429, 503]
+
+    def handler(request):
+        if statuses:
+            return httpx.Response(statuses.pop(0), headers={"retry-after": "0.01"})
+        return httpx.Response(200, json=openai_response(["a", "b"]))
+
+    provider = mock_provider(OpenAIEmbeddingProvider("https://embeddings.test", {}, max_retries=2), handler)
+    assert await provider.embed_async(["a", "b"], "text-embedding-3-small", timeout=5) == [[0.0], [1.0]]
+    assert provider.embed(["a", "b"], "text-embedding-3-small", timeout=5) == [[0.0], [1.0]]
+
+
+@pytest.mark.asyncio
+async def test_does_not_retry_client_errors_or_past_the_deadline():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(400 if len(calls) == 1 else 429, headers={"retry-after": "1"})
+
+    provider = mock_provider(OpenAIEmbeddingProvider("https://embeddings.test", {}, max_retries=5), handler)
+    with pytest.raises(httpx.HTTPStatusError):
+        await provider.embed_async(["a"], "text-embedding-3-small", timeout=5)
+    assert len(calls) == 1
+
+    started = time.monotonic()
+    with pytest.raises(httpx.HTTPStatusError):
+        await provider.embed_async(["a"], "text-embedding-3-small", timeout=0.5)
+    assert len(calls) == 2
+    assert time.monotonic() - started < 0.5
+
+
+def test_watsonx_request_format():
+    payloads = []
+
+    def handler(request):
+        payloads.append(request.read())
+        return httpx.Response(200, json={"results": [{"embedding": [1.0]}, {"embedding": [2.0]}]})
+
+    provider = mock_provider(WatsonxEmbeddingProvider("https://watsonx.test", {}, "project"), handler)
+    assert provider.embed(["a", "b"], "slate-30m-english-rtrvr") == [[1.0], [2.0]]
+    assert b'"inputs":["a","b"]' in payloads[0].replace(b" ", b"")
+    assert b'"project_id":"project"' in payloads[0].replace(b" ", b"")
+
+
+def test_client_reads_the_configuration_once(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    client = EmbeddingClient()
+    with pytest.raises(EnvironmentError):
+        client.provider("text-embedding-3-small")
+
+    monkeypatch.setenv("OPENAI_API_KEY", "key")
+    provider = client.provider("text-embedding-3-small")
+    monkeypatch.setenv("OPENAI_API_KEY", "other")
+    assert client.provider("text-embedding-3-large") is provider
+    assert provider.client.headers["authorization"] == "Bearer key"
+
+    with pytest.raises(ValueError):
+        client.provider("unknown-model")
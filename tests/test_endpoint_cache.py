@@ -0,0 +1,87 @@
+"""
+Test cases for the persistent database endpoint cache.
+"""
+import asyncio
+import time
+
+import pytest
+from types import SimpleNamespace
+from agentic_astra.endpoint_cache import EndpointCache
+
+
+def database(name, db_id, endpoint):
+    region = SimpleNamespace(name="us-east1", api_endpoint=endpoint)
+    return SimpleNamespace(name=name, id=db_id, regions=[region])
+
+
+def test_reused_across_instances(tmp_path):
+    """Resolved endpoints are read back by a new process, for the same token only."""
+    path = str(tmp_path / "endpoints.json")
+    EndpointCache("token", path=path, ttl=60).put_databases([
+        database("catalog", "id-1", "https://id-1.apps.astra.datastax.com"),
+        database("products", "id-2", "https://id-2.apps.astra.datastax.com"),
+    ])
+
+    cache = EndpointCache("token", path=path, ttl=60)
+    assert cache.api_endpoint("products") == "https://id-2.apps.astra.datastax.com"
+    assert cache.get_by_id("id-1")["name"] == "catalog"
+    assert EndpointCache("other-token", path=path, ttl=60).api_endpoint("products") is None
+    assert "token" not in open(path).read()
+
+
+def test_ttl_and_invalidate(tmp_path):
+    """Expired and invalidated entries are resolved again."""
+    path = str(tmp_path / "endpoints.json")
+    expired = EndpointCache("token", path=path, ttl=0.01)
+    expired.put_databases([database("catalog", "id-1", "https://id-1")])
+    time.sleep(0.02)
+    assert expired.api_endpoint("catalog") is None
+
+    cache = EndpointCache("token", path=path, ttl=60)
+    cache.put_databases([database("catalog", "id-1", "https://id-1")])
+    cache.invalidate("catalog")
+    assert EndpointCache("token", path=path, ttl=60).api_endpoint("catalog") is None
+
+
+def test_cold_start_lists_databases_once(tmp_path, monkeypatch):
+    """With only an endpoint configured, the databases listed to find its name are cached."""
+    from agentic_astra.database import AstraDBManager
+
+    calls = []
+
+    def get_dbs(self):
+        calls.append(1)
+        return [database("catalog", "4dcd68d4-978d-45c6-a6b5-505416f98a61",
+                         "https://4dcd68d4-978d-45c6-a6b5-505416f98a61-us-east1.apps.astra.datastax.com")]
+
+    monkeypatch.setattr(AstraDBManager, "get_dbs", get_dbs)
+    manager = AstraDBManager(
+        token="token",
+        endpoint="https://4dcd68d4-978d-45c6-a6b5-505416f98a61-us-east1.apps.astra.datastax.com",
+        endpoint_cache=EndpointCache("token", path=str(tmp_path / "endpoints.json"), ttl=60))
+    assert manager.astra_db_db_name == "catalog"
+    assert manager.get_db_by_name("catalog") is not None
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_calls_resolve_once(tmp_path, monkeypatch):
+    """Concurrent first calls for a database share one lookup, under the lock of the database."""
+    from agentic_astra.database import AstraDBManager
+
+    lookups = []
+
+    async def get_dbs_async(self):
+        lookups.append(1)
+        await asyncio.sleep(0.01)
+        return [database("products", "id-2", "https://id-2.apps.astra.datastax.com")]
+
+    monkeypatch.setattr(AstraDBManager, "get_dbs_async", get_dbs_async)
+    manager = AstraDBManager(token=None,
+                             endpoint_cache=EndpointCache("token", path=str(tmp_path / "endpoints.json"), ttl=60))
+    manager.client = SimpleNamespace(get_async_database=lambda endpoint, token: SimpleNamespace(endpoint=endpoint))
+
+    handles = await asyncio.gather(*(manager.get_async_db_by_name("products") for _ in range(5)))
+    assert len(lookups) == 1
+    assert all(handle is handles[0] for handle in handles)
+    assert handles[0].endpoint == "https://id-2.apps.astra.datastax.com"
@@ -0,0 +1,98 @@
+"""
+Test cases for the sandboxed parameter expressions.
+"""
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pytest
+
+from agentic_astra import expressions
+from agentic_astra.expressions import ExpressionError, compile_expression
+from agentic_astra.query_plan import compile_plans
+
+
+def test_constant_expressions():
+    """Literals, arithmetic and string functions are evaluated once."""
+    expression = compile_expression("{'$in': [upper('a') + 'b', max(1, 2) * 3, round(7 / 2)]}")
+    assert not expression.time_dependent
+    assert expression.evaluate() == {"$in": ["Ab", 6, 4]}
+    assert compile_expression("' Red '.strip().lower()").evaluate() == "red"
+
+
+def test_time_expressions_share_the_bucket_start(monkeypatch):
+    """Every time function returns the start of the bucket."""
+    monkeypatch.setattr(expressions.time, "time", lambda: 1_000_000_030.5)
+    expression = compile_expression("(now() - days(7)).isoformat()", bucket_seconds=60)
+    assert expression.time_dependent
+    assert expression.evaluate() == (datetime.fromtimestamp(1_000_000_020) - timedelta(days=7)).isoformat()
+    legacy = compile_expression("datetime.now() - timedelta(days=7)", bucket_seconds=60)
+    assert legacy.evaluate() == datetime.fromtimestamp(1_000_000_020) - timedelta(days=7)
+
+
+def test_time_expressions_are_memoized_per_bucket(monkeypatch):
+    """The evaluator only runs again when the bucket changes."""
+    clock = [100.2]
+    monkeypatch.setattr(expressions.time, "time", lambda: clock[0])
+    expression = compile_expression("now()")
+    calls = []
+    evaluator = expression._evaluator
+    expression._evaluator = lambda c: calls.append(c.timestamp) or evaluator(c)
+
+    first = expression.evaluate()
+    clock[0] = 100.9
+    assert expression.evaluate() is first
+    assert calls == []
+    clock[0] = 101.1
+    assert expression.evaluate() == datetime.fromtimestamp(101)
+    assert calls == [101]
+
+
+@pytest.mark.parametrize("source", [
+    "__import__('os').system('true')",
+    "open('/etc/passwd')",
+    "datetime.now().__class__",
+    "now().tzinfo",
+    "'{0.__class__}'.format(1)",
+    "[x for x in 'abc']",
+    "lambda: 1",
+    "2 ** 100000",
+    "'a' * 100000",
+    "now(1)",
+    "now(",
+])
+def test_rejected_expressions(source):
+    """Names, attributes and syntax outside of the language are rejected at compile time."""
+    with pytest.raises(ExpressionError):
+        compile_expression(source)
+
+
+@pytest.mark.parametrize("source", [
+    "'a' * 300000000",
+    "300000000 * ['a']",
+    "'%099999999d' % 1",
+    "('a' * 10000).replace('a', 'a' * 10000)",
+    "'ab'.replace('', 'x' * 9999)",
+])
+def test_large_values_are_rejected_before_they_are_built(source):
+    """Sizes are checked on the operands, the rejected value is never allocated."""
+    tracemalloc.start()
+    try:
+        with pytest.raises(ExpressionError):
+            compile_expression(source)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 1024 * 1024
+    assert compile_expression("('ab' * 3).replace('b', 'cd')").evaluate() == "acdacdacd"
+
+
+def test_invalid_expression_skips_the_tool():
+    """Tools with a rejected expression are not compiled."""
+    tool = {"name": "recent", "method": "find", "collection_name": "orders",
+            "parameters": [{"param": "since", "attribute": "created_at", "expr": "{'$gte': now() - days(1)}"}]}
+    unsafe = {**tool, "name": "unsafe",
+              "parameters": [{"param": "since", "attribute": "created_at", "expr": "__import__('os')"}]}
+    plans = compile_plans([tool, unsafe])
+    assert list(plans) == ["recent"]
+    filter_dict = plans["recent"].bind({})[0]
+    assert isinstance(filter_dict["created_at"]["$gte"], datetime)
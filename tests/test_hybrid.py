@@ -0,0 +1,102 @@
+"""
+Hybrid search: reciprocal rank fusion and the fan-out against the Data API stand-in.
+"""
+import pytest
+
+from agentic_astra.hybrid import and_filter, document_key, reciprocal_rank_fusion
+from agentic_astra.query_plan import QueryPlan
+from benchmarks.data_api_stand_in import DataAPIStandIn
+from benchmarks.run import stand_in_manager
+
+HYBRID_TOOL = {
+    "name": "search_products",
+    "method": "find",
+    "collection_name": "products",
+    "limit": 3,
+    "projection": {"name": 1},
+    "parameters": [
+        {"param": "search", "attribute": "$vector", "embedding_model": "text-embedding-3-small"},
+        {"param": "color"},
+    ],
+    "hybrid": {
+        "strategies": [
+            {"type": "vector", "limit": 5},
+            {"type": "lexical"},
+            {"type": "match", "attribute": "name", "weight": 2},
+        ]
+    },
+}
+
+
+def test_reciprocal_rank_fusion():
+    first = [{"_id": "a"}, {"_id": "b"}, {"_id": "c"}]
+    second = [{"_id": "c"}, {"_id": "a"}, {"_id": "a"}, {"_id": "d"}]
+    fused = reciprocal_rank_fusion([(1.0, first), (1.0, second)], document_key(), k=60)
+    assert [document["_id"] for document in fused] == ["a", "c", "b", "d"]
+
+    fused = reciprocal_rank_fusion([(1.0, first), (3.0, second)], document_key(), k=60, limit=2)
+    assert [document["_id"] for document in fused] == ["c", "a"]
+
+    rows = [{"id": 1, "day": "mon"}, {"id": 1, "day": "tue"}]
+    fused = reciprocal_rank_fusion([(1.0, rows), (1.0, rows[:1])], document_key(["id", "day"]))
+    assert fused == [{"id": 1, "day": "mon"}, {"id": 1, "day": "tue"}]
+
+
+def test_and_filter_keeps_both_conditions():
+    assert and_filter({"color": {"$eq": "red"}}, {"name": {"$eq": "x"}}) == {
+        "color": {"$eq": "red"}, "name": {"$eq": "x"}}
+    assert and_filter({"name": {"$eq": "red"}}, {"name": {"$eq": "x"}}) == {
+        "$and": [{"name": {"$eq": "red"}}, {"name": {"$eq": "x"}}]}
+
+
+def test_hybrid_plan_validation():
+    plan = QueryPlan({**HYBRID_TOOL, "passthrough": True})
+    assert [strategy.name for strategy in plan.hybrid.strategies] == ["vector", "lexical", "match:name"]
+    assert [strategy.limit for strategy in plan.hybrid.strategies] == [5, 9, 9]
+    assert plan.passthrough is False
+    assert [strategy.type for strategy in plan.hybrid.active(None)] == []
+
+    for hybrid in ({"strategies": []}, {"strategies": [{"type": "fuzzy"}]},
+                   {"strategies": [{"type": "match"}]}):
+        with pytest.raises(ValueError):
+            QueryPlan({**HYBRID_TOOL, "hybrid": hybrid})
+    with pytest.raises(ValueError):
+        QueryPlan({**HYBRID_TOOL, "paginate": True})
+    with pytest.raises(ValueError):
+        QueryPlan({**HYBRID_TOOL, "parameters": [{"param": "color"}]})
+    with pytest.raises(ValueError):
+        table_tool = {key: value for key, value in HYBRID_TOOL.items() if key != "collection_name"}
+        QueryPlan({**table_tool, "table_name": "products"})
+
+
+class FakeEmbeddings:
+    async def embed_async(self, text, model, timeout=None):
+        return [1.0, 0.0]
+
+
+@pytest.mark.asyncio
+async def test_hybrid_find_fuses_the_strategies():
+    stand_in = DataAPIStandIn().start()
+    try:
+        stand_in.insert("products", [
+            {"_id": "1", "name": "red dress", "color": "red", "$vector": [1.0, 0.0]},
+            {"_id": "2", "name": "blue dress", "color": "red", "$vector": [0.9, 0.1]},
+            {"_id": "3", "name": "red hat", "color": "red", "$vector": [0.0, 1.0]},
+            {"_id": "4", "name": "red dress", "color": "blue", "$vector": [1.0, 0.0]},
+        ])
+        manager = stand_in_manager(stand_in)
+        manager.embeddings = FakeEmbeddings()
+        plan = QueryPlan(HYBRID_TOOL)
+
+        # The stand-in has no lexical index, that strategy fails and is left out
+        result = await manager.find_async({"search": "red hat", "color": "red"}, plan=plan)
+        assert result["success"] is True
+        assert [document["_id"] for document in result["documents"]] == ["3", "1", "2"]
+        assert result["documents"][0] == {"_id": "3", "name": "red hat"}
+
+        # Without _id in the projection, documents are still deduplicated by it
+        plan = QueryPlan({**HYBRID_TOOL, "projection": {"name": 1, "_id": 0}})
+        result = await manager.find_async({"search": "red hat", "color": "red"}, plan=plan)
+        assert result["documents"] == [{"name": "red hat"}, {"name": "red dress"}, {"name": "blue dress"}]
+    finally:
+        stand_in.stop()
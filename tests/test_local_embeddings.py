@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from agentic_astra import local_embeddings
+from agentic_astra.embeddings import EmbeddingClient
+from agentic_astra.llm import embedding_provider
+from agentic_astra.local_embeddings import LocalEmbeddingProvider, model_directory
+from agentic_astra.deadline import Deadline, DeadlineExceeded
+from agentic_astra.query_plan import QueryPlan
+from benchmarks.data_api_stand_in import DataAPIStandIn
+from benchmarks.run import stand_in_manager
+
+
+class FakeModel:
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.threads = []
+
+    def embed(self, texts):
+        self.threads.append(threading.current_thread().name)
+        time.sleep(self.delay)
+        return [[float(len(text))] for text in texts]
+
+
+def test_models_are_routed_to_the_local_provider():
+    assert embedding_provider("local/all-minilm-l6-v2") == "local"
+    assert embedding_provider("text-embedding-3-small") == "openai"
+    assert embedding_provider("unknown-model") is None
+
+
+def test_model_directory_stays_in_the_base_directory():
+    assert model_directory("/models", "local/all-minilm-l6-v2") == "/models/all-minilm-l6-v2"
+    for model in ("local/../secrets", "local/a/b", "local/", "local/.."):
+        with pytest.raises(ValueError):
+            model_directory("/models", model)
+
+
+def test_missing_dependencies_are_reported(monkeypatch):
+    monkeypatch.setattr(local_embeddings, "onnxruntime", None)
+    monkeypatch.setenv("LOCAL_EMBEDDING_MODEL_DIR", "/models")
+    with pytest.raises(EnvironmentError, match="agentic-astra\\[local\\]"):
+        EmbeddingClient().provider("local/all-minilm-l6-v2")
+
+
+@pytest.mark.asyncio
+async def test_inference_runs_on_the_thread_pool(monkeypatch):
+    monkeypatch.setattr(local_embeddings, "onnxruntime", object())
+    provider = LocalEmbeddingProvider("/models", threads=1)
+    model = provider.models["local/all-minilm-l6-v2"] = FakeModel()
+
+    assert await provider.embed_async(["a", "bb"], "local/all-minilm-l6-v2", timeout=5) == [[1.0], [2.0]]
+    assert model.threads[0].startswith("local-embeddings")
+    await provider.close()
+
+
+@pytest.mark.asyncio
+async def test_slow_local_embeddings_exceed_the_deadline(monkeypatch):
+    """A local model slower than the call deadline fails the call, it is not an embedding error."""
+    monkeypatch.setattr(local_embeddings, "onnxruntime", object())
+    provider = LocalEmbeddingProvider("/models", threads=1)
+    provider.models["local/all-minilm-l6-v2"] = FakeModel(delay=0.5)
+    stand_in = DataAPIStandIn().start()
+    try:
+        stand_in.insert("products", [{"_id": "1", "name": "red dress"}])
+        manager = stand_in_manager(stand_in)
+        manager.embeddings = EmbeddingClient()
+        manager.embeddings.providers["local"] = provider
+        plan = QueryPlan({"name": "search_products", "method": "find", "collection_name": "products", "parameters": [
+            {"param": "search", "attribute": "$vector", "embedding_model": "local/all-minilm-l6-v2"}]})
+        with pytest.raises(DeadlineExceeded):
+            await manager.find_async({"search": "red"}, plan=plan, deadline=Deadline(100))
+    finally:
+        stand_in.stop()
+        await provider.close()
@@ -0,0 +1,38 @@
+"""
+Test cases for the tool call metrics.
+"""
+from agentic_astra.metrics import MetricsRegistry, CallMetrics, TOOL_PHASE_SECONDS, DOCUMENTS_RETURNED, phase
+
+
+def test_render_prometheus_text():
+    """Counters and histograms are rendered in the Prometheus text format."""
+    registry = MetricsRegistry()
+    counter = registry.counter("calls_total", "Calls", ("tool",))
+    histogram = registry.histogram("call_seconds", "Call duration", ("tool",), buckets=(0.1, 1.0))
+    counter.inc(tool='say "hi"')
+    histogram.observe(0.5, tool="a")
+
+    text = registry.render()
+    assert '# TYPE calls_total counter' in text
+    assert 'calls_total{tool="say \\"hi\\""} 1' in text
+    assert 'call_seconds_bucket{tool="a",le="0.1"} 0' in text
+    assert 'call_seconds_bucket{tool="a",le="1"} 1' in text
+    assert 'call_seconds_bucket{tool="a",le="+Inf"} 1' in text
+    assert 'call_seconds_count{tool="a"} 1' in text
+
+
+def test_call_phases():
+    """Phases are recorded with the status of the call once it finishes."""
+    labels = {"tool": "metrics_test", "method": "find", "database": "db"}
+    with CallMetrics(**labels) as call:
+        with phase("embedding"):
+            pass
+        with phase("data_api"):
+            pass
+        call.finish("ok", documents=3)
+    with phase("data_api"):  # outside of a call, nothing is recorded
+        pass
+
+    assert TOOL_PHASE_SECONDS.count(status="ok", phase="embedding", **labels) == 1
+    assert TOOL_PHASE_SECONDS.count(status="ok", phase="data_api", **labels) == 1
+    assert DOCUMENTS_RETURNED.value(**labels) == 3
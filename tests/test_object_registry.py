@@ -0,0 +1,65 @@
+"""
+Test cases for the object handle registry.
+"""
+import pytest
+from types import SimpleNamespace
+from agentic_astra.object_registry import ObjectRegistry
+from agentic_astra.query_plan import compile_plans
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.handles_created = 0
+        self.listings = 0
+
+    def get_collection(self, name):
+        self.handles_created += 1
+        return SimpleNamespace(name=name)
+
+    get_table = get_collection
+
+    async def list_collections(self):
+        self.listings += 1
+        return [SimpleNamespace(name="products")]
+
+    async def list_tables(self):
+        return [SimpleNamespace(name="airports")]
+
+
+class FakeManager:
+    astra_db_db_name = "db"
+
+    def __init__(self):
+        self.database = FakeDatabase()
+
+    async def get_async_db_by_name(self, db_name):
+        return self.database if db_name == "db" else None
+
+
+@pytest.mark.asyncio
+async def test_validate_reports_misconfigured_tools():
+    """Missing objects and databases are reported per tool, in one listing per database."""
+    manager = FakeManager()
+    registry = ObjectRegistry(manager)
+    problems = await registry.validate(compile_plans([
+        {"name": "products", "method": "find", "collection_name": "products", "parameters": []},
+        {"name": "airports", "method": "find", "table_name": "airports", "parameters": []},
+        {"name": "flights", "method": "find", "table_name": "flights", "parameters": []},
+        {"name": "elsewhere", "method": "find", "table_name": "airports", "db_name": "other", "parameters": []},
+        {"name": "collections", "method": "list_collections", "parameters": []},
+    ]))
+    assert set(problems) == {"flights", "elsewhere"}
+    assert "not found" in problems["flights"]
+    assert manager.database.listings == 1
+
+
+@pytest.mark.asyncio
+async def test_handles_reused():
+    """Handles are created once, until the database is invalidated."""
+    manager = FakeManager()
+    registry = ObjectRegistry(manager)
+    first = await registry.get_async("db", "collection", "products")
+    assert await registry.get_async("db", "collection", "products") is first
+    registry.invalidate("db")
+    await registry.get_async("db", "collection", "products")
+    assert manager.database.handles_created == 2
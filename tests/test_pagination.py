@@ -0,0 +1,28 @@
+"""
+Test cases for find page tokens.
+"""
+import pytest
+from agentic_astra.pagination import encode_page_token, decode_page_token
+
+
+def test_round_trip():
+    """The page state is returned for the same tool and arguments."""
+    token = encode_page_token("tool", {"color": "red"}, "page-state-1")
+    arguments = {"color": "red", "page_token": token}
+    assert decode_page_token("tool", arguments, token) == "page-state-1"
+
+
+def test_last_page():
+    """There is no token after the last page."""
+    assert encode_page_token("tool", {}, None) is None
+
+
+def test_token_bound_to_query():
+    """A token cannot be used with other arguments or another tool."""
+    token = encode_page_token("tool", {"color": "red"}, "page-state-1")
+    with pytest.raises(ValueError):
+        decode_page_token("tool", {"color": "blue"}, token)
+    with pytest.raises(ValueError):
+        decode_page_token("other_tool", {"color": "red"}, token)
+    with pytest.raises(ValueError):
+        decode_page_token("tool", {"color": "red"}, "not-a-token")
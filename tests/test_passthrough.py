@@ -0,0 +1,81 @@
+"""
+Passthrough tools against the Data API stand-in: the raw response holds the documents of the normal find.
+"""
+import json
+
+import pytest
+
+from agentic_astra.query_plan import QueryPlan
+from agentic_astra.serialization import to_jsonable
+from benchmarks.data_api_stand_in import DataAPIStandIn
+from benchmarks.run import stand_in_manager
+
+COLLECTION_TOOL = {
+    "name": "search_products",
+    "method": "find",
+    "collection_name": "products",
+    "limit": 2,
+    "projection": {"name": 1, "price": 1},
+    "parameters": [{"param": "color"}],
+}
+TABLE_TOOL = {
+    "name": "search_orders",
+    "method": "find",
+    "table_name": "orders",
+    "limit": 2,
+    "projection": {"order_id": 1, "quantity": 1},
+    "parameters": [{"param": "status"}],
+}
+
+
+async def both_finds(manager, tool_config, arguments):
+    normal = await manager.find_async(arguments, plan=QueryPlan(tool_config))
+    raw = await manager.find_async(arguments, plan=QueryPlan({**tool_config, "passthrough": True}))
+    return normal, raw
+
+
+@pytest.mark.asyncio
+async def test_passthrough_matches_the_normal_find():
+    stand_in = DataAPIStandIn().start()
+    try:
+        stand_in.insert("products", [
+            {"_id": "1", "name": "red dress", "color": "red", "price": 10.5},
+            {"_id": "2", "name": "blue dress", "color": "blue", "price": 12},
+            {"_id": "3", "name": "red hat", "color": "red", "price": 4},
+            {"_id": "4", "name": "red scarf", "color": "red", "price": 7},
+        ])
+        stand_in.create_table("orders", {"order_id": "text", "status": "text", "quantity": "int"}, ["order_id"], [
+            {"order_id": "o-1", "status": "open", "quantity": 3},
+            {"order_id": "o-2", "status": "closed", "quantity": 1},
+            {"order_id": "o-3", "status": "open", "quantity": 5},
+        ])
+        manager = stand_in_manager(stand_in)
+
+        for tool_config, arguments in ((COLLECTION_TOOL, {"color": "red"}), (TABLE_TOOL, {"status": "open"})):
+            normal, raw = await both_finds(manager, tool_config, arguments)
+            assert normal["success"] is True and normal["count"] == 2
+            assert isinstance(raw, str)
+            assert json.loads(raw)["data"]["documents"] == to_jsonable(normal["documents"])
+
+        # Errors are decoded on both paths
+        missing = {**COLLECTION_TOOL, "collection_name": "missing"}
+        normal, raw = await both_finds(manager, missing, {"color": "red"})
+        assert "error" in normal and "does not exist" in raw["error"]
+    finally:
+        stand_in.stop()
+
+
+@pytest.mark.asyncio
+async def test_passthrough_without_the_astrapy_internals(monkeypatch):
+    """Another astrapy version falls back to the normal find."""
+    from agentic_astra import database
+
+    stand_in = DataAPIStandIn().start()
+    try:
+        stand_in.insert("products", [{"_id": "1", "name": "red dress", "color": "red", "price": 10.5}])
+        manager = stand_in_manager(stand_in)
+        monkeypatch.setattr(database, "preprocess_table_payload", None)
+        result = await manager.find_async({"color": "red"}, plan=QueryPlan({**COLLECTION_TOOL, "passthrough": True}))
+        assert result == {"success": True, "count": 1, "documents": [{"_id": "1", "name": "red dress", "price": 10.5}]}
+    finally:
+        stand_in.stop()
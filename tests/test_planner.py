@@ -0,0 +1,151 @@
+from types import SimpleNamespace
+
+import pytest
+from astrapy.info import TableIndexType
+from fastmcp import FastMCP
+
+from agentic_astra.load_tools import ToolLoader
+from agentic_astra.planner import FULL_SCAN, INDEXED, PARTITION_LOOKUP, IndexPlanner, TargetSchema, indexed_columns, \
+    parameter_combinations
+from agentic_astra.query_plan import compile_plans
+
+FLIGHTS = {
+    "name": "search_flights",
+    "description": "Search flights",
+    "method": "find",
+    "table_name": "flights",
+    "limit": 10,
+    "parameters": [
+        {"param": "origin", "description": "Origin airport", "required": True},
+        {"param": "day", "description": "Day of the flight"},
+        {"param": "carrier", "description": "Carrier of the flight"},
+    ],
+}
+PRODUCTS = {
+    "name": "search_products",
+    "description": "Search products",
+    "method": "find",
+    "collection_name": "products",
+    "parameters": [
+        {"param": "search", "description": "Query", "attribute": "$vectorize"},
+        {"param": "color", "description": "Color of the products"},
+    ],
+}
+
+
+def index(column, index_type):
+    return SimpleNamespace(index_type=index_type, definition=SimpleNamespace(column=column))
+
+
+class FakeTable:
+    async def list_indexes(self):
+        return [index("day", TableIndexType.REGULAR), index({"tags": "$keys"}, TableIndexType.REGULAR),
+                index("notes", TableIndexType.TEXT)]
+
+
+class FakeHandles:
+    async def describe(self, db_name, object_type, object_name):
+        if object_type == "table":
+            primary_key = SimpleNamespace(partition_by=["origin"], partition_sort={"day": 1})
+            return SimpleNamespace(definition=SimpleNamespace(primary_key=primary_key))
+        return SimpleNamespace(definition=SimpleNamespace(indexing={"deny": ["color"]}))
+
+    async def get_async(self, db_name, object_type, object_name):
+        return FakeTable()
+
+
+class FakeManager:
+    astra_db_db_name = "db"
+    handles = FakeHandles()
+
+
+def test_indexed_columns():
+    indexes = [index("day", TableIndexType.REGULAR), index({"tags": "$keys"}, TableIndexType.REGULAR),
+               index("notes", TableIndexType.TEXT)]
+    assert indexed_columns(indexes) == ["day", "tags"]
+    assert indexed_columns(indexes, TableIndexType.TEXT) == ["notes"]
+
+
+def test_classify_table_access():
+    schema = TargetSchema("table", partition_by=["origin"], partition_sort=["day"], indexed=["carrier"],
+                          text_indexed=["notes"])
+    assert schema.classify([("origin", "$eq")], False) == PARTITION_LOOKUP
+    assert schema.classify([("origin", "$eq"), ("day", "$gte")], False) == PARTITION_LOOKUP
+    assert schema.classify([("carrier", "$eq"), ("notes", "$match")], False) == INDEXED
+    assert schema.classify([("origin", "$gt")], False) == FULL_SCAN
+    assert schema.classify([("notes", "$eq")], False) == FULL_SCAN
+    assert schema.classify([], True) == INDEXED
+    assert schema.classify([], False) == FULL_SCAN
+
+
+def test_classify_collection_access():
+    assert TargetSchema("collection").classify([("_id", "$eq")], False) == PARTITION_LOOKUP
+    assert TargetSchema("collection").classify([("a.b", "$gt")], False) == INDEXED
+    denied = TargetSchema("collection", indexing={"deny": ["a"]})
+    assert denied.classify([("a.b", "$eq")], False) == FULL_SCAN
+    allowed = TargetSchema("collection", indexing={"allow": ["a"]})
+    assert allowed.classify([("a.b", "$eq"), ("_id", "$in")], False) == PARTITION_LOOKUP
+    assert allowed.classify([("b", "$eq")], False) == FULL_SCAN
+
+
+def test_expression_operators():
+    """Expression parameters are planned with the operator they compile to."""
+    tool = {**FLIGHTS, "parameters": [
+        {"param": "origin", "attribute": "origin", "expr": "{'$gte': 'A'}"},
+        {"param": "day", "attribute": "day", "expr": "today().isoformat()"},
+        {"param": "carrier", "attribute": "carrier", "expr": "{'$in': ['AA', 'UA']}"},
+    ]}
+    plan = compile_plans([tool])["search_flights"]
+    (_, conditions, _), = parameter_combinations(plan)
+    assert conditions == [("origin", "$gte"), ("day", "$eq"), ("carrier", "$in")]
+    schema = TargetSchema("table", partition_by=["origin"], partition_sort=["day"], indexed=["carrier"])
+    assert schema.classify(conditions, False) == FULL_SCAN
+
+
+@pytest.mark.asyncio
+async def test_scan_policies():
+    plans = compile_plans([FLIGHTS, PRODUCTS])
+    report = await IndexPlanner(FakeManager()).check(plans)
+    # carrier is not indexed, and neither is color, nor a products find without search
+    assert report["search_flights"]["access"] == FULL_SCAN
+    assert report["search_flights"]["full_scans"] == [["carrier"], ["day", "carrier"]]
+    assert report["search_flights"]["combinations"] == 4
+    assert report["search_products"]["full_scans"] == [[], ["color"], ["color", "search"]]
+    assert {name: analysis["action"] for name, analysis in report.items()} == {
+        "search_flights": "warn", "search_products": "warn"}
+
+    report = await IndexPlanner(FakeManager(), "require_limit").check(plans)
+    assert {name: analysis["action"] for name, analysis in report.items()} == {
+        "search_flights": "warn", "search_products": "refuse"}
+
+    plans = compile_plans([{**FLIGHTS, "scan_policy": "refuse",
+                            "parameters": FLIGHTS["parameters"][:2]}, PRODUCTS])
+    report = await IndexPlanner(FakeManager(), "refuse").check(plans)
+    assert report["search_flights"] == {"access": PARTITION_LOOKUP, "full_scans": [], "combinations": 2,
+                                        "action": "ok"}
+    assert report["search_products"]["action"] == "refuse"
+
+    with pytest.raises(ValueError):
+        IndexPlanner(FakeManager(), "ignore")
+
+
+@pytest.mark.asyncio
+async def test_refused_tools_are_removed():
+    mcp = FastMCP("test")
+    loader = ToolLoader(mcp, None, [FLIGHTS, PRODUCTS])
+    loader.load_all_tools()
+    loader.remove_tool("search_products")
+    assert list(loader.plans) == ["search_flights"]
+    assert list(await mcp.get_tools()) == ["search_flights"]
+
+
+@pytest.mark.asyncio
+async def test_tools_that_do_not_compile_are_not_registered():
+    mcp = FastMCP("test")
+    rejected_expr = {**PRODUCTS, "name": "rejected_expr", "parameters": [
+        {"param": "since", "description": "Since", "attribute": "created_at", "expr": "__import__('os')"}]}
+    invalid_hybrid = {**PRODUCTS, "name": "invalid_hybrid", "hybrid": {"strategies": [{"type": "unknown"}]}}
+    loader = ToolLoader(mcp, None, [FLIGHTS, rejected_expr, invalid_hybrid])
+    loader.load_all_tools()
+    assert list(loader.plans) == ["search_flights"]
+    assert list(await mcp.get_tools()) == ["search_flights"]
@@ -0,0 +1,70 @@
+"""
+Test cases for compiling tool configs into query plans.
+"""
+from agentic_astra.query_plan import QueryPlan, SearchMode, compile_plans
+
+
+TOOL_CONFIG = {
+    "name": "search_products",
+    "method": "find",
+    "collection_name": "products",
+    "limit": 10,
+    "projection": {"name": 1},
+    "parameters": [
+        {"param": "search_query", "attribute": "$vectorize", "description": "Search query"},
+        {"param": "max_price", "attribute": "price", "operator": "$lte", "description": "Max price"},
+        {"param": "category", "description": "Category", "required": True},
+        {"param": "status", "value": "active", "description": "Fixed status"},
+    ],
+}
+
+
+def test_compile_plans_index_by_name():
+    """Plans are indexed by tool name."""
+    plans = compile_plans([TOOL_CONFIG])
+    assert list(plans) == ["search_products"]
+    plan = plans["search_products"]
+    assert plan.object_type == "collection"
+    assert plan.object_name == "products"
+    assert plan.search_mode == SearchMode.VECTORIZE
+
+
+def test_bind_arguments():
+    """Constants come from the template and arguments are bound by the binders."""
+    plan = QueryPlan(TOOL_CONFIG)
+    filter_dict, search_query = plan.bind({"search_query": "blue pants", "max_price": 50, "category": "pants"})
+    assert filter_dict == {
+        "status": {"$eq": "active"},
+        "price": {"$lte": 50},
+        "category": {"$eq": "pants"},
+    }
+    assert search_query == "blue pants"
+    # The template is not changed by binding
+    assert plan.filter_template == {"status": {"$eq": "active"}}
+
+
+def test_missing_required():
+    """The first missing required parameter is reported."""
+    plan = QueryPlan(TOOL_CONFIG)
+    assert plan.missing_required({}) == "category"
+    assert plan.missing_required({"category": "pants"}) is None
+
+
+def test_find_params():
+    """Static options are merged with the bound filter and sort."""
+    plan = QueryPlan(TOOL_CONFIG)
+    find_params = plan.find_params({"category": {"$eq": "pants"}}, {"$vectorize": "blue pants"})
+    assert find_params == {
+        "limit": 10,
+        "projection": {"name": 1},
+        "filter": {"category": {"$eq": "pants"}},
+        "sort": {"$vectorize": "blue pants"},
+    }
+
+
+def test_paginated_sorted_finds_keep_the_limit():
+    """Paginated tools return whole pages, except sorted finds which are a single page."""
+    plan = QueryPlan({**TOOL_CONFIG, "paginate": True})
+    assert "limit" not in plan.find_params({"category": {"$eq": "pants"}})
+    assert plan.find_params({}, {"$vectorize": "blue pants"})["limit"] == 10
+    assert QueryPlan({**TOOL_CONFIG, "paginate": True, "sort": {"price": 1}}).find_params({})["limit"] == 10
@@ -0,0 +1,130 @@
+"""
+Test cases for the in-memory replicas of tables and collections.
+"""
+import pytest
+from uuid import UUID
+from astrapy.data_types import DataAPITimestamp
+from agentic_astra.replica import Replica, ReplicaManager
+from agentic_astra.query_plan import compile_plans
+
+AIRPORTS = [
+    {"code": "MIA", "country": "US", "runways": 4, "tags": ["hub"]},
+    {"code": "LAX", "country": "US", "runways": 4},
+    {"code": "GRU", "country": "BR", "runways": 2, "tags": ["hub"]},
+    {"code": "CGH", "country": "BR", "runways": 2},
+    {"code": "SDU", "country": "BR", "runways": 1},
+]
+
+
+def test_equality_and_in():
+    """$eq and $in filters use the hash index, array fields match on any item."""
+    replica = Replica(AIRPORTS, ["country", "code", "tags"])
+    assert [d["code"] for d in replica.find({"country": {"$eq": "BR"}})] == ["GRU", "CGH", "SDU"]
+    assert [d["code"] for d in replica.find({"code": {"$in": ["MIA", "SDU"]}})] == ["MIA", "SDU"]
+    assert [d["code"] for d in replica.find({"tags": "hub"})] == ["MIA", "GRU"]
+
+
+def test_ranges_projection_limit():
+    """Range filters use the sorted index, with projection and limit."""
+    replica = Replica(AIRPORTS, ["runways", "country"])
+    found = replica.find({"runways": {"$gte": 2, "$lt": 4}, "country": {"$eq": "BR"}},
+                         projection={"code": 1}, limit=1)
+    assert found == [{"code": "GRU"}]
+    assert replica.find({"runways": {"$gt": 4}}) == []
+
+
+def test_astrapy_values():
+    """UUID and timestamp columns match string filter values."""
+    rows = [
+        {"id": UUID("12345678-1234-5678-1234-567812345678"),
+         "updated": DataAPITimestamp.from_string("2025-01-02T00:00:00Z")},
+        {"id": UUID("87654321-4321-8765-4321-876543218765"),
+         "updated": DataAPITimestamp.from_string("2025-03-02T00:00:00Z")},
+    ]
+    replica = Replica(rows, ["id", "updated"])
+    assert len(replica.find({"id": {"$eq": "12345678-1234-5678-1234-567812345678"}})) == 1
+    assert len(replica.find({"updated": {"$gte": "2025-02-01T00:00:00Z"}})) == 1
+
+
+def test_booleans_do_not_match_numbers():
+    """True and False are not equal to 1 and 0, unlike in Python, but 1 still matches 1.0."""
+    rows = [{"id": 1, "flag": True}, {"id": 2, "flag": 1}, {"id": 3, "flag": 0}, {"id": 4, "flag": False},
+            {"id": 5, "flag": 1.0}]
+    replica = Replica(rows, ["flag"])
+    assert [d["id"] for d in replica.find({"flag": True})] == [1]
+    assert [d["id"] for d in replica.find({"flag": False})] == [4]
+    assert [d["id"] for d in replica.find({"flag": 1})] == [2, 5]
+    assert [d["id"] for d in replica.find({"flag": {"$in": [0, True]}})] == [1, 3]
+    assert [d["id"] for d in replica.find({"flag": {"$gte": 1}})] == [2, 5]
+
+
+def test_unsupported_filters():
+    """Unsupported filters are left to the Data API."""
+    replica = Replica(AIRPORTS, ["code"])
+    assert replica.find({"code": {"$ne": "MIA"}}) is None
+    assert replica.find({"$or": [{"code": "MIA"}]}) is None
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+
+class FakeTable:
+    def find(self, filter_dict, limit=None):
+        return FakeCursor(AIRPORTS[:limit])
+
+
+class FakeHandles:
+    async def get_async(self, db_name, object_type, object_name):
+        return FakeTable()
+
+
+class FakeManager:
+    astra_db_db_name = "db"
+    handles = FakeHandles()
+
+
+@pytest.mark.asyncio
+async def test_manager_loads_and_finds():
+    """Tools with a replica config are served from memory, others are not."""
+    plans = compile_plans([
+        {"name": "airports", "method": "find", "table_name": "airports", "replica": {"refresh_interval": 0},
+         "parameters": [{"param": "country", "description": "Country"}]},
+        {"name": "flights", "method": "find", "table_name": "flights", "parameters": []},
+    ])
+    replicas = ReplicaManager(FakeManager())
+    replicas.register(plans)
+    await replicas.start()
+
+    found = replicas.find(plans["airports"], plans["airports"].find_params(plans["airports"].bind({"country": "US"})[0]))
+    assert [d["code"] for d in found] == ["MIA", "LAX"]
+    assert replicas.find(plans["flights"], {}) is None
+    await replicas.close()
+
+
+@pytest.mark.asyncio
+async def test_only_opted_in_tools_use_the_replica():
+    """A tool without a replica config is not served from the replica of its table."""
+    plans = compile_plans([
+        {"name": "airports_cached", "method": "find", "table_name": "airports", "replica": {"refresh_interval": 0},
+         "parameters": [{"param": "country", "description": "Country"}]},
+        {"name": "airports_live", "method": "find", "table_name": "airports",
+         "parameters": [{"param": "country", "description": "Country"}]},
+    ])
+    replicas = ReplicaManager(FakeManager())
+    replicas.register(plans)
+    await replicas.start()
+
+    for name in plans:
+        find_params = plans[name].find_params(plans[name].bind({"country": "US"})[0])
+        found = replicas.find(plans[name], find_params)
+        assert (found is not None) == (name == "airports_cached")
+    await replicas.close()
@@ -0,0 +1,109 @@
+"""
+Test cases for the tool calls of RunToolMiddleware.
+"""
+import asyncio
+import time
+import pytest
+from types import SimpleNamespace
+from agentic_astra.deadline import Deadline
+from agentic_astra.run_tool import RunToolMiddleware
+
+TOOLS = [
+    {"name": "search_orders", "method": "find", "collection_name": "orders",
+     "parameters": [{"param": "status", "description": "Status of the orders", "required": 1}]},
+    {"name": "list_collections", "method": "list_collections", "parameters": []},
+]
+
+
+class FakeManager:
+    astra_db_db_name = "db"
+
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.finds = []
+        self.audits = []
+
+    async def find_async(self, arguments=None, plan=None, deadline=None):
+        self.finds.append((plan.name, arguments, deadline.timeout_ms))
+        await asyncio.sleep(self.delay)
+        return {"success": True, "count": 1, "documents": [{"_id": "1", "status": arguments["status"]}]}
+
+    async def list_collections_async(self):
+        return {"success": True, "collections": ["orders"]}
+
+    async def log_audit_async(self, **kwargs):
+        self.audits.append(kwargs)
+
+
+def call(name, arguments, meta=None):
+    return SimpleNamespace(fastmcp_context=SimpleNamespace(client_id="test"),
+                           message=SimpleNamespace(name=name, arguments=arguments, meta=meta))
+
+
+@pytest.mark.asyncio
+async def test_find_through_the_middleware():
+    """Find tools call find_async with the plan of the tool and audit the call."""
+    manager = FakeManager()
+    middleware = RunToolMiddleware(manager, TOOLS)
+    result = await middleware.on_call_tool(call("search_orders", {"status": "open"}), None)
+    assert result.structured_content == {"success": True, "count": 1,
+                                         "documents": [{"_id": "1", "status": "open"}]}
+    assert manager.finds == [("search_orders", {"status": "open"}, 30000)]
+    assert manager.audits[-1]["status"] == "completed"
+
+    result = await middleware.on_call_tool(call("search_orders", {}), None)
+    assert result.structured_content == {"error": "Parameter status is required"}
+    assert len(manager.finds) == 1
+
+
+@pytest.mark.asyncio
+async def test_list_collections_through_the_middleware():
+    middleware = RunToolMiddleware(FakeManager(), TOOLS)
+    result = await middleware.on_call_tool(call("list_collections", {}), None)
+    assert result.structured_content == {"success": True, "collections": ["orders"]}
+
+
+def test_deadline_for_call():
+    """The client budget only shortens the tool timeout."""
+    assert Deadline.for_call(1000).timeout_ms == 1000
+    assert Deadline.for_call(1000, 200).timeout_ms == 200
+    assert Deadline.for_call(1000, "200").timeout_ms == 200
+    assert Deadline.for_call(1000, 5000).timeout_ms == 1000
+    assert Deadline.for_call(None, 200).timeout_ms == 200
+    for ignored in (0, -1, "soon", [1]):
+        assert Deadline.for_call(1000, ignored).timeout_ms == 1000
+    deadline = Deadline(50)
+    assert 0 < deadline.remaining() <= 0.05 and not deadline.expired()
+    assert Deadline(0).expired() and Deadline(0).remaining_ms() == 1
+
+
+@pytest.mark.asyncio
+async def test_client_budget_in_the_call_meta():
+    """The timeout_ms of the call _meta shortens the deadline of the call."""
+    manager = FakeManager()
+    middleware = RunToolMiddleware(manager, TOOLS, default_timeout_ms=2000)
+    result = await middleware.on_call_tool(
+        call("search_orders", {"status": "open"}, meta=SimpleNamespace(timeout_ms=500)), None)
+    assert result.structured_content["success"] is True
+
+    manager.delay = 0.2
+    started = time.monotonic()
+    result = await middleware.on_call_tool(
+        call("search_orders", {"status": "open"}, meta=SimpleNamespace(timeout_ms=50)), None)
+    assert time.monotonic() - started < 0.15
+    assert result.structured_content == {"error": "deadline exceeded", "timeout_ms": 50}
+    assert manager.audits[-1]["status_code"] == 504
+
+
+@pytest.mark.asyncio
+async def test_shared_calls_keep_their_own_deadline():
+    """A caller with a short deadline does not cut the shared execution short for the other ones."""
+    manager = FakeManager(delay=0.2)
+    middleware = RunToolMiddleware(manager, TOOLS, default_timeout_ms=2000)
+    short, long = await asyncio.gather(
+        middleware.on_call_tool(call("search_orders", {"status": "open"}, meta=SimpleNamespace(timeout_ms=100)), None),
+        middleware.on_call_tool(call("search_orders", {"status": "open"}, meta=SimpleNamespace(timeout_ms=2000)), None))
+    assert short.structured_content == {"error": "deadline exceeded", "timeout_ms": 100}
+    assert long.structured_content["success"] is True
+    # One execution, with the full timeout of the tool
+    assert manager.finds == [("search_orders", {"status": "open"}, 2000)]
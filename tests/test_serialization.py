@@ -0,0 +1,54 @@
+"""
+Test cases for serialization of Data API results.
+"""
+import json
+from decimal import Decimal
+from uuid import UUID
+from astrapy.data_types import DataAPIDate, DataAPITimestamp, DataAPIVector, DataAPIMap
+from agentic_astra.serialization import to_jsonable, dumps, to_tool_result, response_errors
+
+
+def test_astrapy_types():
+    """astrapy types have a single JSON representation."""
+    document = {
+        "id": UUID("12345678-1234-5678-1234-567812345678"),
+        "price": Decimal("1.5"),
+        "day": DataAPIDate.from_string("2025-01-02"),
+        "at": DataAPITimestamp.from_string("2025-01-02T03:04:05.000Z"),
+        "embedding": DataAPIVector([0.5, 0.25]),
+        "tags": {"a"},
+        "scores": DataAPIMap([(1, "one")]),
+    }
+    converted = to_jsonable(document)
+    assert converted["id"] == "12345678-1234-5678-1234-567812345678"
+    assert converted["price"] == 1.5
+    assert converted["day"] == "2025-01-02"
+    assert converted["at"].startswith("2025-01-02T03:04:05")
+    assert converted["embedding"] == [0.5, 0.25]
+    assert converted["tags"] == ["a"]
+    assert converted["scores"] == [[1, "one"]]
+    assert json.loads(dumps(document)) == converted
+
+
+def test_tool_result():
+    """The text content and the structured content hold the same result."""
+    result = to_tool_result({"success": True, "documents": [{"price": Decimal("2")}]})
+    assert result.structured_content == {"success": True, "documents": [{"price": 2.0}]}
+    assert json.loads(result.content[0].text) == result.structured_content
+
+
+def test_raw_passthrough():
+    """Raw Data API responses are forwarded without being decoded."""
+    raw = '{"data":{"documents":[]}}'
+    result = to_tool_result(raw)
+    assert result.content[0].text == raw
+    assert result.structured_content is None
+
+
+def test_response_errors():
+    """Only top-level errors of a raw response count, not "errors" in the documents."""
+    assert response_errors('{"data":{"documents":[{"errors":"none","note":"\\"errors\\""}]}}') is None
+    errors = [{"message": "Collection does not exist"}]
+    assert response_errors(json.dumps({"errors": errors})) == errors
+    assert response_errors(json.dumps({"data": {"documents": []}, "errors": errors})) == errors
+    assert response_errors("Bad gateway") == [{"message": "Bad gateway"}]
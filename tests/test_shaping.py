@@ -0,0 +1,50 @@
+"""
+Test cases for response shaping of find results.
+"""
+from astrapy.data_types import DataAPIVector
+from agentic_astra.shaping import shape_result
+
+
+def test_vectors_dropped_by_default():
+    """$vector fields and vector columns are removed and reported."""
+    result = {"success": True, "count": 1, "documents": [
+        {"_id": 1, "$vector": [0.1, 0.2], "embedding": DataAPIVector([0.1, 0.2]), "name": "a"},
+    ]}
+    shaped = shape_result(result)
+    assert shaped["documents"] == [{"_id": 1, "name": "a"}]
+    assert shaped["elided"]["fields"] == ["$vector", "embedding"]
+
+
+def test_keep_vectors():
+    """Vectors are kept when the tool asks for them."""
+    result = {"success": True, "count": 1, "documents": [{"$vector": [0.1]}]}
+    shaped = shape_result(result, {"keep_vectors": True})
+    assert shaped["documents"] == [{"$vector": [0.1]}]
+    assert "elided" not in shaped
+
+
+def test_truncate_strings():
+    """Long strings are truncated, nested ones included."""
+    result = {"success": True, "count": 1, "documents": [
+        {"description": "x" * 20, "details": {"notes": "y" * 20}, "name": "short"},
+    ]}
+    shaped = shape_result(result, {"max_string_length": 10})
+    document = shaped["documents"][0]
+    assert document["description"] == "x" * 10 + "..."
+    assert document["details"]["notes"] == "y" * 10 + "..."
+    assert document["name"] == "short"
+    assert shaped["elided"]["truncated_strings"] == 2
+
+
+def test_byte_budget():
+    """Documents stop being added once the byte budget is reached."""
+    documents = [{"_id": i, "text": "z" * 100} for i in range(10)]
+    result = {"success": True, "count": 10, "documents": documents}
+    shaped = shape_result(result, {"max_bytes": 300})
+    assert shaped["count"] == 2
+    assert shaped["elided"]["documents"] == 8
+
+
+def test_errors_unchanged():
+    """Error results are not shaped."""
+    assert shape_result('{"error": "boom"}') == '{"error": "boom"}'
@@ -0,0 +1,68 @@
+"""
+Test cases for single-flight coalescing of identical calls.
+"""
+import asyncio
+import pytest
+from agentic_astra.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_execution():
+    """Identical concurrent calls run the backend once."""
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def backend():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"count": calls}
+
+    results = await asyncio.gather(*[single_flight.do("key", backend) for _ in range(10)])
+    assert calls == 1
+    assert all(result == {"count": 1} for result in results)
+    assert single_flight.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_cancel_only_when_all_waiters_gone():
+    """The shared execution survives the cancellation of a single caller."""
+    single_flight = SingleFlight()
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def backend():
+        started.set()
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(single_flight.do("key", backend))
+    second = asyncio.create_task(single_flight.do("key", backend))
+    await started.wait()
+
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    assert await second == "done"
+
+
+@pytest.mark.asyncio
+async def test_cancel_when_last_waiter_gone():
+    """The shared execution is cancelled with its last caller."""
+    single_flight = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def backend():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    caller = asyncio.create_task(single_flight.do("key", backend))
+    await started.wait()
+    caller.cancel()
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert single_flight.in_flight() == 0
@@ -0,0 +1,100 @@
+import asyncio
+
+import httpx
+import pytest
+from astrapy import DataAPIClient
+from astrapy.utils.api_commander import APICommander
+
+from agentic_astra.transport import DataAPITransport
+
+
+def test_attach_shares_the_async_client():
+    transport = DataAPITransport()
+    database = DataAPIClient().get_async_database("http://127.0.0.1:1", token="token")
+    collection = database.get_collection("products")
+    assert collection._api_commander.async_client is not transport.async_client
+
+    transport.attach(database)
+    transport.attach(collection)
+
+    assert database._api_commander.async_client is transport.async_client
+    assert collection._api_commander.async_client is transport.async_client
+
+
+@pytest.mark.asyncio
+async def test_replaced_clients_are_closed():
+    original = APICommander.client
+    transport = DataAPITransport(max_connections=5, max_keepalive_connections=2)
+    try:
+        transport.install()
+        assert APICommander.client is transport.client
+        database = DataAPIClient().get_async_database("http://127.0.0.1:1", token="token")
+        replaced = database._api_commander.async_client
+        transport.attach(database)
+        await transport.close()
+    finally:
+        if APICommander.client is transport.client:
+            APICommander.client = original
+    assert APICommander.client is original
+    assert replaced.is_closed
+    assert transport.async_client.is_closed
+    assert transport.client.is_closed
+    assert transport.warm_connections == 2
+
+
+def test_http2_falls_back_without_h2(monkeypatch):
+    import builtins
+    real_import = builtins.__import__
+
+    def without_h2(name, *args, **kwargs):
+        if name == "h2":
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", without_h2)
+    assert DataAPITransport(http2=True).http2 is False
+
+
+@pytest.mark.asyncio
+async def test_warm_up_opens_connections_and_pings():
+    requests = []
+
+    def handler(request):
+        requests.append(str(request.url))
+        return httpx.Response(404)
+
+    transport = DataAPITransport(warm_connections=3, ping_interval=0.01)
+    transport.async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    await transport.warm_up(["https://db-1.apps.astra.datastax.com/", "https://db-1.apps.astra.datastax.com",
+                             "https://db-2.apps.astra.datastax.com", None])
+    assert transport.endpoints == ["https://db-1.apps.astra.datastax.com", "https://db-2.apps.astra.datastax.com"]
+    assert len(requests) == 6
+
+    await asyncio.sleep(0.05)
+    assert len(requests) > 6
+
+    await transport.close()
+    assert transport._ping_task is None
+
+
+@pytest.mark.asyncio
+async def test_warm_up_disabled():
+    transport = DataAPITransport(warm_connections=0)
+    await transport.warm_up(["https://db-1.apps.astra.datastax.com"])
+    assert transport._ping_task is None
+    await transport.close()
+
+
+def test_missing_astrapy_internals_are_not_patched(monkeypatch):
+    """Other astrapy versions keep their own clients rather than being broken."""
+    transport = DataAPITransport()
+    monkeypatch.delattr(APICommander, "client")
+    transport.install()
+    assert not hasattr(APICommander, "client")
+    assert transport._installed_over is None
+
+    database = DataAPIClient().get_async_database("http://127.0.0.1:1", token="token")
+    del database._api_commander.async_client
+    transport.attach(database)
+    assert not hasattr(database._api_commander, "async_client")